@@ -1,11 +1,30 @@
+"""
+Elo estimate of ChessEngine against a UCI opponent (usually Stockfish with
+UCI_LimitStrength)
+
+Games run in worker processes, several at a time. Each worker keeps its own
+engine and its own long-lived opponent process, reset between games with
+ucinewgame, and results are merged as games finish.
+
+    python -m ai.arena --stockfish-path stockfish --elos 1200 1600 --workers 4
+"""
 import argparse
 import math
+import os
 import subprocess
 import time
-from typing import List, Tuple, Optional
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+from typing import Callable, Dict, List, Tuple, Optional
 
 from chess_logic.board import Board
 from ai.engine import ChessEngine
+from ai.book import PolyglotBook
+from ai.bitbase import Bitbases
+from ai.ponder import Ponderer
+from ai.time_manager import SearchLimits
+from ai.search_info import JsonLinesWriter, SearchInfo
 
 
 def pos_to_uci(pos: Tuple[int, int]) -> str:
@@ -56,8 +75,7 @@ class UciEngine:
         self._read_until('readyok')
 
     def _send(self, cmd: str):
-        self.proc.stdin.write(cmd + '
-')
+        self.proc.stdin.write(cmd + '\n')
         self.proc.stdin.flush()
 
     def _read_until(self, token: str):
@@ -71,6 +89,15 @@ class UciEngine:
     def set_option(self, name: str, value):
         self._send(f"setoption name {name} value {value}")
 
+    def wait_ready(self):
+        self._send('isready')
+        self._read_until('readyok')
+
+    def new_game(self):
+        """Forget the previous game (hash, history) before the next one."""
+        self._send('ucinewgame')
+        self.wait_ready()
+
     def set_position(self, moves: List[str]):
         if moves:
             self._send('position startpos moves ' + ' '.join(moves))
@@ -94,15 +121,25 @@ class UciEngine:
             self.proc.kill()
 
 
-def play_game(engine: ChessEngine, stockfish: UciEngine, engine_color: str, movetime_ms: int, max_plies: int) -> float:
+def play_game(engine: ChessEngine, stockfish: UciEngine, engine_color: str, movetime_ms: int, max_plies: int,
+              ponderer: Optional[Ponderer] = None) -> float:
     board = Board()
     board.setup_initial_position()
     moves_uci: List[str] = []
     cur_color = 'white'
+    limits = SearchLimits(movetime=movetime_ms / 1000.0)
+    last_move = None
+    if ponderer:
+        ponderer.miss()
 
     for _ in range(max_plies):
         if cur_color == engine_color:
-            move = engine.get_best_move(board, cur_color, time_limit=movetime_ms / 1000.0)
+            if ponderer and ponderer.matches(last_move):
+                move = ponderer.hit(limits)
+            else:
+                if ponderer:
+                    ponderer.miss()
+                move = engine.get_best_move(board, cur_color, limits=limits)
             if not move:
                 if board.is_in_check(cur_color):
                     return 0.0
@@ -113,6 +150,9 @@ def play_game(engine: ChessEngine, stockfish: UciEngine, engine_color: str, move
             if not board.move_piece(move[0], move[1], promotion=promo, next_color=next_color):
                 return 0.0
             moves_uci.append(uci)
+            if ponderer:
+                # Think about the expected reply while Stockfish is thinking
+                ponderer.start(board, engine_color, engine.ponder_move, limits)
         else:
             stockfish.set_position(moves_uci)
             best = stockfish.go(movetime_ms)
@@ -125,6 +165,7 @@ def play_game(engine: ChessEngine, stockfish: UciEngine, engine_color: str, move
             if not board.move_piece(start, end, promotion=_promo, next_color=next_color):
                 return 1.0
             moves_uci.append(best)
+            last_move = (start, end, _promo)
 
         cur_color = 'black' if cur_color == 'white' else 'white'
         game_over, reason = board.is_game_over(cur_color)
@@ -142,28 +183,140 @@ def estimate_elo(score: float, games: int, opponent_elo: int) -> float:
     return opponent_elo + 400.0 * math.log10(s / (1.0 - s))
 
 
-def run_match(stockfish_path: str, engine_depth: int, movetime_ms: int, games_per_elo: int, elos: List[int], max_plies: int):
-    engine = ChessEngine(depth=engine_depth)
-    results = []
-
-    for elo in elos:
-        stockfish = UciEngine(stockfish_path)
-        stockfish.set_option('Threads', 1)
-        stockfish.set_option('Hash', 64)
-        stockfish.set_option('UCI_LimitStrength', 'true')
-        stockfish.set_option('UCI_Elo', elo)
-        stockfish._send('isready')
-        stockfish._read_until('readyok')
-
-        score = 0.0
-        for game in range(games_per_elo):
-            engine_color = 'white' if game % 2 == 0 else 'black'
-            score += play_game(engine, stockfish, engine_color, movetime_ms, max_plies)
-        stockfish.quit()
-
-        results.append((elo, score, games_per_elo))
-
-    return results
+@dataclass
+class ArenaConfig:
+    stockfish_path: str
+    engine_depth: int = 5
+    movetime_ms: int = 200
+    max_plies: int = 200
+    ponder: bool = False
+    book_path: Optional[str] = None
+    book_max_ply: int = 20
+    bitbase_dir: Optional[str] = None
+    stats_log: Optional[str] = None
+    # Transposition table of each engine, cleared before every game
+    hash_mb: int = 64
+
+
+@dataclass
+class GameResult:
+    elo: int
+    game: int
+    engine_color: str
+    score: float
+    seconds: float
+    # Engine search stats of the game when stats_log is set, written by the parent
+    infos: List[SearchInfo] = field(default_factory=list)
+
+
+class ArenaWorker:
+    """One engine and one opponent process that play games one after another."""
+
+    def __init__(self, config: ArenaConfig):
+        self.config = config
+        book = PolyglotBook(config.book_path) if config.book_path else None
+        bitbases = Bitbases.load(config.bitbase_dir) if config.bitbase_dir else None
+        self.engine = ChessEngine(depth=config.engine_depth, book=book, bitbases=bitbases)
+        self.engine.book_max_ply = config.book_max_ply
+        self.engine.verbose = False
+        self.engine.set_hash_size(config.hash_mb)
+        # Games run in several processes at once: stats go back with the result
+        # so that one process writes the log and lines never interleave
+        self.infos: List[SearchInfo] = []
+        self.engine.info_callback = self.infos.append if config.stats_log else None
+        self.ponderer = Ponderer(self.engine) if config.ponder else None
+        self.opponent = UciEngine(config.stockfish_path)
+        self.opponent.set_option('Threads', 1)
+        self.opponent.set_option('Hash', 64)
+        self.opponent.set_option('UCI_LimitStrength', 'true')
+        self.elo = None
+
+    def play(self, elo: int, game: int) -> GameResult:
+        if elo != self.elo:
+            self.opponent.set_option('UCI_Elo', elo)
+            self.elo = elo
+        self.opponent.new_game()
+        self.engine.new_game()
+        self.infos.clear()
+        engine_color = 'white' if game % 2 == 0 else 'black'
+        started = time.time()
+        score = play_game(self.engine, self.opponent, engine_color, self.config.movetime_ms,
+                          self.config.max_plies, self.ponderer)
+        if self.ponderer:
+            self.ponderer.miss()
+        return GameResult(elo, game, engine_color, score, time.time() - started, list(self.infos))
+
+    def close(self):
+        if self.ponderer:
+            self.ponderer.miss()
+        self.opponent.quit()
+
+
+# Worker process state
+_worker: Optional[ArenaWorker] = None
+
+
+def _init_worker(config: ArenaConfig):
+    global _worker
+    _worker = ArenaWorker(config)
+    # Quit the opponent when the pool shuts the worker down
+    Finalize(_worker, _worker.close, exitpriority=10)
+
+
+def _play_task(task: Tuple[int, int]) -> GameResult:
+    return _worker.play(*task)
+
+
+def run_match(stockfish_path: str, engine_depth: int, movetime_ms: int, games_per_elo: int, elos: List[int], max_plies: int,
+              ponder: bool = False, book_path: Optional[str] = None, book_max_ply: int = 20,
+              bitbase_dir: Optional[str] = None, stats_log: Optional[str] = None, workers: int = 1,
+              hash_mb: int = 64, on_result: Optional[Callable[[GameResult, int, float], None]] = None):
+    """
+    Play games_per_elo games against each opponent Elo, `workers` games at a
+    time. on_result(result, finished, games_per_hour) is called as each game
+    ends. Returns [(elo, score, games)] in the order of `elos`.
+    """
+    config = ArenaConfig(stockfish_path, engine_depth, movetime_ms, max_plies, ponder, book_path,
+                         book_max_ply, bitbase_dir, stats_log, hash_mb)
+    tasks = [(elo, game) for elo in elos for game in range(games_per_elo)]
+    totals: Dict[int, List[float]] = {elo: [0.0, 0] for elo in elos}
+    stats_writer = JsonLinesWriter(stats_log) if stats_log else None
+    started = time.time()
+
+    def record(result: GameResult, finished: int):
+        if stats_writer:
+            for info in result.infos:
+                stats_writer(info)
+        totals[result.elo][0] += result.score
+        totals[result.elo][1] += 1
+        if on_result:
+            elapsed = time.time() - started
+            on_result(result, finished, finished * 3600 / elapsed if elapsed > 0 else 0.0)
+
+    try:
+        if workers <= 1:
+            worker = ArenaWorker(config)
+            try:
+                for finished, task in enumerate(tasks, 1):
+                    record(worker.play(*task), finished)
+            finally:
+                worker.close()
+        else:
+            pool = Pool(workers, _init_worker, (config,))
+            try:
+                for finished, result in enumerate(pool.imap_unordered(_play_task, tasks), 1):
+                    record(result, finished)
+                pool.close()
+            except BaseException:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+    finally:
+        if stats_writer:
+            stats_writer.close()
+
+    return [(elo, totals[elo][0], totals[elo][1]) for elo in elos]
 
 
 def main():
@@ -174,8 +327,24 @@ def main():
     parser.add_argument('--games-per-elo', type=int, default=20, help='Games per opponent Elo')
     parser.add_argument('--elos', type=int, nargs='+', default=[1200, 1600, 2000], help='Stockfish Elo settings')
     parser.add_argument('--max-plies', type=int, default=200, help='Max plies per game before draw')
+    parser.add_argument('--ponder', action='store_true', help='Let the engine think on Stockfish\'s time')
+    parser.add_argument('--book', default=None, help='Polyglot opening book for the engine')
+    parser.add_argument('--book-max-ply', type=int, default=20, help='Last game ply to play book moves')
+    parser.add_argument('--bitbases', default=None, help='Directory with KQK/KRK/KPK bitbases')
+    parser.add_argument('--stats-log', default=None, help='Append per-iteration search stats as JSON lines')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Games played at the same time (default: half the cores, since every game also '
+                             'runs a Stockfish process; with --ponder both sides think at once, so fewer '
+                             'workers keep the time controls honest)')
+    parser.add_argument('--hash-mb', type=int, default=64, help='Transposition table size of each engine')
     args = parser.parse_args()
 
+    def report(result: GameResult, finished: int, games_per_hour: float):
+        print(f"[{finished}/{len(args.elos) * args.games_per_elo}] Elo {result.elo} game {result.game + 1} "
+              f"({result.engine_color}): {result.score} in {result.seconds:.0f}s, {games_per_hour:.1f} games/hour")
+
+    started = time.time()
+
     results = run_match(
         stockfish_path=args.stockfish_path,
         engine_depth=args.depth,
@@ -183,7 +352,16 @@ def main():
         games_per_elo=args.games_per_elo,
         elos=args.elos,
         max_plies=args.max_plies,
+        ponder=args.ponder,
+        book_path=args.book,
+        book_max_ply=args.book_max_ply,
+        bitbase_dir=args.bitbases,
+        stats_log=args.stats_log,
+        workers=args.workers,
+        hash_mb=args.hash_mb,
+        on_result=report,
     )
+    elapsed = time.time() - started
 
     total_score = 0.0
     total_games = 0
@@ -201,6 +379,8 @@ def main():
     if total_games > 0:
         overall = sum(est * games for _, est, _, games in estimates) / total_games
         print(f"Overall estimate: {overall:.0f}")
+        print(f"{total_games} games in {elapsed / 60:.1f} min, {total_games * 3600 / elapsed:.1f} games/hour "
+              f"with {args.workers} workers")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,158 @@
+"""
+NumPy batch evaluation: ChessEvaluator.evaluate_position for many positions at once
+
+Positions are rows of an int8 array with POSITION_COLUMNS columns:
+
+    0..63   piece codes by square (row * 8 + col): 1..6 for a white
+            pawn, knight, bishop, rook, queen, king; -1..-6 for black; 0 empty
+    64      side to move (0 white, 1 black)
+    65..68  castling rights K, Q, k, q (0 or 1)
+
+The scores equal the scalar evaluator's bit for bit: each term is summed
+as an integer and scaled with the same float operations in the same order.
+
+    positions = encode_boards([(board, color), ...])
+    scores = BatchEvaluator().evaluate(positions)
+"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from chess_logic.board import Board
+from chess_logic.psqt import SQUARE_TERMS, PHASE_TOTAL
+from ai.evaluator import ChessEvaluator
+
+
+PIECE_CODES = {'Pawn': 1, 'Knight': 2, 'Bishop': 3, 'Rook': 4, 'Queen': 5, 'King': 6}
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+SIDE_COLUMN = 64
+CASTLING_COLUMNS = slice(65, 69)
+POSITION_COLUMNS = 69
+
+KNIGHT_STEPS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+KING_STEPS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+DIAGONALS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+LINES = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+def encode_board(board: Board, color: str = 'white') -> np.ndarray:
+    row = np.zeros(POSITION_COLUMNS, dtype=np.int8)
+    for r in range(8):
+        for c in range(8):
+            piece = board.grid[r][c]
+            if piece is not None:
+                code = PIECE_CODES[piece.__class__.__name__]
+                row[r * 8 + c] = code if piece.color == 'white' else -code
+    row[SIDE_COLUMN] = 0 if color == 'white' else 1
+    rights = board.castling_rights
+    row[CASTLING_COLUMNS] = [rights['white']['K'], rights['white']['Q'], rights['black']['K'], rights['black']['Q']]
+    return row
+
+
+def encode_boards(positions: Iterable[Tuple[Board, str]]) -> np.ndarray:
+    """Stack (board, side to move) pairs into an (N, POSITION_COLUMNS) array."""
+    rows = [encode_board(board, color) for board, color in positions]
+    if not rows:
+        return np.zeros((0, POSITION_COLUMNS), dtype=np.int8)
+    return np.stack(rows)
+
+
+def _term_table() -> np.ndarray:
+    """SQUARE_TERMS as a (13, 64, 5) array indexed by piece code + 6."""
+    table = np.zeros((13, 64, 5), dtype=np.int64)
+    for piece_type, code in PIECE_CODES.items():
+        table[6 + code] = SQUARE_TERMS['white'][piece_type]
+        table[6 - code] = SQUARE_TERMS['black'][piece_type]
+    return table
+
+
+class BatchEvaluator:
+    def __init__(self, evaluator: Optional[ChessEvaluator] = None, chunk_size: int = 16384):
+        # Weights come from the scalar evaluator so the two always agree
+        self.evaluator = evaluator or ChessEvaluator()
+        # Rows per step; the gathered terms take chunk_size * 2.5 KB
+        self.chunk_size = chunk_size
+        self._terms = _term_table()
+
+    def evaluate(self, positions: np.ndarray) -> np.ndarray:
+        """Scores (positive for black, in pawns) of an (N, 64+) position array."""
+        positions = np.asarray(positions)
+        scores = np.empty(len(positions), dtype=np.float64)
+        for start in range(0, len(positions), self.chunk_size):
+            chunk = positions[start:start + self.chunk_size, :64].astype(np.int64)
+            scores[start:start + len(chunk)] = self._evaluate_chunk(chunk)
+        return scores
+
+    def _evaluate_chunk(self, codes: np.ndarray) -> np.ndarray:
+        ev = self.evaluator
+        sums = self._terms[codes + 6, np.arange(64)].sum(axis=1)
+        material, psqt_mg, psqt_eg, center, phase = sums.T
+
+        mg_phase = np.minimum(phase, PHASE_TOTAL)
+        tapered = (psqt_mg * mg_phase + psqt_eg * (PHASE_TOTAL - mg_phase)) / PHASE_TOTAL
+
+        material_score = -material * ev.MATERIAL_WEIGHT / 100
+        piece_moves_score = -center / 2 * ev.POSITION_WEIGHT / 100
+        pawn_structure_score = self.chain_scores(codes) * ev.PAWN_STRUCTURE_WEIGHT / 100
+        piece_square_score = -tapered * ev.PST_WEIGHT / 100
+
+        white_check = np.where(self.in_check(codes, 'white'), 1, 0) * ev.CHECK_WEIGHT / 100
+        black_check = np.where(self.in_check(codes, 'black'), -1, 0) * ev.CHECK_WEIGHT / 100
+        check_score = white_check + black_check
+
+        return (
+            material_score +
+            piece_moves_score +
+            pawn_structure_score +
+            piece_square_score +
+            check_score
+        )
+
+    @staticmethod
+    def chain_scores(codes: np.ndarray) -> np.ndarray:
+        """PawnEntry.chain_score: pawns on rows 1-6 with a friendly pawn diagonally ahead, black minus white."""
+        board = codes.reshape(-1, 8, 8)
+        white = board == PAWN
+        black = board == -PAWN
+        # Shift the pawn masks one row forward and one file aside
+        white_count = ((white[:, 1:7, 1:] & white[:, 2:8, :-1]).sum(axis=(1, 2)) +
+                       (white[:, 1:7, :-1] & white[:, 2:8, 1:]).sum(axis=(1, 2)))
+        black_count = ((black[:, 1:7, 1:] & black[:, 0:6, :-1]).sum(axis=(1, 2)) +
+                       (black[:, 1:7, :-1] & black[:, 0:6, 1:]).sum(axis=(1, 2)))
+        return black_count - white_count
+
+    @staticmethod
+    def in_check(codes: np.ndarray, color: str) -> np.ndarray:
+        """Board.is_in_check for every row: the first `color` king is attacked."""
+        sign = 1 if color == 'white' else -1
+        kings = codes == sign * KING
+        has_king = kings.any(axis=1)
+        square = kings.argmax(axis=1)
+        row, col = square // 8, square % 8
+        rows = np.arange(len(codes))
+        enemy = -sign
+
+        def piece_at(dr, dc):
+            r, c = row + dr, col + dc
+            inside = (r >= 0) & (r < 8) & (c >= 0) & (c < 8)
+            found = codes[rows, np.where(inside, r * 8 + c, 0)]
+            return np.where(inside, found, 0), inside
+
+        attacked = np.zeros(len(codes), dtype=bool)
+        # Enemy pawns attack towards the king from one row ahead of it
+        pawn_row = 1 if color == 'white' else -1
+        for dc in (-1, 1):
+            attacked |= piece_at(pawn_row, dc)[0] == enemy * PAWN
+        for dr, dc in KNIGHT_STEPS:
+            attacked |= piece_at(dr, dc)[0] == enemy * KNIGHT
+        for dr, dc in KING_STEPS:
+            attacked |= piece_at(dr, dc)[0] == enemy * KING
+        for directions, slider in ((DIAGONALS, BISHOP), (LINES, ROOK)):
+            for dr, dc in directions:
+                blocked = np.zeros(len(codes), dtype=bool)
+                for step in range(1, 8):
+                    found, inside = piece_at(dr * step, dc * step)
+                    hit = ~blocked & ((found == enemy * slider) | (found == enemy * QUEEN))
+                    attacked |= hit
+                    blocked |= ~inside | (found != 0)
+        return attacked & has_king
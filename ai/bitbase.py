@@ -0,0 +1,373 @@
+"""
+Endgame bitbases for KPK, KRK and KQK.
+
+Every position of a signature gets one bit: set when the side with the extra
+piece wins, clear for draws (and illegal positions). The strong side is
+always stored as white; positions with a black strong side are flipped
+vertically before probing. Pawnless tables also use the eight board
+symmetries (strong king in the a1-d1-d4 triangle), KPK uses the file
+mirror (pawn on files a-d).
+
+Tables are generated by iterating to a fixed point over all positions,
+with each sweep split across a process pool:
+
+    python -m ai.bitbase --output-dir ai/bitbases
+"""
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Optional, Tuple
+
+
+SIGNATURES = ('KQK', 'KRK', 'KPK')
+SIGNATURE_PIECES = {'KQK': 'Queen', 'KRK': 'Rook', 'KPK': 'Pawn'}
+PIECE_SIGNATURES = {piece: signature for signature, piece in SIGNATURE_PIECES.items()}
+MAGIC = b'CBB1'
+
+UNKNOWN = 0
+WIN = 1
+ILLEGAL = 2
+
+# Strong king squares of the a1-d1-d4 triangle, as row * 8 + col
+TRIANGLE = [row * 8 + col for row in range(4) for col in range(4) if row <= col]
+TRIANGLE_INDEX = {sq: i for i, sq in enumerate(TRIANGLE)}
+
+
+def _build_tables():
+    king_moves = []
+    rays = {'Rook': [], 'Queen': []}
+    straight = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    diagonal = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        king_moves.append([
+            (row + dr) * 8 + col + dc
+            for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+            if (dr or dc) and 0 <= row + dr < 8 and 0 <= col + dc < 8
+        ])
+        for name, directions in (('Rook', straight), ('Queen', straight + diagonal)):
+            square_rays = []
+            for dr, dc in directions:
+                ray = []
+                r, c = row + dr, col + dc
+                while 0 <= r < 8 and 0 <= c < 8:
+                    ray.append(r * 8 + c)
+                    r += dr
+                    c += dc
+                if ray:
+                    square_rays.append(ray)
+            rays[name].append(square_rays)
+    return king_moves, rays
+
+
+KING_MOVES, RAYS = _build_tables()
+
+
+def _adjacent(a: int, b: int) -> bool:
+    return max(abs(a // 8 - b // 8), abs(a % 8 - b % 8)) <= 1
+
+
+def _piece_attacks(piece: str, x: int, target: int, blocker: int) -> bool:
+    """Does the strong piece on x attack target, with one blocking square."""
+    if piece == 'Pawn':
+        return target // 8 == x // 8 + 1 and abs(target % 8 - x % 8) == 1
+    for ray in RAYS[piece][x]:
+        for sq in ray:
+            if sq == target:
+                return True
+            if sq == blocker:
+                break
+    return False
+
+
+def _transform(sq: int, flip_col: bool, flip_row: bool, transpose: bool) -> int:
+    row, col = divmod(sq, 8)
+    if flip_col:
+        col = 7 - col
+    if flip_row:
+        row = 7 - row
+    if transpose:
+        row, col = col, row
+    return row * 8 + col
+
+
+def index_of(signature: str, wk: int, bk: int, x: int, strong_to_move: bool) -> int:
+    """Table index of a position with the strong side as white."""
+    stm = 0 if strong_to_move else 1
+    if signature == 'KPK':
+        if x % 8 > 3:
+            wk, bk, x = wk ^ 7, bk ^ 7, x ^ 7
+        pawn_index = (x // 8 - 1) * 4 + x % 8
+        return ((pawn_index * 64 + wk) * 64 + bk) * 2 + stm
+    flip_col = wk % 8 > 3
+    flip_row = wk // 8 > 3
+    wk = _transform(wk, flip_col, flip_row, False)
+    transpose = wk // 8 > wk % 8
+    wk = _transform(wk, False, False, transpose)
+    bk = _transform(bk, flip_col, flip_row, transpose)
+    x = _transform(x, flip_col, flip_row, transpose)
+    return ((TRIANGLE_INDEX[wk] * 64 + bk) * 64 + x) * 2 + stm
+
+
+def table_size(signature: str) -> int:
+    if signature == 'KPK':
+        return 24 * 64 * 64 * 2
+    return len(TRIANGLE) * 64 * 64 * 2
+
+
+def decode_index(signature: str, index: int) -> Tuple[int, int, int, bool]:
+    index, stm = divmod(index, 2)
+    if signature == 'KPK':
+        pawn_index, rest = divmod(index, 64 * 64)
+        wk, bk = divmod(rest, 64)
+        x = (pawn_index // 4 + 1) * 8 + pawn_index % 4
+        return wk, bk, x, stm == 0
+    tri, rest = divmod(index, 64 * 64)
+    bk, x = divmod(rest, 64)
+    return TRIANGLE[tri], bk, x, stm == 0
+
+
+def _is_legal(piece: str, wk: int, bk: int, x: int, strong_to_move: bool) -> bool:
+    if len({wk, bk, x}) < 3 or _adjacent(wk, bk):
+        return False
+    if piece == 'Pawn' and x // 8 in (0, 7):
+        return False
+    # The side that is not to move can't be in check
+    if strong_to_move and _piece_attacks(piece, x, bk, wk):
+        return False
+    return True
+
+
+# Tables of already generated signatures, used for pawn promotions
+_known: Dict[str, bytes] = {}
+
+
+def _init_worker(known: Dict[str, bytes]):
+    _known.update(known)
+
+
+def _resolve(signature: str, status, wk: int, bk: int, x: int, strong_to_move: bool) -> bool:
+    """One step of the fixed-point iteration: is the position a known win now?"""
+    piece = SIGNATURE_PIECES[signature]
+    if strong_to_move:
+        for to in KING_MOVES[wk]:
+            if to != x and not _adjacent(to, bk):
+                if status[index_of(signature, to, bk, x, False)] == WIN:
+                    return True
+        if piece == 'Pawn':
+            to = x + 8
+            if to in (wk, bk):
+                return False
+            if to // 8 == 7:
+                # Queen first, rook for the positions where the queen stalemates
+                for promoted in ('KQK', 'KRK'):
+                    if _known[promoted][index_of(promoted, wk, bk, to, False)] == WIN:
+                        return True
+                return False
+            if status[index_of(signature, wk, bk, to, False)] == WIN:
+                return True
+            if x // 8 == 1 and x + 16 not in (wk, bk):
+                return status[index_of(signature, wk, bk, x + 16, False)] == WIN
+            return False
+        for ray in RAYS[piece][x]:
+            for to in ray:
+                if to in (wk, bk):
+                    break
+                if status[index_of(signature, wk, bk, to, False)] == WIN:
+                    return True
+        return False
+
+    has_move = False
+    for to in KING_MOVES[bk]:
+        if _adjacent(to, wk):
+            continue
+        if to == x:
+            # Capturing the last piece draws
+            return False
+        if _piece_attacks(piece, x, to, wk):
+            continue
+        has_move = True
+        if status[index_of(signature, wk, to, x, True)] != WIN:
+            return False
+    if has_move:
+        return True
+    # No legal moves: mate wins, stalemate draws
+    return _piece_attacks(piece, x, bk, wk)
+
+
+def _sweep(task):
+    signature, status, start, end = task
+    won = []
+    for index in range(start, end):
+        if status[index] != UNKNOWN:
+            continue
+        wk, bk, x, strong_to_move = decode_index(signature, index)
+        if _resolve(signature, status, wk, bk, x, strong_to_move):
+            won.append(index)
+    return won
+
+
+def generate(signature: str, pool: Pool, known: Dict[str, bytes], chunks: int = 32) -> bytes:
+    """Generate one table, returned as one status byte per position."""
+    piece = SIGNATURE_PIECES[signature]
+    size = table_size(signature)
+    status = bytearray(size)
+    for index in range(size):
+        wk, bk, x, strong_to_move = decode_index(signature, index)
+        if not _is_legal(piece, wk, bk, x, strong_to_move):
+            status[index] = ILLEGAL
+
+    step = (size + chunks - 1) // chunks
+    while True:
+        snapshot = bytes(status)
+        tasks = [(signature, snapshot, start, min(size, start + step)) for start in range(0, size, step)]
+        changed = 0
+        for won in pool.imap_unordered(_sweep, tasks):
+            for index in won:
+                status[index] = WIN
+            changed += len(won)
+        if not changed:
+            return bytes(status)
+
+
+def pack(status: bytes) -> bytes:
+    """Pack a status table into one bit per position."""
+    packed = bytearray((len(status) + 7) // 8)
+    for index, value in enumerate(status):
+        if value == WIN:
+            packed[index >> 3] |= 1 << (index & 7)
+    return bytes(packed)
+
+
+def generate_all(output_dir: str, workers: Optional[int] = None):
+    os.makedirs(output_dir, exist_ok=True)
+    known: Dict[str, bytes] = {}
+    for signature in SIGNATURES:
+        start = time.time()
+        with Pool(processes=workers, initializer=_init_worker, initargs=(known,)) as pool:
+            status = generate(signature, pool, known)
+        known[signature] = status
+        path = os.path.join(output_dir, f"{signature}.bb")
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(pack(status))
+        wins = sum(1 for value in status if value == WIN)
+        print(f"{signature}: {wins} wins of {len(status)} positions in {time.time() - start:.1f}s -> {path}")
+
+
+class Bitbases:
+    """Loaded bitbases, probed with an engine Board."""
+
+    def __init__(self, tables: Dict[str, bytes]):
+        self.tables = tables
+        self.probes = 0
+
+    @classmethod
+    def load(cls, directory: str) -> 'Bitbases':
+        tables = {}
+        for signature in SIGNATURES:
+            path = os.path.join(directory, f"{signature}.bb")
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            if data[:4] != MAGIC or len(data) - 4 != (table_size(signature) + 7) // 8:
+                raise ValueError(f"{path!r} is not a valid {signature} bitbase")
+            tables[signature] = data[4:]
+        return cls(tables)
+
+    def _find_signature(self, board):
+        """Pieces of a position with exactly three men, or None."""
+        pieces = []
+        for row in range(8):
+            for col in range(8):
+                piece = board.grid[row][col]
+                if piece is not None:
+                    pieces.append((piece, row * 8 + col))
+                    if len(pieces) > 3:
+                        return None
+        if len(pieces) != 3:
+            return None
+        return pieces
+
+    def probe(self, board, side_to_move: str) -> Optional[int]:
+        """
+        Result for the side to move: 1 win, 0 draw, -1 loss,
+        or None if the position is not covered.
+        """
+        pieces = self._find_signature(board)
+        if pieces is None:
+            return None
+        kings = {}
+        extra = None
+        for piece, sq in pieces:
+            if piece.__class__.__name__ == 'King':
+                kings[piece.color] = sq
+            else:
+                extra = (piece, sq)
+        if extra is None or len(kings) != 2:
+            return None
+        signature = PIECE_SIGNATURES.get(extra[0].__class__.__name__)
+        if signature not in self.tables:
+            return None
+
+        strong = extra[0].color
+        weak = 'black' if strong == 'white' else 'white'
+        wk, bk, x = kings[strong], kings[weak], extra[1]
+        if strong == 'black':
+            wk, bk, x = wk ^ 56, bk ^ 56, x ^ 56
+
+        self.probes += 1
+        index = index_of(signature, wk, bk, x, side_to_move == strong)
+        if not self.tables[signature][index >> 3] >> (index & 7) & 1:
+            return 0
+        return 1 if side_to_move == strong else -1
+
+
+def win_progress(board, strong: str) -> float:
+    """
+    Small bonus (in pawns) that tells the search how far a won bitbase
+    position has progressed, so it heads for mate or promotion instead of
+    shuffling between equally won positions.
+    """
+    kings = {}
+    extra = None
+    for row in range(8):
+        for col in range(8):
+            piece = board.grid[row][col]
+            if piece is None:
+                continue
+            if piece.__class__.__name__ == 'King':
+                kings[piece.color] = (row, col)
+            else:
+                extra = (piece, (row, col))
+    if extra is None or len(kings) != 2:
+        return 0.0
+    weak = 'black' if strong == 'white' else 'white'
+    weak_row, weak_col = kings[weak]
+    strong_row, strong_col = kings[strong]
+    king_distance = max(abs(weak_row - strong_row), abs(weak_col - strong_col))
+    if extra[0].__class__.__name__ == 'Pawn':
+        row = extra[1][0]
+        advance = row if strong == 'white' else 7 - row
+        return advance * 0.5 - king_distance * 0.05
+    edge_distance = min(weak_row, 7 - weak_row) + min(weak_col, 7 - weak_col)
+    # Size of the box the rook or queen confines the weak king to
+    row, col = extra[1]
+    rows = 8 if row == weak_row else (7 - row if weak_row > row else row)
+    cols = 8 if col == weak_col else (7 - col if weak_col > col else col)
+    return (64 - rows * cols) * 0.05 + (6 - edge_distance) * 0.2 + (7 - king_distance) * 0.1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate KQK, KRK and KPK bitbases.')
+    parser.add_argument('--output-dir', default=os.path.join(os.path.dirname(__file__), 'bitbases'),
+                        help='Directory for the .bb files')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+    generate_all(args.output_dir, args.workers)
+
+
+if __name__ == '__main__':
+    main()
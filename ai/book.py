@@ -0,0 +1,201 @@
+"""
+Polyglot opening book support
+"""
+import mmap
+import os
+import random
+import struct
+from typing import List, Optional, Tuple
+
+from ai.polyglot_random import POLYGLOT_RANDOM64
+
+
+# key, move, weight, learn - big endian, 16 bytes per entry
+ENTRY_STRUCT = struct.Struct('>QHHI')
+KEY_STRUCT = struct.Struct('>Q')
+
+POLYGLOT_PIECE_TYPES = {
+    'Pawn': 0,
+    'Knight': 1,
+    'Bishop': 2,
+    'Rook': 3,
+    'Queen': 4,
+    'King': 5,
+}
+PROMOTION_CODES = {'n': 1, 'b': 2, 'r': 3, 'q': 4}
+PROMOTION_LETTERS = {code: letter for letter, code in PROMOTION_CODES.items()}
+
+
+def polyglot_key(board, side_to_move: str) -> int:
+    """Polyglot Zobrist key of the position."""
+    key = 0
+    for row in range(8):
+        for col in range(8):
+            piece = board.get_piece((row, col))
+            if piece:
+                kind = 2 * POLYGLOT_PIECE_TYPES[piece.__class__.__name__] + (1 if piece.color == 'white' else 0)
+                key ^= POLYGLOT_RANDOM64[64 * kind + row * 8 + col]
+
+    rights = board.castling_rights
+    if rights['white']['K']:
+        key ^= POLYGLOT_RANDOM64[768]
+    if rights['white']['Q']:
+        key ^= POLYGLOT_RANDOM64[769]
+    if rights['black']['K']:
+        key ^= POLYGLOT_RANDOM64[770]
+    if rights['black']['Q']:
+        key ^= POLYGLOT_RANDOM64[771]
+
+    # The en passant file only counts if a pawn can actually capture there
+    if board.en_passant_target:
+        ep_row, ep_col = board.en_passant_target
+        pawn_row = ep_row - 1 if side_to_move == 'white' else ep_row + 1
+        for col in (ep_col - 1, ep_col + 1):
+            if 0 <= col < 8:
+                piece = board.get_piece((pawn_row, col))
+                if piece and piece.color == side_to_move and piece.__class__.__name__ == 'Pawn':
+                    key ^= POLYGLOT_RANDOM64[772 + ep_col]
+                    break
+
+    if side_to_move == 'white':
+        key ^= POLYGLOT_RANDOM64[780]
+    return key
+
+
+def decode_move(raw_move: int, board) -> Tuple[Tuple[int, int], Tuple[int, int], Optional[str]]:
+    """Convert a Polyglot move to the engine's (start, end, promotion) tuple."""
+    to_sq = raw_move & 0x3f
+    from_sq = (raw_move >> 6) & 0x3f
+    promotion = PROMOTION_LETTERS.get((raw_move >> 12) & 0x7)
+    start = (from_sq // 8, from_sq % 8)
+    end = (to_sq // 8, to_sq % 8)
+
+    # Polyglot encodes castling as the king capturing its own rook
+    piece = board.get_piece(start)
+    if piece and piece.__class__.__name__ == 'King' and start[1] == 4 and end[0] == start[0]:
+        if end[1] == 7:
+            end = (end[0], 6)
+        elif end[1] == 0:
+            end = (end[0], 2)
+    return start, end, promotion
+
+
+def encode_move(move, board) -> int:
+    """Convert an engine move tuple to its Polyglot encoding."""
+    start, end = move[0], move[1]
+    promotion = move[2] if len(move) > 2 else None
+    piece = board.get_piece(start)
+    if piece and piece.__class__.__name__ == 'King' and abs(end[1] - start[1]) == 2:
+        end = (end[0], 7 if end[1] == 6 else 0)
+    raw_move = (start[0] * 8 + start[1]) << 6 | (end[0] * 8 + end[1])
+    if promotion:
+        raw_move |= PROMOTION_CODES[promotion.lower()] << 12
+    return raw_move
+
+
+class PolyglotBook:
+    """
+    Read-only Polyglot book.
+
+    The file is memory-mapped, so opening it costs nothing regardless of its
+    size, and positions are found by binary search over the sorted keys.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            size = os.fstat(fd).st_size
+            if size % ENTRY_STRUCT.size != 0:
+                raise ValueError(f"{path!r} is not a valid Polyglot book (size {size})")
+            self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ) if size else None
+        finally:
+            os.close(fd)
+        if self._mmap is not None and hasattr(self._mmap, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            self._mmap.madvise(mmap.MADV_RANDOM)
+        self._size = size // ENTRY_STRUCT.size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getstate__(self):
+        # A memory map cannot be pickled; the copy maps the file again
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _key_at(self, index: int) -> int:
+        return KEY_STRUCT.unpack_from(self._mmap, index * ENTRY_STRUCT.size)[0]
+
+    def _lower_bound(self, key: int) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find_entries(self, key: int) -> List[Tuple[int, int, int]]:
+        """All (raw_move, weight, learn) entries stored for a key."""
+        entries = []
+        if self._mmap is None:
+            return entries
+        index = self._lower_bound(key)
+        while index < self._size:
+            entry_key, raw_move, weight, learn = ENTRY_STRUCT.unpack_from(self._mmap, index * ENTRY_STRUCT.size)
+            if entry_key != key:
+                break
+            entries.append((raw_move, weight, learn))
+            index += 1
+        return entries
+
+    def get_moves(self, board, side_to_move: str) -> List[Tuple[Tuple[Tuple[int, int], Tuple[int, int], Optional[str]], int]]:
+        """Book moves for the position as (move, weight) pairs."""
+        key = polyglot_key(board, side_to_move)
+        return [(decode_move(raw_move, board), weight) for raw_move, weight, _ in self.find_entries(key)]
+
+    def choose_move(self, board, side_to_move: str, selection: str = 'weighted',
+                    rng: Optional[random.Random] = None, legal_moves=None):
+        """
+        Pick a book move.
+
+        Args:
+            board: Position to look up
+            side_to_move: 'white' or 'black'
+            selection: 'weighted' for a random move proportional to its weight,
+                'best' for the highest weight
+            rng: Optional random generator for weighted selection
+            legal_moves: Optional list of legal moves; book moves outside it
+                (hash collisions, corrupted entries) are ignored
+
+        Returns:
+            A move tuple, or None when the position is not in the book
+        """
+        candidates = [(move, weight) for move, weight in self.get_moves(board, side_to_move) if weight > 0]
+        if legal_moves is not None:
+            candidates = [(move, weight) for move, weight in candidates if move in legal_moves]
+        if not candidates:
+            return None
+        if selection == 'best':
+            return max(candidates, key=lambda item: item[1])[0]
+        rng = rng or random
+        pick = rng.randint(1, sum(weight for _, weight in candidates))
+        for move, weight in candidates:
+            pick -= weight
+            if pick <= 0:
+                return move
+        return candidates[-1][0]
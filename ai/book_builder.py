@@ -0,0 +1,179 @@
+"""
+Build a Polyglot opening book from PGN collections.
+
+PGN files are split into byte ranges on game boundaries, and each range is
+replayed in a worker process that counts (position key, move) statistics.
+The per-chunk counts are merged as they arrive, rare lines are pruned and
+the result is written as a sorted Polyglot book that ai.book.PolyglotBook
+can memory-map.
+
+    python -m ai.book_builder games/*.pgn -o house.bin --max-ply 24 --min-games 5
+"""
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Tuple
+
+from chess_logic.board import Board
+from ai.book import ENTRY_STRUCT, encode_move, polyglot_key
+from ai.pgn import iter_games, san_to_move
+
+
+# (key, raw_move) -> [games, points], points count 2 per win and 1 per draw
+# from the point of view of the side that played the move
+MoveStats = Dict[Tuple[int, int], List[int]]
+
+RESULT_POINTS = {'1-0': (2, 0), '0-1': (0, 2), '1/2-1/2': (1, 1)}
+GAME_START = b'[Event '
+
+
+def find_chunks(path: str, chunk_size: int) -> List[Tuple[str, int, int]]:
+    """Split a PGN file into (path, start, end) byte ranges that begin on a game."""
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        offset = chunk_size
+        while offset < size:
+            f.seek(offset)
+            f.readline()
+            while True:
+                position = f.tell()
+                line = f.readline()
+                if not line:
+                    position = size
+                    break
+                if line.startswith(GAME_START):
+                    break
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+            offset = position + chunk_size
+    boundaries.append(size)
+    return [(path, start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def _read_lines(path: str, start: int, end: int) -> Iterator[str]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            line = f.readline()
+            if not line:
+                break
+            remaining -= len(line)
+            yield line.decode('utf-8', errors='replace')
+
+
+def count_chunk(task) -> Tuple[MoveStats, int]:
+    """Map step: replay every game in a byte range and count book statistics."""
+    path, start, end, max_ply = task
+    stats: MoveStats = {}
+    games = 0
+    for headers, moves in iter_games(_read_lines(path, start, end)):
+        points = RESULT_POINTS.get(headers.get('Result'))
+        if points is None:
+            continue
+        board = Board()
+        if 'FEN' in headers:
+            # Games from a set-up position start at that position's game ply
+            try:
+                color = board.load_from_fen(headers['FEN'])
+            except ValueError:
+                continue
+        else:
+            board.setup_initial_position()
+            color = 'white'
+        games += 1
+        for san in moves[:max(0, max_ply - board.ply_count)]:
+            try:
+                move = san_to_move(board, san, color)
+            except ValueError:
+                break
+            key = (polyglot_key(board, color), encode_move(move, board))
+            if not board.move_piece(move[0], move[1], promotion=move[2]):
+                break
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [0, 0]
+            entry[0] += 1
+            entry[1] += points[0] if color == 'white' else points[1]
+            color = 'black' if color == 'white' else 'white'
+    return stats, games
+
+
+def merge_stats(total: MoveStats, part: MoveStats):
+    """Reduce step: add one chunk's counts into the running total."""
+    for key, (games, points) in part.items():
+        entry = total.get(key)
+        if entry is None:
+            total[key] = [games, points]
+        else:
+            entry[0] += games
+            entry[1] += points
+
+
+def build_entries(stats: MoveStats, min_games: int) -> List[Tuple[int, int, int]]:
+    """Prune rare moves and turn counts into sorted (key, raw_move, weight) entries."""
+    kept = [(key, raw_move, points) for (key, raw_move), (games, points) in stats.items()
+            if games >= min_games and points > 0]
+    if not kept:
+        return []
+    # Polyglot weights are 16 bit
+    scale = min(1.0, 0xFFFF / max(points for _, _, points in kept))
+    entries = [(key, raw_move, max(1, int(points * scale))) for key, raw_move, points in kept]
+    entries.sort(key=lambda entry: (entry[0], -entry[2], entry[1]))
+    return entries
+
+
+def write_book(path: str, entries: List[Tuple[int, int, int]]):
+    with open(path, 'wb') as f:
+        for key, raw_move, weight in entries:
+            f.write(ENTRY_STRUCT.pack(key, raw_move, weight, 0))
+
+
+def build_book(pgn_paths: List[str], output: str, max_ply: int = 24, min_games: int = 3,
+               workers: int = None, chunk_mb: float = 16.0) -> Tuple[int, int]:
+    """
+    Build a book from PGN files.
+
+    Returns:
+        (games replayed, book entries written)
+    """
+    chunk_size = max(1, int(chunk_mb * 1024 * 1024))
+    tasks = [(path, start, end, max_ply)
+             for pgn_path in pgn_paths
+             for path, start, end in find_chunks(pgn_path, chunk_size)]
+
+    stats: MoveStats = {}
+    games = 0
+    with Pool(processes=workers) as pool:
+        for part, part_games in pool.imap_unordered(count_chunk, tasks):
+            merge_stats(stats, part)
+            games += part_games
+
+    entries = build_entries(stats, min_games)
+    write_book(output, entries)
+    return games, len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a Polyglot opening book from PGN files.')
+    parser.add_argument('pgn', nargs='+', help='PGN files to read')
+    parser.add_argument('-o', '--output', required=True, help='Output .bin book')
+    parser.add_argument('--max-ply', type=int, default=24, help='Only record moves up to this ply')
+    parser.add_argument('--min-games', type=int, default=3, help='Drop moves played in fewer games')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-mb', type=float, default=16.0, help='Size of the PGN ranges given to workers')
+    args = parser.parse_args()
+
+    start = time.time()
+    games, entries = build_book(args.pgn, args.output, args.max_ply, args.min_games, args.workers, args.chunk_mb)
+    elapsed = time.time() - start
+    rate = games / elapsed if elapsed > 0 else 0.0
+    print(f"Replayed {games} games in {elapsed:.1f}s ({rate:.0f} games/s), wrote {entries} entries to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
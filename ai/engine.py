@@ -6,7 +6,7 @@ import time
 import random
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple, Optional, List
+from typing import Callable, Tuple, Optional, List
 
 current_path = Path(__file__).resolve()
 project_root = current_path.parents[1]
@@ -16,11 +16,37 @@ if str(project_root) not in sys.path:
 from chess_logic.board import Board
 from chess_logic.pieces import Pawn, Queen, Rook, Bishop, Knight
 from ai.evaluator import ChessEvaluator
+from ai.see import see, captured_value
+from ai.time_manager import SearchLimits, TimeManager
+from ai.book import PolyglotBook
+from ai.bitbase import Bitbases, win_progress
+from ai.search_info import SearchInfo
+from ai.search_process import SearchHandle, SearchWorker
 
 
 TT_EXACT = 0
 TT_LOWER = 1
 TT_UPPER = 2
+# Rough size of one transposition table slot (key, TTEntry and age)
+TT_ENTRY_BYTES = 200
+# Transposition table size until set_hash_size() is called
+TT_DEFAULT_MB = 64
+
+# Engine attributes a search worker copies whenever they change (see search_settings)
+SEARCH_SETTINGS = ('depth', 'multi_pv', 'contempt', 'lazy_eval', 'use_randomness', 'randomness',
+                   'book', 'book_max_ply', 'book_selection', 'bitbases', 'evaluator')
+
+# Default number of eval cache slots (a power of two)
+EVAL_CACHE_ENTRIES = 1 << 16
+
+# History scores are kept within +-HISTORY_MAX
+HISTORY_MAX = 16384
+PIECE_TYPE_INDEX = {'Pawn': 0, 'Knight': 1, 'Bishop': 2, 'Rook': 3, 'Queen': 4, 'King': 5}
+# TT scores are path-dependent this close to a fifty-move draw, so they are not trusted
+TT_HALFMOVE_LIMIT = 90
+# Continuation history is indexed by (piece type, to square) of the previous
+# move and of the current one, per side to move
+CONT_KEYS = 6 * 64
 
 
 @dataclass
@@ -31,22 +57,165 @@ class TTEntry:
     best_move: Optional[Tuple[Tuple[int, int], Tuple[int, int], Optional[str]]]
 
 
+class TranspositionTable:
+    """
+    Fixed-size direct-mapped table of TTEntry, indexed by hash % capacity.
+
+    A full slot keeps its entry against a shallower result for another
+    position, unless the entry was stored before the current search.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.clear()
+
+    def clear(self):
+        self._keys = [None] * self.capacity
+        self._entries = [None] * self.capacity
+        self._ages = [0] * self.capacity
+        self.generation = 0
+        self.used = 0
+
+    def __len__(self) -> int:
+        return self.used
+
+    def __getstate__(self):
+        # Copies sent to a search worker start empty instead of pickling every entry
+        return {'capacity': self.capacity}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'])
+
+    def new_search(self):
+        """Age the stored entries so the next search may replace them."""
+        self.generation += 1
+
+    def get(self, key: int) -> Optional[TTEntry]:
+        slot = key % self.capacity
+        if self._keys[slot] == key:
+            return self._entries[slot]
+        return None
+
+    def store(self, key: int, entry: TTEntry):
+        slot = key % self.capacity
+        old_key = self._keys[slot]
+        if old_key is None:
+            self.used += 1
+        elif (old_key != key and self._ages[slot] == self.generation
+              and self._entries[slot].depth > entry.depth):
+            return
+        self._keys[slot] = key
+        self._entries[slot] = entry
+        self._ages[slot] = self.generation
+
+
 class ChessEngine:
-    def __init__(self, depth: int = 3):
+    def __init__(self, depth: int = 3, book: Optional[PolyglotBook] = None, bitbases: Optional[Bitbases] = None,
+                 evaluator=None):
         self.depth = depth
-        self.evaluator = ChessEvaluator()
+        self.book = book
+        self.bitbases = bitbases
+        # Book moves are only played up to this game ply
+        self.book_max_ply = 20
+        # 'weighted' (random, proportional to weight) or 'best'
+        self.book_selection = 'weighted'
+        # Anything with evaluate_position(board, checks) and PIECE_VALUES,
+        # e.g. ai.nnue.NNUEEvaluator; ChessEvaluator by default
+        self.evaluator = evaluator or ChessEvaluator()
         self.nodes_searched = 0
         self.q_nodes = 0
-        self.tt = {}
+        self.seldepth = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.eval_probes = 0
+        self.eval_hits = 0
+        # Quiescence stand-pat: skip the full evaluation when material and
+        # piece-square terms alone are far outside the window (see lazy_bound)
+        self.lazy_eval = True
+        self.lazy_probes = 0
+        self.lazy_exits = 0
+        self.set_hash_size(TT_DEFAULT_MB)
+        # Direct-mapped cache of evaluate_position() by board.piece_key
+        self.set_eval_cache_size(EVAL_CACHE_ENTRIES)
+        # Move ordering tables, kept across iterations and moves (see new_game)
         self.killer_moves = []
-        self.history = {}
+        self.history = []
+        self.countermoves = []
+        self.continuation_history = []
+        self._last_game_ply = None
         self.time_up = False
-        self.stop_time = None
+        self.time_manager = TimeManager()
+        self.ponder_move = None
+        # Number of best root moves to search for (MultiPV); results in top_lines
+        self.multi_pv = 1
+        self.top_lines = []
+        self._poll_countdown = 0
         self.MATE_SCORE = 100000
+        self.MAX_DEPTH = 64
+        # Score of a bitbase win, below any mate score
+        self.KNOWN_WIN = 1000.0
+        # Triangular PV table: row `ply` holds the best line from that ply,
+        # in columns ply .. pv_length[ply] - 1
+        self.pv_table = [[None] * (self.MAX_DEPTH + 1) for _ in range(self.MAX_DEPTH + 1)]
+        self.pv_length = [0] * (self.MAX_DEPTH + 1)
+        # Principal variation of the last search
+        self.pv = []
+        self._prev_pv = []
+        self._follow_pv = False
+        # (piece type, from square, to square) of the move made at each ply
+        self._ply_moves = [None] * (self.MAX_DEPTH + 1)
+        # Draw detection: position hash and halfmove clock at each ply of the
+        # current line, plus the game positions that already occurred twice
+        self._line_hashes = [0] * (self.MAX_DEPTH + 2)
+        self._halfmove_clocks = [0] * (self.MAX_DEPTH + 2)
+        self._game_repeats = set()
+        self._root_color = 'white'
+        # Value of a draw for the side the engine plays, in pawns below zero
+        # (positive contempt avoids draws, negative contempt seeks them)
+        self.contempt = 0.0
+        # Safety margin (in pawns) added to the material gain bound in delta pruning
+        self.DELTA_MARGIN = 2.0
+
+        # Print a summary line after every search
+        self.verbose = True
+        # Called with a SearchInfo after every completed iteration
+        self.info_callback: Optional[Callable[[SearchInfo], None]] = None
 
         self.use_randomness = False
         self.randomness = 0.0
         self._zobrist = self._init_zobrist()
+        # Worker process for start_search(), created on first use
+        self._worker: Optional[SearchWorker] = None
+        self.new_game()
+
+    def __getstate__(self):
+        # Sent to the search worker process: callbacks and the worker itself stay behind
+        state = self.__dict__.copy()
+        state['info_callback'] = None
+        state['_worker'] = None
+        return state
+
+    def search_settings(self) -> dict:
+        """
+        What a search depends on besides the position. Objects compare by
+        identity, so a replaced book or evaluator counts as a change; the
+        evaluator's piece values and tables are process-wide and go along.
+        """
+        settings = {name: getattr(self, name) for name in SEARCH_SETTINGS}
+        parameters = getattr(self.evaluator, 'parameters', None)
+        settings['evaluator_parameters'] = parameters() if parameters is not None else None
+        return settings
+
+    def apply_search_settings(self, settings: dict):
+        """Adopt settings from search_settings() of another engine; cached scores are dropped."""
+        for name in SEARCH_SETTINGS:
+            setattr(self, name, settings[name])
+        if settings['evaluator_parameters'] is not None:
+            self.evaluator.set_parameters(settings['evaluator_parameters'])
+        self.tt.clear()
+        self.set_eval_cache_size(len(self._eval_keys))
 
     def _init_zobrist(self):
         rng = random.Random(0)
@@ -99,13 +268,125 @@ class ChessEngine:
 
         return h
 
+    def new_game(self):
+        """Forget everything learned from earlier positions."""
+        self.tt.clear()
+        self.set_eval_cache_size(len(self._eval_keys))
+        self.killer_moves = [[None, None] for _ in range(self.MAX_DEPTH + 1)]
+        # Butterfly history: [color][from][to]
+        self.history = [0] * (2 * 64 * 64)
+        # Reply that refuted the previous move: [color][previous from][previous to]
+        self.countermoves = [None] * (2 * 64 * 64)
+        self.continuation_history = [0] * (2 * CONT_KEYS * CONT_KEYS)
+        self._last_game_ply = None
+
+    def _age_tables(self, board: Board):
+        """Decay the ordering tables between searches and realign killers to the new root."""
+        self.history = [value // 2 for value in self.history]
+        self.continuation_history = [value // 2 for value in self.continuation_history]
+        game_ply = getattr(board, 'ply_count', None)
+        shift = None
+        if game_ply is not None and self._last_game_ply is not None:
+            shift = game_ply - self._last_game_ply
+        if shift is None or shift < 0 or shift > self.MAX_DEPTH:
+            self.killer_moves = [[None, None] for _ in range(self.MAX_DEPTH + 1)]
+        elif shift:
+            self.killer_moves = self.killer_moves[shift:] + [[None, None] for _ in range(shift)]
+        self._last_game_ply = game_ply
+
+    @staticmethod
+    def _move_key(board: Board, move):
+        """(piece type, from square, to square) of a move not yet made."""
+        (from_row, from_col), (to_row, to_col) = move[0], move[1]
+        piece = board.get_piece(move[0])
+        return PIECE_TYPE_INDEX[piece.__class__.__name__], from_row * 8 + from_col, to_row * 8 + to_col
+
+    def _update_quiet_history(self, color: str, ply: int, best_key, tried_keys, depth: int):
+        """Reward the quiet move that caused a cutoff and penalize the quiets tried before it."""
+        bonus = min(32 * depth * depth, HISTORY_MAX // 4)
+        side = 0 if color == 'white' else 1
+        previous = self._ply_moves[ply - 1] if ply > 0 else None
+        cont_base = None
+        if previous is not None:
+            cont_base = (side * CONT_KEYS + previous[0] * 64 + previous[2]) * CONT_KEYS
+            self.countermoves[side * 4096 + previous[1] * 64 + previous[2]] = (best_key[1], best_key[2])
+        for key in tried_keys:
+            delta = bonus if key is best_key else -bonus
+            index = side * 4096 + key[1] * 64 + key[2]
+            value = self.history[index]
+            self.history[index] = value + delta - value * bonus // HISTORY_MAX
+            if cont_base is not None:
+                index = cont_base + key[0] * 64 + key[2]
+                value = self.continuation_history[index]
+                self.continuation_history[index] = value + delta - value * bonus // HISTORY_MAX
+
+    @property
+    def tt_capacity(self) -> int:
+        return self.tt.capacity
+
+    def set_hash_size(self, megabytes: int):
+        """Resize (and clear) the transposition table to roughly `megabytes` of memory."""
+        self.tt = TranspositionTable(megabytes * 1024 * 1024 // TT_ENTRY_BYTES)
+
+    def set_eval_cache_size(self, entries: int):
+        """Resize (and clear) the eval cache; `entries` is rounded down to a power of two."""
+        size = 1 << max(0, entries.bit_length() - 1)
+        self._eval_mask = size - 1
+        self._eval_keys = [None] * size
+        self._eval_scores = [0.0] * size
+
+    def _static_eval(self, board: Board, color: Optional[str] = None, in_check: Optional[bool] = None) -> float:
+        # The static score depends only on piece placement (not on the side to move,
+        # castling or en passant), so the incrementally kept piece key identifies it
+        key = board.piece_key
+        slot = key & self._eval_mask
+        self.eval_probes += 1
+        if self._eval_keys[slot] == key:
+            self.eval_hits += 1
+            return self._eval_scores[slot]
+        checks = None
+        if color is not None and in_check is not None:
+            # Only the side to move can be in check: the search's own test gives the check term
+            checks = (in_check, False) if color == 'white' else (False, in_check)
+        score = self.evaluator.evaluate_position(board, checks)
+        self._eval_keys[slot] = key
+        self._eval_scores[slot] = score
+        return score
+
+    def _prepare_draw_detection(self, board: Board, color: str):
+        self._root_color = color
+        self._game_repeats = set()
+        # Returning to any earlier game position is a draw, as within the line
+        scratch = Board()
+        for key in getattr(board, 'repetition_counts', {}):
+            side = scratch.load_from_fen(key)
+            self._game_repeats.add(self._compute_hash(scratch, side))
+
+    def _is_repetition(self, position_hash: int, ply: int) -> bool:
+        if position_hash in self._game_repeats:
+            return True
+        # A repetition within the line counts as a draw already. Only positions
+        # since the last capture or pawn move, with the same side to move, can match
+        oldest = max(ply - self._halfmove_clocks[ply], 0)
+        for earlier in range(ply - 4, oldest - 1, -2):
+            if self._line_hashes[earlier] == position_hash:
+                return True
+        return False
+
+    def _draw_score(self, color: str) -> float:
+        return -self.contempt if color == self._root_color else self.contempt
+
     def _time_check(self):
-        if self.stop_time is None:
+        if self.time_up:
+            return True
+        # Only look at the clock every check_interval nodes
+        self._poll_countdown -= 1
+        if self._poll_countdown > 0:
             return False
-        if time.time() >= self.stop_time:
+        self._poll_countdown = self.time_manager.check_interval
+        if self.time_manager.should_stop(self.nodes_searched + self.q_nodes):
             self.time_up = True
-            return True
-        return False
+        return self.time_up
 
     def _piece_value(self, piece) -> int:
         return self.evaluator.PIECE_VALUES.get(piece.__class__.__name__, 0)
@@ -121,31 +402,77 @@ class ChessEngine:
                 return True
         return False
 
-    def _order_moves(self, board: Board, moves, tt_best, ply: int):
+    def _order_moves(self, board: Board, moves, tt_best, ply: int, pv_move=None):
+        previous = self._ply_moves[ply - 1] if ply > 0 else None
+        history = self.history
+        continuation = self.continuation_history
+        killers = self.killer_moves[ply] if ply < len(self.killer_moves) else ()
+
         def score_move(move):
+            if pv_move and move == pv_move:
+                return 2000000
             if tt_best and move == tt_best:
                 return 1000000
             start_pos, end_pos = move[0], move[1]
             piece = board.get_piece(start_pos)
-            captured = board.get_piece(end_pos)
             score = 0
-            if captured is not None:
-                score += 10000 + self._piece_value(captured) - self._piece_value(piece)
-            if piece and piece.__class__.__name__ == 'Pawn' and end_pos[0] in (0, 7):
+            if self._is_capture(board, move):
+                exchange = see(board, move, self.evaluator.PIECE_VALUES)
+                # Winning and even captures first, losing ones after the quiet moves
+                score += 10000 + exchange if exchange >= 0 else exchange
+                if piece.__class__.__name__ == 'Pawn' and end_pos[0] in (0, 7):
+                    score += 8000
+                return score
+            if piece.__class__.__name__ == 'Pawn' and end_pos[0] in (0, 7):
                 score += 8000
-            if self.killer_moves and ply < len(self.killer_moves) and move in self.killer_moves[ply]:
+            if move in killers:
                 score += 7000
-            score += self.history.get(move, 0)
-            return score
+            side = 0 if piece.color == 'white' else 1
+            from_sq = start_pos[0] * 8 + start_pos[1]
+            to_sq = end_pos[0] * 8 + end_pos[1]
+            quiet_score = history[side * 4096 + from_sq * 64 + to_sq]
+            if previous is not None:
+                if self.countermoves[side * 4096 + previous[1] * 64 + previous[2]] == (from_sq, to_sq):
+                    score += 6000
+                cont_base = (side * CONT_KEYS + previous[0] * 64 + previous[2]) * CONT_KEYS
+                quiet_score += continuation[cont_base + PIECE_TYPE_INDEX[piece.__class__.__name__] * 64 + to_sq]
+            # Two tables of +-HISTORY_MAX stay below the countermove bonus
+            return score + quiet_score // 8
 
         return sorted(moves, key=score_move, reverse=True)
 
-    def _evaluate_for(self, board: Board, color: str) -> float:
-        base_eval = self.evaluator.evaluate_position(board)
+    def _evaluate_for(self, board: Board, color: str, alpha: Optional[float] = None,
+                      beta: Optional[float] = None, in_check: Optional[bool] = None) -> float:
+        """
+        Static score from `color`'s side. Given a window, the result may be a
+        bound beyond it instead of the exact score (lazy evaluation).
+        `in_check` is whether `color` is in check, if the caller knows.
+        """
+        if alpha is not None and self.lazy_eval and not self.use_randomness:
+            bound = self._lazy_bound(board, color, alpha, beta)
+            if bound is not None:
+                return bound
+        base_eval = self._static_eval(board, color, in_check)
         if self.use_randomness and self.randomness > 0:
             base_eval += random.uniform(-self.randomness, self.randomness)
         return base_eval if color == 'black' else -base_eval
 
+    def _lazy_bound(self, board: Board, color: str, alpha: float, beta: float) -> Optional[float]:
+        lazy_bound = getattr(self.evaluator, 'lazy_bound', None)
+        if lazy_bound is None:
+            return None
+        self.lazy_probes += 1
+        # The evaluator scores for black
+        if color == 'black':
+            bound = lazy_bound(board, alpha, beta)
+        else:
+            bound = lazy_bound(board, -beta, -alpha)
+            if bound is not None:
+                bound = -bound
+        if bound is not None:
+            self.lazy_exits += 1
+        return bound
+
     def _make_move(self, board: Board, move, color: str):
         start_pos, end_pos = move[0], move[1]
         promotion = move[2] if len(move) > 2 else None
@@ -237,6 +564,10 @@ class ChessEngine:
             mid_row = (end_pos[0] + old_pos[0]) // 2
             board.en_passant_target = (mid_row, end_pos[1])
 
+        prev_incremental = board.incremental_state()
+        board.update_incremental(piece, start_pos, end_pos, captured_piece,
+                                 en_passant_capture_pos or end_pos, promoted_piece, rook_move)
+
         return (
             piece,
             captured_piece,
@@ -246,6 +577,7 @@ class ChessEngine:
             promoted_piece,
             prev_en_passant,
             prev_castling,
+            prev_incremental,
         )
 
     def _undo_move(self, board: Board, move, state):
@@ -259,6 +591,7 @@ class ChessEngine:
             promoted_piece,
             prev_en_passant,
             prev_castling,
+            prev_incremental,
         ) = state
 
         if rook_move:
@@ -286,46 +619,260 @@ class ChessEngine:
         board.castling_rights['white']['Q'] = prev_castling[1]
         board.castling_rights['black']['K'] = prev_castling[2]
         board.castling_rights['black']['Q'] = prev_castling[3]
-
-    def get_best_move(self, board: Board, color: str, time_limit: Optional[float] = None) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        board.restore_incremental(prev_incremental)
+
+    def get_best_move(self, board: Board, color: str, time_limit: Optional[float] = None,
+                      limits: Optional[SearchLimits] = None) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        if limits is None:
+            limits = SearchLimits(movetime=time_limit)
+        self._begin_search(color, limits)
+        return self._iterative_deepening(board, color, limits)
+
+    def get_top_moves(self, board: Board, color: str, count: int = 3, time_limit: Optional[float] = None,
+                      limits: Optional[SearchLimits] = None) -> List[Tuple[tuple, float, list]]:
+        """
+        Search the `count` best moves. Returns (move, score, pv) tuples, best
+        first, with scores from the side to move's point of view.
+        """
+        previous = self.multi_pv
+        self.multi_pv = count
+        try:
+            self.get_best_move(board, color, time_limit, limits)
+        finally:
+            self.multi_pv = previous
+        return self.top_lines
+
+    def start_search(self, board: Board, color: str, limits: Optional[SearchLimits] = None,
+                     ponder: bool = False, on_info: Optional[Callable[[SearchInfo], None]] = None) -> SearchHandle:
+        """
+        Search a snapshot of `board` in the worker process and return at once.
+
+        Poll the returned handle from the event loop; `on_info` is called
+        from poll() with the progress of every completed iteration. Starting
+        a new search abandons the previous one.
+        """
+        if self._worker is None:
+            self._worker = SearchWorker(self)
+        return self._worker.start(board, color, limits or SearchLimits(), ponder, on_info)
+
+    def close(self):
+        """Shut down the search worker process, if one was started."""
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+    def stop(self):
+        """Ask a search running in another thread to return as soon as possible."""
+        self.time_manager.stop()
+
+    def _begin_search(self, color: str, limits: SearchLimits, ponder: bool = False):
         self.nodes_searched = 0
         self.q_nodes = 0
+        self.seldepth = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.eval_probes = 0
+        self.eval_hits = 0
+        self.lazy_probes = 0
+        self.lazy_exits = 0
         self.time_up = False
-        self.stop_time = time.time() + time_limit if time_limit else None
+        self.ponder_move = None
+        self._poll_countdown = self.time_manager.check_interval
+        self.tt.new_search()
+        self.time_manager.start(limits, color, ponder)
 
+    def _iterative_deepening(self, board: Board, color: str, limits: SearchLimits):
         if hasattr(board, 'get_legal_moves_for_color_with_promotions'):
             legal_moves = board.get_legal_moves_for_color_with_promotions(color)
         else:
             legal_moves = board.get_legal_moves_for_color(color)
+        self.top_lines = []
         if not legal_moves:
             return None
 
-        best_move = legal_moves[0]
+        if self.book is not None and self.multi_pv <= 1 and getattr(board, 'ply_count', 0) < self.book_max_ply:
+            book_move = self.book.choose_move(board, color, self.book_selection, legal_moves=legal_moves)
+            if book_move is not None:
+                return book_move
 
-        for current_depth in range(1, self.depth + 1):
-            self.killer_moves = [[None, None] for _ in range(current_depth + 2)]
-            self.history = {}
-            alpha = -self.MATE_SCORE
-            beta = self.MATE_SCORE
-            score = self._search(board, current_depth, alpha, beta, color, 0)
+        self._age_tables(board)
+        self._prepare_draw_detection(board, color)
+        best_move = legal_moves[0]
+        score = 0
+        pv = [best_move]
+        lines = []
+        # Killers, the PV table and the per-ply arrays hold MAX_DEPTH plies
+        max_depth = min(limits.depth or (self.MAX_DEPTH if limits.infinite else self.depth), self.MAX_DEPTH)
+        last_iteration_time = 0.0
+        last_iteration_nodes = 0
+        nodes_before = 0
+
+        for current_depth in range(1, max_depth + 1):
+            if current_depth > 1 and not self.time_manager.can_start_iteration(last_iteration_time):
+                break
+            iteration_start = time.time()
+            prev_moves = [line[0] for line in lines] if self.multi_pv > 1 else [best_move]
+            # Search the previous principal variation first
+            self._prev_pv = pv
+            self._follow_pv = True
+            root_lines = self._search_root(board, legal_moves, current_depth, color, prev_moves, self.multi_pv)
+            if self.multi_pv > 1:
+                # An aborted iteration may have missed moves belonging in the list
+                if self.time_up and lines:
+                    break
+                lines = root_lines
+            changed = False
+            if root_lines:
+                # Moves are ordered with the previous best first, so a move
+                # found by an aborted iteration already beat it
+                changed = root_lines[0][0] != best_move
+                # Keep the complete previous line unless the aborted iteration found a new move
+                if changed or not self.time_up:
+                    best_move, score, pv = root_lines[0]
             if self.time_up:
                 break
-            root_hash = self._compute_hash(board, color)
-            entry = self.tt.get(root_hash)
-            if entry and entry.best_move:
-                best_move = entry.best_move
-
-        print(f"AI searched {self.nodes_searched} nodes ({self.q_nodes} qnodes), best score: {score:.2f}")
+            self.time_manager.on_iteration_complete(changed)
+            last_iteration_time = time.time() - iteration_start
+            total_nodes = self.nodes_searched + self.q_nodes
+            if self.info_callback is not None:
+                reported = lines if self.multi_pv > 1 else [(best_move, score, pv)]
+                for index, (move, line_score, line_pv) in enumerate(reported, 1):
+                    self.info_callback(self._search_info(
+                        current_depth, line_score, line_pv, index,
+                        total_nodes - nodes_before, last_iteration_nodes, last_iteration_time,
+                    ))
+            last_iteration_nodes = total_nodes - nodes_before
+            nodes_before = total_nodes
+
+        if self.multi_pv <= 1 or not lines:
+            lines = [(best_move, score, pv)]
+        self.top_lines = lines
+        self.pv = pv
+        self.ponder_move = pv[1] if len(pv) > 1 else self._expected_reply(board, best_move, color)
+        if self.verbose:
+            print(f"AI searched {self.nodes_searched} nodes ({self.q_nodes} qnodes), best score: {score:.2f}")
         return best_move
 
+    def _search_info(self, depth: int, score: float, pv, multipv: int,
+                     iteration_nodes: int, previous_nodes: int, iteration_time: float) -> SearchInfo:
+        elapsed = self.time_manager.elapsed()
+        total_nodes = self.nodes_searched + self.q_nodes
+        mate = None
+        if abs(score) >= self.MATE_SCORE - 1000:
+            plies = int(round(self.MATE_SCORE - abs(score)))
+            mate = (plies + 1) // 2 if score > 0 else -((plies + 1) // 2)
+        return SearchInfo(
+            depth=depth,
+            seldepth=max(self.seldepth, depth),
+            score=score,
+            mate=mate,
+            pv=pv,
+            multipv=multipv,
+            nodes=total_nodes,
+            qnodes=self.q_nodes,
+            iteration_nodes=iteration_nodes,
+            ebf=iteration_nodes / previous_nodes if previous_nodes else None,
+            time=elapsed,
+            iteration_time=iteration_time,
+            nps=int(total_nodes / elapsed) if elapsed > 0 else 0,
+            hashfull=len(self.tt) * 1000 // self.tt.capacity,
+            tt_probes=self.tt_probes,
+            tt_hits=self.tt_hits,
+            beta_cutoffs=self.beta_cutoffs,
+            first_move_cutoffs=self.first_move_cutoffs,
+            eval_probes=self.eval_probes,
+            eval_hits=self.eval_hits,
+            lazy_probes=self.lazy_probes,
+            lazy_exits=self.lazy_exits,
+        )
+
+    def _expected_reply(self, board: Board, move, color: str):
+        """Opponent's best reply to `move` according to the transposition table."""
+        next_color = 'white' if color == 'black' else 'black'
+        state = self._make_move(board, move, color)
+        entry = self.tt.get(self._compute_hash(board, next_color))
+        reply = None
+        if entry and entry.best_move:
+            if entry.best_move in board.get_legal_moves_for_color_with_promotions(next_color):
+                reply = entry.best_move
+        self._undo_move(board, move, state)
+        return reply
+
+    def _search_root(self, board: Board, legal_moves, depth: int, color: str, prev_moves, count: int = 1):
+        """
+        Return the `count` best root moves as (move, score, pv), best first.
+
+        Searching K lines is done in one pass rather than K passes with the
+        found moves excluded: alpha is the score of the K-th best move so far,
+        so only moves that enter the list are searched to an exact score.
+        """
+        beta = self.MATE_SCORE
+        ordered_moves = self._order_moves(board, legal_moves, prev_moves[0] if prev_moves else None, 0)
+        if len(prev_moves) > 1:
+            ordered_moves = prev_moves + [move for move in ordered_moves if move not in prev_moves]
+        next_color = 'white' if color == 'black' else 'black'
+        lines = []
+        root_hash = self._compute_hash(board, color)
+        self._line_hashes[0] = root_hash
+        self._halfmove_clocks[0] = getattr(board, 'halfmove_clock', 0)
+
+        for move in ordered_moves:
+            alpha = lines[-1][1] if len(lines) == count else -self.MATE_SCORE
+            move_key = self._move_key(board, move)
+            self._ply_moves[0] = move_key
+            reversible = move_key[0] != 0 and not self._is_capture(board, move)
+            self._halfmove_clocks[1] = self._halfmove_clocks[0] + 1 if reversible else 0
+            state = self._make_move(board, move, color)
+            score = -self._search(board, depth - 1, -beta, -alpha, next_color, 1)
+            self._undo_move(board, move, state)
+
+            if self.time_up:
+                break
+            if len(lines) < count or score > alpha:
+                pv = [move] + self.pv_table[1][1:self.pv_length[1]]
+                lines.append((move, score, pv))
+                lines.sort(key=lambda line: line[1], reverse=True)
+                del lines[count:]
+            self._follow_pv = False
+
+        if lines and not self.time_up:
+            best_move, best_score, _ = lines[0]
+            self.tt.store(root_hash, TTEntry(depth, best_score, TT_EXACT, best_move))
+        return lines
+
     def _search(self, board: Board, depth: int, alpha: float, beta: float, color: str, ply: int) -> float:
+        self.pv_length[ply] = ply
+        # The score of an aborted search is never used
         if self._time_check():
-            return self._evaluate_for(board, color)
+            return 0
 
         self.nodes_searched += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+
         position_hash = self._compute_hash(board, color)
+        self._line_hashes[ply] = position_hash
+        halfmove_clock = self._halfmove_clocks[ply]
+        # Checked before the TT, whose scores do not depend on the path
+        if self._is_repetition(position_hash, ply):
+            return self._draw_score(color)
+        # Tested once per node: the fifty-move rule, bitbases, mate and the static eval need it
+        in_check = board.is_in_check(color)
+        if halfmove_clock >= 100 and not in_check:
+            return self._draw_score(color)
+
+        if self.bitbases is not None:
+            known = self._probe_bitbases(board, color, ply, in_check)
+            if known is not None:
+                return known
+
         entry = self.tt.get(position_hash)
-        if entry and entry.depth >= depth:
+        self.tt_probes += 1
+        if entry:
+            self.tt_hits += 1
+        if entry and entry.depth >= depth and halfmove_clock < TT_HALFMOVE_LIMIT:
             if entry.flag == TT_EXACT:
                 return entry.score
             if entry.flag == TT_LOWER and entry.score >= beta:
@@ -334,43 +881,63 @@ class ChessEngine:
                 return entry.score
 
         if depth == 0:
-            return self._quiescence(board, alpha, beta, color, ply)
+            return self._quiescence(board, alpha, beta, color, ply, in_check)
 
         if hasattr(board, 'get_legal_moves_for_color_with_promotions'):
             legal_moves = board.get_legal_moves_for_color_with_promotions(color)
         else:
             legal_moves = board.get_legal_moves_for_color(color)
         if not legal_moves:
-            if board.is_in_check(color):
+            if in_check:
                 return -self.MATE_SCORE + ply
             return 0
 
         tt_best = entry.best_move if entry else None
-        ordered_moves = self._order_moves(board, legal_moves, tt_best, ply)
+        pv_move = None
+        if self._follow_pv:
+            if ply < len(self._prev_pv) and self._prev_pv[ply] in legal_moves:
+                pv_move = self._prev_pv[ply]
+            else:
+                self._follow_pv = False
+        ordered_moves = self._order_moves(board, legal_moves, tt_best, ply, pv_move)
 
         best_move = None
         alpha_orig = alpha
         next_color = 'white' if color == 'black' else 'black'
-
-        for move in ordered_moves:
+        quiets_tried = []
+
+        for move_index, move in enumerate(ordered_moves):
+            move_key = self._move_key(board, move)
+            capture = self._is_capture(board, move)
+            if not capture:
+                quiets_tried.append(move_key)
+            self._ply_moves[ply] = move_key
+            self._halfmove_clocks[ply + 1] = 0 if capture or move_key[0] == 0 else halfmove_clock + 1
             state = self._make_move(board, move, color)
             score = -self._search(board, depth - 1, -beta, -alpha, next_color, ply + 1)
             self._undo_move(board, move, state)
+            self._follow_pv = False
 
             if self.time_up:
-                return self._evaluate_for(board, color)
+                return 0
 
             if score > alpha:
                 alpha = score
                 best_move = move
+                self.pv_table[ply][ply] = move
+                child_length = self.pv_length[ply + 1]
+                self.pv_table[ply][ply + 1:child_length] = self.pv_table[ply + 1][ply + 1:child_length]
+                self.pv_length[ply] = child_length
                 if alpha >= beta:
-                    if not self._is_capture(board, move):
-                        if ply < len(self.killer_moves):
-                            killers = self.killer_moves[ply]
-                            if move != killers[0]:
-                                killers[1] = killers[0]
-                                killers[0] = move
-                        self.history[move] = self.history.get(move, 0) + depth * depth
+                    self.beta_cutoffs += 1
+                    if move_index == 0:
+                        self.first_move_cutoffs += 1
+                    if not capture:
+                        killers = self.killer_moves[ply]
+                        if move != killers[0]:
+                            killers[1] = killers[0]
+                            killers[0] = move
+                        self._update_quiet_history(color, ply, move_key, quiets_tried, depth)
                     break
 
         flag = TT_EXACT
@@ -379,15 +946,34 @@ class ChessEngine:
         elif alpha >= beta:
             flag = TT_LOWER
 
-        self.tt[position_hash] = TTEntry(depth, alpha, flag, best_move)
+        self.tt.store(position_hash, TTEntry(depth, alpha, flag, best_move))
         return alpha
 
-    def _quiescence(self, board: Board, alpha: float, beta: float, color: str, ply: int) -> float:
+    def _probe_bitbases(self, board: Board, color: str, ply: int, in_check: bool) -> Optional[float]:
+        result = self.bitbases.probe(board, color)
+        if result is None:
+            return None
+        if result == 0:
+            return self._draw_score(color)
+        if result > 0:
+            return self.KNOWN_WIN + win_progress(board, color) - ply * 0.01
+        # Let the search find the mate itself when the loser is in check
+        if in_check:
+            return None
+        next_color = 'white' if color == 'black' else 'black'
+        return -(self.KNOWN_WIN + win_progress(board, next_color) - ply * 0.01)
+
+    def _quiescence(self, board: Board, alpha: float, beta: float, color: str, ply: int,
+                    in_check: Optional[bool] = None) -> float:
         if self._time_check():
-            return self._evaluate_for(board, color)
+            return 0
 
         self.q_nodes += 1
-        stand_pat = self._evaluate_for(board, color)
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if in_check is None:
+            in_check = board.is_in_check(color)
+        stand_pat = self._evaluate_for(board, color, alpha, beta, in_check)
         if stand_pat >= beta:
             return beta
         if stand_pat > alpha:
@@ -401,7 +987,24 @@ class ChessEngine:
         if not capture_moves:
             return alpha
 
-        ordered_moves = self._order_moves(board, capture_moves, None, ply)
+        # Delta pruning: even the best possible gain cannot raise alpha
+        max_gain = self.evaluator.PIECE_VALUES['Queen']
+        if any(len(m) > 2 and m[2] for m in capture_moves):
+            max_gain += self.evaluator.PIECE_VALUES['Queen'] - self.evaluator.PIECE_VALUES['Pawn']
+        if stand_pat + max_gain / 100 + self.DELTA_MARGIN < alpha:
+            return alpha
+
+        scored_moves = []
+        for move in capture_moves:
+            exchange = see(board, move, self.evaluator.PIECE_VALUES)
+            if exchange < 0:
+                continue
+            gain = captured_value(board, move, self.evaluator.PIECE_VALUES)
+            if stand_pat + gain / 100 + self.DELTA_MARGIN < alpha:
+                continue
+            scored_moves.append((exchange, move))
+        scored_moves.sort(key=lambda item: item[0], reverse=True)
+        ordered_moves = [move for _, move in scored_moves]
         next_color = 'white' if color == 'black' else 'black'
 
         for move in ordered_moves:
@@ -410,7 +1013,7 @@ class ChessEngine:
             self._undo_move(board, move, state)
 
             if self.time_up:
-                return self._evaluate_for(board, color)
+                return 0
 
             if score >= beta:
                 return beta
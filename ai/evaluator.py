@@ -1,106 +1,83 @@
-# Пример: Piece-Square Table для белой пешки (упрощённый)
-# Индексы [row][col]
-PAWN_PST = [
-    [0,  0,  0,  0,  0,  0,  0,  0],
-    [50, 50, 50, 50, 50, 50, 50, 50],
-    [10, 10, 20, 30, 30, 20, 10, 10],
-    [5,  5, 10, 25, 25, 10,  5,  5],
-    [0,  0,  0, 20, 20,  0,  0,  0],
-    [5, -5,-10,  0,  0,-10, -5,  5],
-    [5, 10, 10,-20,-20, 10, 10,  5],
-    [0,  0,  0,  0,  0,  0,  0,  0]
-]
-
-KNIGHT_PST = [
-    [-50,-40,-30,-30,-30,-30,-40,-50],
-    [-40,-20,  0,  0,  0,  0,-20,-40],
-    [-30,  0, 10, 15, 15, 10,  0,-30],
-    [-30,  5, 15, 20, 20, 15,  5,-30],
-    [-30,  0, 15, 20, 20, 15,  0,-30],
-    [-30,  5, 10, 15, 15, 10,  5,-30],
-    [-40,-20,  0,  5,  5,  0,-20,-40],
-    [-50,-40,-30,-30,-30,-30,-40,-50]
-]
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic import psqt
+from chess_logic.psqt import PIECE_VALUES, PAWN_PST, KNIGHT_PST, PHASE_TOTAL, CENTER_HALF_POINTS, scan_terms
+from ai.pawns import PawnHashTable
+
+
+# Weights stored in parameter files (see ai/tuning.py)
+PARAMETER_WEIGHTS = ('MATERIAL_WEIGHT', 'POSITION_WEIGHT', 'PAWN_STRUCTURE_WEIGHT', 'CHECK_WEIGHT', 'PST_WEIGHT')
+
+# Largest possible centre sum (one side on every centre square), in half points,
+# and pawn chain score (each of 8 pawns with two friendly pawns diagonally ahead)
+MAX_CENTER_HALF_POINTS = sum(CENTER_HALF_POINTS.values())
+MAX_CHAIN_SCORE = 16
+
+# Breakdowns kept by ChessEvaluator.evaluate_breakdown()
+BREAKDOWN_CACHE_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class EvaluationBreakdown:
+    """
+    evaluate_position() split into its terms. `score` is in pawns; the terms
+    are in hundredths of a pawn like the evaluate_* methods, and
+    score == sum(term / 100). All are positive for black.
+    """
+    score: float
+    material: float
+    position: float
+    pawn_structure: float
+    piece_square: float
+    check: float
+
+    def components(self) -> dict:
+        """Terms by label, for front.evaluation_display.DetailedEvaluation"""
+        return {
+            "Material": self.material,
+            "Position": self.position,
+            "Pawn Structure": self.pawn_structure,
+            "Piece-Square": self.piece_square,
+            "Check": self.check,
+        }
+
 
 class ChessEvaluator:
     def __init__(self):
-        self.PIECE_VALUES = {
-            'Pawn': 100,
-            'Knight': 320,
-            'Bishop': 330,
-            'Rook': 500,
-            'Queen': 900,
-            'King': 20000
-        }
+        self.PIECE_VALUES = dict(PIECE_VALUES)
         
         # Веса для разных компонентов оценки
         self.MATERIAL_WEIGHT = 1.0
         self.POSITION_WEIGHT = 0.5
         self.PAWN_STRUCTURE_WEIGHT = 0.3
         self.CHECK_WEIGHT = 1.0
+        self.PST_WEIGHT = 0.1
+
+        # Pawn features cached by Board.pawn_key (see ai/pawns.py)
+        self.pawn_table = PawnHashTable()
+        # evaluate_breakdown() results by Board.piece_key, oldest first
+        self._breakdowns = {}
 
     def evaluate_material(self, board):
         """Оценка материального преимущества"""
-        score = 0
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece((row, col))
-                if piece:
-                    value = self.PIECE_VALUES[piece.__class__.__name__]
-                    if piece.color == 'black':
-                        score += value
-                    else:
-                        score -= value
-        return score * self.MATERIAL_WEIGHT
+        return -scan_terms(board.grid)[1] * self.MATERIAL_WEIGHT
 
     def evaluate_piece_moves(self, board):
         """Оценка контроля важных клеток"""
-        score = 0
-        square_values = {
-            (3, 3): 1.0, (3, 4): 1.0, (4, 3): 1.0, (4, 4): 1.0,  # центр
-            (2, 2): 0.5, (2, 3): 0.5, (2, 4): 0.5, (2, 5): 0.5,  # расширенный центр
-            (3, 2): 0.5, (3, 5): 0.5,
-            (4, 2): 0.5, (4, 5): 0.5,
-            (5, 2): 0.5, (5, 3): 0.5, (5, 4): 0.5, (5, 5): 0.5
-        }
-
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece((row, col))
-                if piece:
-                    if (row, col) in square_values:
-                        value = square_values[(row, col)]
-                        if piece.color == 'black':
-                            score += value
-                        else:
-                            score -= value
-        return score * self.POSITION_WEIGHT
+        # Centre sums are kept in half points
+        return -scan_terms(board.grid)[4] / 2 * self.POSITION_WEIGHT
 
     def evaluate_pawn_structure(self, board):
-        """Оценка пешечной структуры"""
-        score = 0
-        
-        for row in range(1, 7):  # пропускаем крайние ряды
-            for col in range(8):
-                piece = board.get_piece((row, col))
-                if piece and piece.__class__.__name__ == 'Pawn':
-                    # Проверяем соседние пешки по диагонали
-                    for d_col in [-1, 1]:
-                        if 0 <= col + d_col <= 7:
-                            if piece.color == 'black':
-                                neighbor = board.get_piece((row - 1, col + d_col))
-                            else:
-                                neighbor = board.get_piece((row + 1, col + d_col))
-                            
-                            if (neighbor and 
-                                neighbor.__class__.__name__ == 'Pawn' and 
-                                neighbor.color == piece.color):
-                                if piece.color == 'black':
-                                    score += 1
-                                else:
-                                    score -= 1
-                                    
-        return score * self.PAWN_STRUCTURE_WEIGHT
+        """Оценка пешечной структуры (из пешечной хеш-таблицы)"""
+        return self.pawn_table.probe(board).chain_score * self.PAWN_STRUCTURE_WEIGHT
 
     def is_in_check(self, board, color):
         """Проверка шаха"""
@@ -109,17 +86,96 @@ class ChessEvaluator:
             if board.is_in_check(color):
                 return 1 if color == 'white' else -1
         return 0
-    def evaluate_position(self, board):
-        """Общая оценка позиции"""
-        # Разделим оценку на компоненты для лучшей читаемости
-        material_score = self.evaluate_material(board) / 100
-        piece_moves_score = self.evaluate_piece_moves(board) / 100
-        pawn_structure_score = self.evaluate_pawn_structure(board) / 100
-        piece_square_score = self.evaluate_piece_square_tables(board) / 100
+
+    def evaluate_position(self, board, checks=None):
+        """
+        Общая оценка позиции
+
+        `checks` is (white_in_check, black_in_check) when the caller already
+        knows it, as the search does; otherwise both kings are tested here.
+        """
+        # Material, centre and piece-square sums are kept by the board
+        return self._combine(board, checks, board.pawn_key, board.material, board.psqt_mg, board.psqt_eg,
+                             board.center, board.phase)
+
+    def evaluate_position_scan(self, board, checks=None):
+        """evaluate_position() from the pieces alone, without the board's running sums"""
+        pawn_key, material, psqt_mg, psqt_eg, center, phase = scan_terms(board.grid)
+        return self._combine(board, checks, pawn_key, material, psqt_mg, psqt_eg, center, phase)
+
+    def evaluate_breakdown(self, board):
+        """
+        Score and per-term numbers of a position, for the UI panels. Results
+        are cached by Board.piece_key, so polling every frame costs a dict
+        lookup until the pieces move. Call clear_breakdowns() after changing
+        weights directly (load_parameters() does it).
+        """
+        key = board.piece_key
+        breakdown = self._breakdowns.get(key)
+        if breakdown is not None:
+            return breakdown
+        # Same sums and float operations as _combine(), so score == evaluate_position()
+        material = -board.material * self.MATERIAL_WEIGHT
+        position = -board.center / 2 * self.POSITION_WEIGHT
+        pawn_structure = self.pawn_table.probe(board, board.pawn_key).chain_score * self.PAWN_STRUCTURE_WEIGHT
+        piece_square = -self.taper(board.psqt_mg, board.psqt_eg, board.phase) * self.PST_WEIGHT
+        white_check = self.is_in_check(board, 'white') * self.CHECK_WEIGHT
+        black_check = self.is_in_check(board, 'black') * self.CHECK_WEIGHT
+        score = (material / 100 + position / 100 + pawn_structure / 100 + piece_square / 100 +
+                 (white_check / 100 + black_check / 100))
+        breakdown = EvaluationBreakdown(score, material, position, pawn_structure, piece_square,
+                                        white_check + black_check)
+        if len(self._breakdowns) >= BREAKDOWN_CACHE_ENTRIES:
+            del self._breakdowns[next(iter(self._breakdowns))]
+        self._breakdowns[key] = breakdown
+        return breakdown
+
+    def clear_breakdowns(self):
+        self._breakdowns.clear()
+
+    def lazy_margin(self):
+        """Largest effect of the terms lazy_bound() leaves out: centre, pawn chains and check."""
+        return (MAX_CENTER_HALF_POINTS / 2 * abs(self.POSITION_WEIGHT) +
+                MAX_CHAIN_SCORE * abs(self.PAWN_STRUCTURE_WEIGHT) +
+                abs(self.CHECK_WEIGHT)) / 100
+
+    def lazy_bound(self, board, alpha, beta):
+        """
+        Lazy evaluation: the material and piece-square part of the score, widened by
+        lazy_margin() into a bound on evaluate_position(). Returns the bound when it
+        already lies outside (alpha, beta) (a lower bound >= beta or an upper bound
+        <= alpha), otherwise None and the full evaluation is needed. Scores and
+        bounds are positive for black, like evaluate_position().
+        """
+        score = (-board.material * self.MATERIAL_WEIGHT / 100 -
+                 self.taper(board.psqt_mg, board.psqt_eg, board.phase) * self.PST_WEIGHT / 100)
+        margin = self.lazy_margin()
+        if score - margin >= beta:
+            return score - margin
+        if score + margin <= alpha:
+            return score + margin
+        return None
+
+    def evaluate_lazy(self, board, alpha, beta, checks=None):
+        """lazy_bound() if it settles the comparison with (alpha, beta), else evaluate_position()."""
+        bound = self.lazy_bound(board, alpha, beta)
+        return bound if bound is not None else self.evaluate_position(board, checks)
+
+    def _combine(self, board, checks, pawn_key, material, psqt_mg, psqt_eg, center, phase):
+        # The sums are white minus black (see chess_logic/psqt.py); each term
+        # is scaled exactly as the evaluate_* methods scale it
+        material_score = -material * self.MATERIAL_WEIGHT / 100
+        piece_moves_score = -center / 2 * self.POSITION_WEIGHT / 100
+        pawn_structure_score = self.pawn_table.probe(board, pawn_key).chain_score * self.PAWN_STRUCTURE_WEIGHT / 100
+        piece_square_score = -self.taper(psqt_mg, psqt_eg, phase) * self.PST_WEIGHT / 100
         
         # Оценка шахов
-        white_check = self.is_in_check(board, 'white') * self.CHECK_WEIGHT / 100
-        black_check = self.is_in_check(board, 'black') * self.CHECK_WEIGHT / 100
+        if checks is None:
+            white_check = self.is_in_check(board, 'white') * self.CHECK_WEIGHT / 100
+            black_check = self.is_in_check(board, 'black') * self.CHECK_WEIGHT / 100
+        else:
+            white_check = (1 if checks[0] else 0) * self.CHECK_WEIGHT / 100
+            black_check = (-1 if checks[1] else 0) * self.CHECK_WEIGHT / 100
         check_score = white_check + black_check
 
         # Суммируем все компоненты
@@ -134,29 +190,45 @@ class ChessEvaluator:
         return total_score
 
     def evaluate_piece_square_tables(self, board):
-        score = 0
-        piece_square_tables = {
-            'Pawn': PAWN_PST,
-            'Knight': KNIGHT_PST,
-            # Add other piece tables as needed
+        """Оценка расположения фигур, от миддлгейма к эндшпилю"""
+        _, _, psqt_mg, psqt_eg, _, phase = scan_terms(board.grid)
+        return -self.taper(psqt_mg, psqt_eg, phase) * self.PST_WEIGHT
+
+    def parameters(self) -> dict:
+        """Weights, piece values and tables in the format of load_parameters()"""
+        return {
+            'weights': {name: getattr(self, name) for name in PARAMETER_WEIGHTS},
+            'piece_values': dict(psqt.PIECE_VALUES),
+            'mg_tables': {name: [list(row) for row in table] for name, table in psqt.MG_TABLES.items()},
+            'eg_tables': {name: [list(row) for row in table] for name, table in psqt.EG_TABLES.items()},
         }
-        
-        for row in range(8):
-            for col in range(8):
-                piece = board.get_piece((row, col))
-                if piece:
-                    piece_type = piece.__class__.__name__
-                    if piece_type in piece_square_tables:
-                        pst = piece_square_tables[piece_type]
-                        
-                        # White pieces read the table normally
-                        if piece.color == 'white':
-                            score += pst[7 - row][col]  # Flip row for white's perspective
-                        # Black pieces read the table from their perspective
-                        else:
-                            score -= pst[row][col]
-        
-        return score * 0.1  # Weight factor to balance with other evaluation components
+
+    def save_parameters(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.parameters(), f, indent=1)
+
+    def load_parameters(self, path: str):
+        """
+        Apply a parameter file. Piece values and tables are shared by every
+        board and evaluator in the process (see chess_logic.psqt.set_tables).
+        """
+        with open(path, encoding='utf-8') as f:
+            self.set_parameters(json.load(f))
+
+    def set_parameters(self, params: dict):
+        """Apply parameters in the format of parameters(); see load_parameters()."""
+        for name, value in params.get('weights', {}).items():
+            if name in PARAMETER_WEIGHTS:
+                setattr(self, name, value)
+        psqt.set_tables(params.get('piece_values'), params.get('mg_tables'), params.get('eg_tables'))
+        self.PIECE_VALUES = dict(psqt.PIECE_VALUES)
+        self.clear_breakdowns()
+
+    @staticmethod
+    def taper(mg, eg, phase):
+        """Blend middlegame and endgame values by the game phase (PHASE_TOTAL = all pieces on)."""
+        mg_phase = min(phase, PHASE_TOTAL)
+        return (mg * mg_phase + eg * (PHASE_TOTAL - mg_phase)) / PHASE_TOTAL
 
 
 if __name__ == "__main__":
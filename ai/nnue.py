@@ -0,0 +1,229 @@
+"""
+Small efficiently updatable neural network (NNUE-style) evaluator
+
+Inputs are the 768 (colour, piece type, square) features, seen from both
+sides: from white's perspective the features are (own/enemy, type, square);
+from black's they are the same with the board flipped. One shared first
+layer turns each perspective into HIDDEN values (the accumulator), which are
+clipped to 0..1 (clipped ReLU). The output is
+
+    eval = (clip(white_acc) - clip(black_acc)) . out
+
+so a position and its colour-flipped mirror score exactly opposite, and the
+score does not depend on the side to move (like ChessEvaluator's).
+
+Weights are integers as in NNUE engines: the first layer is scaled by QA
+and the output by QB, so the accumulator can be updated exactly by adding
+and removing the columns of the pieces that moved (see Board._add_piece).
+Taking a move back restores the previous accumulator from the board
+snapshot. Networks are trained with ai/nnue_train.py.
+
+    engine = ChessEngine(evaluator=NNUEEvaluator.load('net.npz'))
+    python -m ai.nnue --weights net.npz     # evals/s against ChessEvaluator
+"""
+import argparse
+import copy
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from chess_logic.psqt import PIECE_VALUES
+
+
+PIECE_TYPES = ['Pawn', 'Knight', 'Bishop', 'Rook', 'Queen', 'King']
+FEATURES = 768
+HIDDEN = 128
+# Fixed-point scales of the first layer (clip range 0..QA) and of the output weights
+QA = 255
+QB = 64
+# Centipawns per unit of network output: sigmoid(output) is white's expected score
+EVAL_SCALE = 400 / math.log(10)
+
+
+def feature_indices(color: str, piece_type: str, square: int):
+    """Input index of a piece from white's and from black's perspective."""
+    t = PIECE_TYPES.index(piece_type) * 64
+    if color == 'white':
+        return t + square, 384 + t + (square ^ 56)
+    return 384 + t + square, t + (square ^ 56)
+
+
+class Network:
+    def __init__(self, w1: np.ndarray, b1: np.ndarray, out: np.ndarray):
+        # w1: (FEATURES, hidden) and b1: (hidden,) scaled by QA; out: (hidden,) scaled by QB
+        self.w1 = np.asarray(w1, dtype=np.int16)
+        self.b1 = np.asarray(b1, dtype=np.int16)
+        self.out = np.asarray(out, dtype=np.int64)
+        self.hidden = len(self.b1)
+        # Accumulator change of each piece: columns[color][piece type][square] -> (2, hidden)
+        self.columns = {}
+        for color in ('white', 'black'):
+            self.columns[color] = {}
+            for piece_type in PIECE_TYPES:
+                table = np.empty((64, 2, self.hidden), dtype=np.int32)
+                for square in range(64):
+                    white_index, black_index = feature_indices(color, piece_type, square)
+                    table[square, 0] = self.w1[white_index]
+                    table[square, 1] = self.w1[black_index]
+                self.columns[color][piece_type] = table
+        self.bias = np.stack([self.b1, self.b1]).astype(np.int32)
+
+    @classmethod
+    def from_float(cls, w1: np.ndarray, b1: np.ndarray, out: np.ndarray) -> 'Network':
+        """Quantize trained float weights (clip range 0..1, output in EVAL_SCALE units)."""
+        limit = np.iinfo(np.int16).max
+        return cls(np.clip(np.rint(w1 * QA), -limit, limit),
+                   np.clip(np.rint(b1 * QA), -limit, limit),
+                   np.clip(np.rint(out * QB), -limit, limit))
+
+    @classmethod
+    def random(cls, hidden: int = HIDDEN, seed: int = 0) -> 'Network':
+        rng = np.random.default_rng(seed)
+        return cls.from_float(rng.normal(0, 0.1, (FEATURES, hidden)),
+                              rng.uniform(0, 0.5, hidden),
+                              rng.normal(0, 0.1, hidden))
+
+    @classmethod
+    def load(cls, path: str) -> 'Network':
+        with np.load(path) as data:
+            return cls(data['w1'], data['b1'], data['out'])
+
+    def save(self, path: str):
+        np.savez(path, w1=self.w1, b1=self.b1, out=self.out.astype(np.int16))
+
+    def float_weights(self):
+        """(w1, b1, out) as floats, e.g. to continue training."""
+        return self.w1 / QA, self.b1 / QA, self.out / QB
+
+
+class Accumulator:
+    """First-layer values of one board, from white's (row 0) and black's (row 1) perspective."""
+
+    def __init__(self, network: Network):
+        self.network = network
+        self.columns = network.columns
+        # Replaced, never changed in place, so board snapshots can keep a reference;
+        # None until the next refresh()
+        self.values: Optional[np.ndarray] = None
+
+    def __deepcopy__(self, memo):
+        # Board copies share the network and the (immutable) values
+        return copy.copy(self)
+
+    def refresh(self, grid):
+        values = self.network.bias.copy()
+        for row in range(8):
+            for col in range(8):
+                piece = grid[row][col]
+                if piece is not None:
+                    values += self.columns[piece.color][piece.__class__.__name__][row * 8 + col]
+        self.values = values
+
+    def add(self, color: str, piece_type: str, square: int, sign: int):
+        if self.values is not None:
+            if sign > 0:
+                self.values = self.values + self.columns[color][piece_type][square]
+            else:
+                self.values = self.values - self.columns[color][piece_type][square]
+
+
+class NNUEEvaluator:
+    """Drop-in replacement for ChessEvaluator.evaluate_position in ChessEngine."""
+
+    def __init__(self, network: Network):
+        self.network = network
+        # Used by the engine for move ordering and pruning
+        self.PIECE_VALUES = dict(PIECE_VALUES)
+        self.evals = 0
+        self.refreshes = 0
+
+    @classmethod
+    def load(cls, path: str) -> 'NNUEEvaluator':
+        return cls(Network.load(path))
+
+    def attach(self, board: Board) -> Accumulator:
+        """The board's accumulator for this network, attached and refreshed if needed."""
+        accumulator = board.accumulator
+        if accumulator is None or accumulator.network is not self.network:
+            accumulator = board.accumulator = Accumulator(self.network)
+        if accumulator.values is None:
+            accumulator.refresh(board.grid)
+            self.refreshes += 1
+        return accumulator
+
+    def evaluate_position(self, board: Board, checks=None) -> float:
+        """Score in pawns, positive for black (`checks` is accepted for ChessEvaluator compatibility)."""
+        self.evals += 1
+        values = self.attach(board).values
+        clipped = np.minimum(np.maximum(values, 0), QA)
+        output = int((clipped[0] - clipped[1]) @ self.network.out)
+        return -output * EVAL_SCALE / (QA * QB * 100)
+
+
+def benchmark(evaluators, positions: int = 2000, seed: int = 1):
+    """
+    Speed of each evaluator along the same random games, made and taken back
+    with the engine's make/unmake as in a search. The check flags are passed
+    in, as ChessEngine does. Returns [(name, evals per second, make+eval per
+    second)]; the second rate includes the accumulator and sum updates.
+    """
+    from ai.engine import ChessEngine
+
+    engine = ChessEngine(depth=1)
+    results = []
+    for evaluator in evaluators:
+        rng = random.Random(seed)
+        board = Board()
+        board.setup_initial_position()
+        color = 'white'
+        line = []
+        eval_time = make_time = 0.0
+        for _ in range(positions):
+            moves = board.get_legal_moves_for_color_with_promotions(color)
+            if not moves or len(line) >= 120:
+                for move, state in reversed(line):
+                    engine._undo_move(board, move, state)
+                line = []
+                color = 'white'
+                continue
+            move = rng.choice(moves)
+            started = time.perf_counter()
+            state = engine._make_move(board, move, color)
+            make_time += time.perf_counter() - started
+            line.append((move, state))
+            color = 'black' if color == 'white' else 'white'
+            checks = (board.is_in_check('white'), board.is_in_check('black'))
+            started = time.perf_counter()
+            evaluator.evaluate_position(board, checks)
+            eval_time += time.perf_counter() - started
+        results.append((evaluator.__class__.__name__, positions / eval_time, positions / (eval_time + make_time)))
+    return results
+
+
+def main():
+    from ai.evaluator import ChessEvaluator
+
+    parser = argparse.ArgumentParser(description='Compare NNUE and handcrafted evaluation speed.')
+    parser.add_argument('--weights', default=None, help='Network file (default: random weights)')
+    parser.add_argument('--hidden', type=int, default=HIDDEN, help='Hidden size of the random network')
+    parser.add_argument('--positions', type=int, default=5000, help='Positions to evaluate')
+    args = parser.parse_args()
+
+    network = Network.load(args.weights) if args.weights else Network.random(args.hidden)
+    for name, evals, nodes in benchmark([ChessEvaluator(), NNUEEvaluator(network)], args.positions):
+        print(f"{name}: {evals:,.0f} evals/s, {nodes:,.0f} make+eval/s")
+
+
+if __name__ == '__main__':
+    main()
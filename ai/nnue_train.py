@@ -0,0 +1,141 @@
+"""
+Train an ai.nnue network on self-play positions
+
+Reads a dataset of "<fen> <result>" lines (see ai/selfplay.py) and fits the
+float network by minimising the squared error between the game result and
+sigmoid(output), with minibatch Adam in NumPy. A slice of the data is held
+out to report validation loss. The quantized network is written for
+NNUEEvaluator.
+
+    python -m ai.selfplay -o selfplay.epd --games 500
+    python -m ai.nnue_train selfplay.epd -o net.npz --epochs 20
+    python -m ai.nnue --weights net.npz
+"""
+import argparse
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ai.nnue import FEATURES, HIDDEN, Network
+from ai.tuning import read_dataset
+
+
+def input_matrices(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """One-hot inputs (N, FEATURES) from white's and black's perspective of (N, 64) piece codes."""
+    codes = np.asarray(codes, dtype=np.int64)
+    rows, squares = np.nonzero(codes)
+    pieces = codes[rows, squares]
+    types = (np.abs(pieces) - 1) * 64
+    white = np.zeros((len(codes), FEATURES), dtype=np.float32)
+    black = np.zeros((len(codes), FEATURES), dtype=np.float32)
+    white[rows, (pieces < 0) * 384 + types + squares] = 1
+    black[rows, (pieces > 0) * 384 + types + (squares ^ 56)] = 1
+    return white, black
+
+
+class Trainer:
+    """Float copy of the network with Adam state."""
+
+    def __init__(self, network: Optional[Network] = None, hidden: int = HIDDEN, seed: int = 0):
+        if network is None:
+            rng = np.random.default_rng(seed)
+            # About 30 pieces feed each hidden unit
+            self.params = [rng.normal(0, 1 / np.sqrt(30), (FEATURES, hidden)).astype(np.float32),
+                           np.full(hidden, 0.5, dtype=np.float32),
+                           rng.normal(0, 0.05, hidden).astype(np.float32)]
+        else:
+            self.params = [np.asarray(p, dtype=np.float32) for p in network.float_weights()]
+        self._m = [np.zeros_like(p) for p in self.params]
+        self._v = [np.zeros_like(p) for p in self.params]
+        self._steps = 0
+
+    def forward(self, white: np.ndarray, black: np.ndarray):
+        w1, b1, out = self.params
+        white_acc = white @ w1 + b1
+        black_acc = black @ w1 + b1
+        hidden = np.clip(white_acc, 0, 1) - np.clip(black_acc, 0, 1)
+        return hidden @ out, (white_acc, black_acc, hidden)
+
+    def loss(self, codes: np.ndarray, results: np.ndarray, batch_size: int = 4096) -> float:
+        total = 0.0
+        for start in range(0, len(codes), batch_size):
+            output, _ = self.forward(*input_matrices(codes[start:start + batch_size]))
+            error = 1 / (1 + np.exp(-output)) - results[start:start + batch_size]
+            total += float(error @ error)
+        return total / max(1, len(codes))
+
+    def step(self, codes: np.ndarray, results: np.ndarray, lr: float) -> float:
+        """One Adam step on a minibatch; returns its loss before the step."""
+        white, black = input_matrices(codes)
+        output, (white_acc, black_acc, hidden) = self.forward(white, black)
+        probability = 1 / (1 + np.exp(-output))
+        error = probability - results
+        d_output = 2 * error * probability * (1 - probability) / len(codes)
+
+        w1, b1, out = self.params
+        d_out = hidden.T @ d_output
+        d_hidden = d_output[:, None] * out
+        d_white = d_hidden * ((white_acc > 0) & (white_acc < 1))
+        d_black = -d_hidden * ((black_acc > 0) & (black_acc < 1))
+        d_w1 = white.T @ d_white + black.T @ d_black
+        d_b1 = d_white.sum(axis=0) + d_black.sum(axis=0)
+
+        self._steps += 1
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for param, grad, m, v in zip(self.params, (d_w1, d_b1, d_out), self._m, self._v):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            m_hat = m / (1 - beta1 ** self._steps)
+            v_hat = v / (1 - beta2 ** self._steps)
+            param -= lr * m_hat / (np.sqrt(v_hat) + eps)
+        return float(error @ error) / len(codes)
+
+    def network(self) -> Network:
+        return Network.from_float(*self.params)
+
+
+def train(codes: np.ndarray, results: np.ndarray, trainer: Trainer, epochs: int = 10, batch_size: int = 1024,
+          lr: float = 1e-3, validation: float = 0.05, seed: int = 0, log=print) -> Trainer:
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(codes))
+    held_out = int(len(codes) * validation)
+    valid, train_rows = order[:held_out], order[held_out:]
+    for epoch in range(1, epochs + 1):
+        rng.shuffle(train_rows)
+        losses = []
+        for start in range(0, len(train_rows), batch_size):
+            batch = train_rows[start:start + batch_size]
+            losses.append(trainer.step(codes[batch], results[batch], lr))
+        if log:
+            valid_loss = trainer.loss(codes[valid], results[valid]) if held_out else float('nan')
+            log(f"epoch {epoch}: train loss {np.mean(losses):.6f}, validation loss {valid_loss:.6f}")
+    return trainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train an NNUE network on self-play positions.')
+    parser.add_argument('dataset', help='Text file with one "<fen> <result>" per line')
+    parser.add_argument('-o', '--output', required=True, help='Network file to write (.npz)')
+    parser.add_argument('--init', default=None, help='Continue training this network')
+    parser.add_argument('--hidden', type=int, default=HIDDEN, help='Accumulator size of a new network')
+    parser.add_argument('--epochs', type=int, default=10, help='Passes over the dataset')
+    parser.add_argument('--batch-size', type=int, default=1024, help='Positions per Adam step')
+    parser.add_argument('--lr', type=float, default=1e-3, help='Adam step size')
+    parser.add_argument('--validation', type=float, default=0.05, help='Fraction of positions held out')
+    parser.add_argument('--workers', type=int, default=None, help='Processes for parsing the dataset')
+    args = parser.parse_args()
+
+    start = time.time()
+    codes, results = read_dataset(args.dataset, args.workers)
+    print(f"Read {len(codes)} positions in {time.time() - start:.1f}s")
+    trainer = Trainer(Network.load(args.init) if args.init else None, args.hidden)
+    train(codes, results, trainer, args.epochs, args.batch_size, args.lr, args.validation)
+    trainer.network().save(args.output)
+    print(f"Wrote {args.output} after {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
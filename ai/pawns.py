@@ -0,0 +1,148 @@
+"""
+Pawn structure analysis and the pawn hash table
+
+Everything that depends on the pawns alone changes only on pawn moves and
+captures, so it is computed once per pawn structure and cached under
+Board.pawn_key. Feature sets are bitboards: bit row * 8 + col is set for a
+square, and each feature holds one bitboard per color (WHITE, BLACK).
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Default number of pawn table slots (a power of two)
+PAWN_TABLE_ENTRIES = 1 << 14
+
+WHITE = 0
+BLACK = 1
+COLOR_INDEX = {'white': WHITE, 'black': BLACK}
+
+
+def square_bit(row: int, col: int) -> int:
+    return 1 << (row * 8 + col)
+
+
+def popcount(bitboard: int) -> int:
+    return bin(bitboard).count('1')
+
+
+@dataclass
+class PawnEntry:
+    key: int
+    # Pawns supporting a friendly pawn diagonally ahead of them, black minus
+    # white: the raw ChessEvaluator.evaluate_pawn_structure() term
+    chain_score: int
+    pawns: Tuple[int, int]
+    # No enemy pawn ahead on the same or an adjacent file
+    passed: Tuple[int, int]
+    # No friendly pawn on an adjacent file
+    isolated: Tuple[int, int]
+    # A friendly pawn stands ahead on the same file
+    doubled: Tuple[int, int]
+    # Not isolated, but no friendly pawn beside or behind on an adjacent file,
+    # and the square in front is attacked by an enemy pawn
+    backward: Tuple[int, int]
+    # Squares attacked by pawns now
+    attacks: Tuple[int, int]
+    # Squares the pawns can ever attack by advancing
+    attack_spans: Tuple[int, int]
+
+
+def analyze_pawns(board, key: int = 0) -> PawnEntry:
+    """Compute the pawn structure features of `board` from scratch."""
+    pawns = ([], [])
+    for row in range(8):
+        for col in range(8):
+            piece = board.grid[row][col]
+            if piece is not None and piece.__class__.__name__ == 'Pawn':
+                pawns[COLOR_INDEX[piece.color]].append((row, col))
+    squares = (set(pawns[WHITE]), set(pawns[BLACK]))
+    files = ([0] * 8, [0] * 8)
+    for side in (WHITE, BLACK):
+        for row, col in pawns[side]:
+            files[side][col] += 1
+
+    chain_score = 0
+    attacks = [0, 0]
+    spans = [0, 0]
+    for side in (WHITE, BLACK):
+        forward = 1 if side == WHITE else -1
+        for row, col in pawns[side]:
+            for d_col in (-1, 1):
+                c = col + d_col
+                if not 0 <= c <= 7:
+                    continue
+                # Same rows as evaluate_pawn_structure, which skips the edge ranks
+                if 1 <= row <= 6 and (row + forward, c) in squares[side]:
+                    chain_score += 1 if side == BLACK else -1
+                if 0 <= row + forward <= 7:
+                    attacks[side] |= square_bit(row + forward, c)
+                r = row + forward
+                while 0 <= r <= 7:
+                    spans[side] |= square_bit(r, c)
+                    r += forward
+
+    passed = [0, 0]
+    isolated = [0, 0]
+    doubled = [0, 0]
+    backward = [0, 0]
+    for side in (WHITE, BLACK):
+        enemy = 1 - side
+        forward = 1 if side == WHITE else -1
+        for row, col in pawns[side]:
+            bit = square_bit(row, col)
+            adjacent = [c for c in (col - 1, col + 1) if 0 <= c <= 7]
+            if not any((r - row) * forward > 0 and abs(c - col) <= 1 for r, c in squares[enemy]):
+                passed[side] |= bit
+            if any((r - row) * forward > 0 and c == col for r, c in squares[side]):
+                doubled[side] |= bit
+            if not any(files[side][c] for c in adjacent):
+                isolated[side] |= bit
+                continue
+            supported = any((r - row) * forward <= 0 and c in adjacent for r, c in squares[side])
+            stop = row + forward
+            if not supported and 0 <= stop <= 7 and attacks[enemy] & square_bit(stop, col):
+                backward[side] |= bit
+
+    return PawnEntry(
+        key=key,
+        chain_score=chain_score,
+        pawns=(sum(square_bit(r, c) for r, c in pawns[WHITE]), sum(square_bit(r, c) for r, c in pawns[BLACK])),
+        passed=tuple(passed),
+        isolated=tuple(isolated),
+        doubled=tuple(doubled),
+        backward=tuple(backward),
+        attacks=tuple(attacks),
+        attack_spans=tuple(spans),
+    )
+
+
+class PawnHashTable:
+    """Direct-mapped cache of PawnEntry by pawn key."""
+
+    def __init__(self, entries: int = PAWN_TABLE_ENTRIES):
+        self.resize(entries)
+
+    def resize(self, entries: int):
+        """Resize (and clear) the table; `entries` is rounded down to a power of two."""
+        size = 1 << max(0, entries.bit_length() - 1)
+        self._mask = size - 1
+        self._entries = [None] * size
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        self.resize(len(self._entries))
+
+    def probe(self, board, key: Optional[int] = None) -> PawnEntry:
+        """Entry for the pawns of `board`; `key` defaults to board.pawn_key."""
+        if key is None:
+            key = board.pawn_key
+        slot = key & self._mask
+        self.probes += 1
+        entry = self._entries[slot]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        entry = analyze_pawns(board, key)
+        self._entries[slot] = entry
+        return entry
@@ -0,0 +1,118 @@
+"""
+Streaming PGN reading and SAN move parsing
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from chess_logic.board import Board
+
+
+SAN_RE = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQnbrq]))?$')
+PIECE_LETTERS = {
+    'N': 'Knight',
+    'B': 'Bishop',
+    'R': 'Rook',
+    'Q': 'Queen',
+    'K': 'King',
+    'P': 'Pawn',
+}
+HEADER_RE = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+
+def san_to_move(board: Board, san: str, color: str) -> Tuple[Tuple[int, int], Tuple[int, int], Optional[str]]:
+    """
+    Convert a SAN move such as 'Nbd7', 'exd5', 'e8=Q+' or 'O-O' to a move tuple.
+
+    Raises:
+        ValueError: if the move is malformed, illegal or ambiguous
+    """
+    san = san.rstrip('+#!?')
+    home_row = 0 if color == 'white' else 7
+    if san in ('O-O', '0-0'):
+        return (home_row, 4), (home_row, 6), None
+    if san in ('O-O-O', '0-0-0'):
+        return (home_row, 4), (home_row, 2), None
+
+    match = SAN_RE.match(san)
+    if not match:
+        raise ValueError(f"Invalid SAN move: {san!r}")
+    letter, from_file, from_rank, dest, promotion = match.groups()
+    name = PIECE_LETTERS[letter or 'P']
+    end = (int(dest[1]) - 1, ord(dest[0]) - ord('a'))
+    promotion = promotion.lower() if promotion else None
+    from_col = ord(from_file) - ord('a') if from_file else None
+    from_row = int(from_rank) - 1 if from_rank else None
+
+    candidates = []
+    for row in range(8):
+        if from_row is not None and row != from_row:
+            continue
+        for col in range(8):
+            if from_col is not None and col != from_col:
+                continue
+            piece = board.grid[row][col]
+            if piece is None or piece.color != color or piece.__class__.__name__ != name:
+                continue
+            if end in piece.get_legal_moves(board):
+                candidates.append(piece)
+
+    # Only resolve pins when the SAN itself does not disambiguate
+    if len(candidates) > 1:
+        legal = []
+        for piece in candidates:
+            start = piece.position
+            state = board._apply_temporary_move(piece, start, end, promotion)
+            if not board.is_in_check(color):
+                legal.append(piece)
+            board._undo_temporary_move(end, state)
+        candidates = legal
+
+    if len(candidates) != 1:
+        raise ValueError(f"Illegal or ambiguous SAN move: {san!r}")
+    return candidates[0].position, end, promotion
+
+
+def parse_movetext(text: str) -> List[str]:
+    """Extract the SAN moves of a game, skipping comments, variations and NAGs."""
+    moves = []
+    depth = 0
+    text = re.sub(r'\{[^}]*\}', ' ', text)
+    for token in text.replace('(', ' ( ').replace(')', ' ) ').split():
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(0, depth - 1)
+        elif depth or token.startswith('$') or token in RESULTS or token == 'e.p.':
+            continue
+        else:
+            # Strip move numbers like '12.' and '12...'
+            token = token.lstrip('0123456789.')
+            if token:
+                moves.append(token)
+    return moves
+
+
+def iter_games(lines) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+    """
+    Stream games from an iterable of PGN lines.
+
+    Yields:
+        (headers, san_moves) for every game
+    """
+    headers: Dict[str, str] = {}
+    movetext: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith('['):
+            if movetext:
+                yield headers, parse_movetext(' '.join(movetext))
+                headers, movetext = {}, []
+            match = HEADER_RE.match(line)
+            if match:
+                headers[match.group(1)] = match.group(2)
+        elif line and not line.startswith('%'):
+            # ';' starts a comment that runs to the end of the line
+            movetext.append(line.split(';', 1)[0])
+    if headers or movetext:
+        yield headers, parse_movetext(' '.join(movetext))
@@ -0,0 +1,103 @@
+"""
+Pondering: search the expected reply on the opponent's time
+"""
+import copy
+import threading
+from typing import Optional
+
+from ai.time_manager import SearchLimits
+
+
+def same_move(a, b) -> bool:
+    """Compare moves given as (start, end) or (start, end, promotion)."""
+    if a is None or b is None:
+        return False
+    promo_a = a[2] if len(a) > 2 else None
+    promo_b = b[2] if len(b) > 2 else None
+    return a[0] == b[0] and a[1] == b[1] and (promo_a or 'q') == (promo_b or 'q')
+
+
+class Ponderer:
+    """
+    Runs a ChessEngine search in a background thread while the opponent thinks.
+
+    After the engine has played its move, start() plays the expected reply
+    (usually engine.ponder_move) on a snapshot of the board and keeps
+    searching that position without a time limit. When the opponent actually
+    plays it, hit() switches the running search over to our own clock and
+    returns its result, so the search continues with everything it already
+    found. Otherwise miss() stops it at the next node poll; the transposition
+    table stays warm either way.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.ponder_move = None
+        self._thread: Optional[threading.Thread] = None
+        self._result = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self, board, engine_color: str, ponder_move, limits: Optional[SearchLimits] = None) -> bool:
+        """
+        Start pondering.
+
+        Args:
+            board: Current position, opponent to move. It is not modified.
+            engine_color: Color the engine plays
+            ponder_move: Expected opponent reply
+            limits: Limits for our move, applied on a ponder hit
+
+        Returns:
+            True if the background search was started
+        """
+        self.miss()
+        if ponder_move is None:
+            return False
+
+        snapshot = copy.deepcopy(board)
+        promo = ponder_move[2] if len(ponder_move) > 2 else None
+        if not snapshot.move_piece(ponder_move[0], ponder_move[1], promotion=promo, next_color=engine_color):
+            return False
+
+        limits = limits or SearchLimits()
+        self.ponder_move = ponder_move
+        self._result = None
+        # Start the clock here rather than in the worker, so an early miss()
+        # can never be overwritten by the worker starting its search
+        self.engine._begin_search(engine_color, limits, ponder=True)
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(snapshot, engine_color, limits),
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, board, color: str, limits: SearchLimits):
+        self._result = self.engine._iterative_deepening(board, color, limits)
+
+    def matches(self, move) -> bool:
+        return self.active and same_move(move, self.ponder_move)
+
+    def hit(self, limits: Optional[SearchLimits] = None):
+        """The opponent played the ponder move: finish the search on our time."""
+        if not self.active:
+            return None
+        self.engine.time_manager.ponder_hit(limits)
+        self._thread.join()
+        self._thread = None
+        self.ponder_move = None
+        return self._result
+
+    def miss(self):
+        """Abort pondering and discard the result."""
+        if not self.active:
+            return
+        self.engine.stop()
+        self._thread.join()
+        self._thread = None
+        self.ponder_move = None
+        self._result = None
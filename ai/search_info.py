@@ -0,0 +1,109 @@
+"""
+Per-iteration search statistics for ChessEngine
+
+Set `engine.info_callback` to any callable taking a SearchInfo; it is called
+once after every completed iteration of iterative deepening. Nothing beyond
+the plain node counters is computed while no callback is attached.
+"""
+import json
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional, Tuple
+
+
+Move = Tuple[Tuple[int, int], Tuple[int, int], Optional[str]]
+
+
+def move_name(move: Move) -> str:
+    """Long algebraic (UCI) name of an engine move."""
+    start, end = move[0], move[1]
+    name = ''.join(f"{chr(ord('a') + col)}{row + 1}" for row, col in (start, end))
+    if len(move) > 2 and move[2]:
+        name += move[2]
+    return name
+
+
+@dataclass
+class SearchInfo:
+    depth: int
+    seldepth: int
+    # Side-to-move score in pawns; `mate` is set instead for forced mates
+    score: float
+    mate: Optional[int]
+    pv: List[Move] = field(default_factory=list)
+    # Rank of this line when several best moves are searched (MultiPV)
+    multipv: int = 1
+    # Main search plus quiescence nodes, over the whole search so far
+    nodes: int = 0
+    qnodes: int = 0
+    iteration_nodes: int = 0
+    # Effective branching factor: this iteration's nodes over the previous one's
+    ebf: Optional[float] = None
+    time: float = 0.0
+    iteration_time: float = 0.0
+    nps: int = 0
+    # Share of transposition table slots in use, per mille
+    hashfull: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    beta_cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    eval_probes: int = 0
+    eval_hits: int = 0
+    # Quiescence stand-pat evaluations that could exit early, and those that did
+    lazy_probes: int = 0
+    lazy_exits: int = 0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def eval_hit_rate(self) -> float:
+        return self.eval_hits / self.eval_probes if self.eval_probes else 0.0
+
+    @property
+    def lazy_exit_rate(self) -> float:
+        return self.lazy_exits / self.lazy_probes if self.lazy_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def qnode_share(self) -> float:
+        return self.qnodes / self.nodes if self.nodes else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data['pv'] = [move_name(move) for move in self.pv]
+        data['tt_hit_rate'] = round(self.tt_hit_rate, 4)
+        data['eval_hit_rate'] = round(self.eval_hit_rate, 4)
+        data['lazy_exit_rate'] = round(self.lazy_exit_rate, 4)
+        data['first_move_cutoff_rate'] = round(self.first_move_cutoff_rate, 4)
+        data['qnode_share'] = round(self.qnode_share, 4)
+        return data
+
+
+class JsonLinesWriter:
+    """
+    Info callback that appends every SearchInfo as one JSON object per line.
+
+        with JsonLinesWriter('stats.jsonl') as log:
+            engine.info_callback = log
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, info: SearchInfo):
+        self._file.write(json.dumps(info.to_dict()) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
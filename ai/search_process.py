@@ -0,0 +1,194 @@
+"""
+Searching in a worker process, so that a UI thread is never blocked
+
+ChessEngine.start_search() hands the position to a long-lived worker process
+that owns a copy of the engine (and so keeps its own transposition table
+warm from move to move). The caller gets a SearchHandle and polls it from
+its event loop; progress (SearchInfo) and the final SearchResult come back
+through a pipe.
+
+The worker uses the platform's default start method (spawn on macOS and
+Windows, where forking after the UI set up its window is unsafe), so the
+engine and every board are pickled across. The engine's transposition table
+goes over empty; the caller's main module must be safe to import again.
+Settings changed on the caller's engine afterwards (depth, book, evaluator
+parameters, ...) are sent along with the next search.
+"""
+import multiprocessing
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from ai.search_info import SearchInfo
+from ai.time_manager import SearchLimits
+
+
+@dataclass
+class SearchResult:
+    move: Optional[tuple]
+    score: float = 0.0
+    pv: List[tuple] = field(default_factory=list)
+    ponder_move: Optional[tuple] = None
+    nodes: int = 0
+
+
+def _worker_main(engine, conn):
+    """Worker process loop: runs one search at a time on a thread of its own."""
+    engine.verbose = False
+    send_lock = threading.Lock()
+    search_thread = None
+    current_id = None
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def run(search_id, board, color, limits):
+        move = engine._iterative_deepening(board, color, limits)
+        score = engine.top_lines[0][1] if engine.top_lines else 0.0
+        send(('result', search_id, SearchResult(
+            move, score, engine.pv, engine.ponder_move, engine.nodes_searched + engine.q_nodes,
+        )))
+
+    def finish_current():
+        nonlocal search_thread
+        if search_thread is not None:
+            engine.stop()
+            search_thread.join()
+            search_thread = None
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        command, search_id = message[0], message[1]
+        if command == 'search':
+            finish_current()
+            board, color, limits, ponder = message[2:]
+            current_id = search_id
+            engine.info_callback = lambda info, sid=search_id: send(('info', sid, info))
+            # Start the clock before the thread so an early stop is never lost
+            engine._begin_search(color, limits, ponder)
+            search_thread = threading.Thread(target=run, args=(search_id, board, color, limits), daemon=True)
+            search_thread.start()
+        elif command == 'configure':
+            finish_current()
+            engine.apply_search_settings(message[2])
+        elif command == 'stop' and search_id == current_id:
+            engine.stop()
+        elif command == 'ponderhit' and search_id == current_id:
+            engine.time_manager.ponder_hit(message[2])
+        elif command == 'quit':
+            finish_current()
+            break
+    conn.close()
+
+
+class SearchHandle:
+    """
+    A search running in the worker process.
+
+    poll() never blocks: it delivers pending progress to `on_info` and
+    returns True once the result has arrived.
+    """
+
+    def __init__(self, worker: 'SearchWorker', search_id: int,
+                 on_info: Optional[Callable[[SearchInfo], None]] = None):
+        self._worker = worker
+        self.search_id = search_id
+        self.on_info = on_info
+        self.info: Optional[SearchInfo] = None
+        self.result: Optional[SearchResult] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def poll(self) -> bool:
+        if not self.done:
+            self._worker.pump()
+        return self.done
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[SearchResult]:
+        """Block until the search is finished (or `timeout` seconds passed)."""
+        if not self.done:
+            self._worker.pump(self, timeout)
+        return self.result
+
+    def stop(self):
+        """Move now: the worker returns the best move found so far."""
+        if not self.done:
+            self._worker.send(('stop', self.search_id))
+
+    def ponder_hit(self, limits: Optional[SearchLimits] = None):
+        """The expected move was played: finish this ponder search on our own clock."""
+        if not self.done:
+            self._worker.send(('ponderhit', self.search_id, limits))
+
+    def _deliver_info(self, info: SearchInfo):
+        self.info = info
+        if self.on_info is not None:
+            self.on_info(info)
+
+
+class SearchWorker:
+    def __init__(self, engine, start_method: Optional[str] = None):
+        # `start_method` overrides the platform default ('fork', 'spawn', 'forkserver')
+        context = multiprocessing.get_context(start_method)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(engine, child_conn), daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._engine = engine
+        # Settings last sent to the worker; the first search always sends them
+        self._settings = None
+        self._last_id = 0
+        self._handles = {}
+
+    def start(self, board, color: str, limits: SearchLimits, ponder: bool = False,
+              on_info: Optional[Callable[[SearchInfo], None]] = None) -> SearchHandle:
+        # Only one search runs at a time; the worker abandons the previous one
+        for handle in self._handles.values():
+            handle.result = SearchResult(None)
+        self._handles.clear()
+        settings = self._engine.search_settings()
+        if settings != self._settings:
+            self.send(('configure', 0, settings))
+            self._settings = settings
+        self._last_id += 1
+        handle = SearchHandle(self, self._last_id, on_info)
+        self._handles[handle.search_id] = handle
+        self.send(('search', handle.search_id, board, color, limits, ponder))
+        return handle
+
+    def send(self, message):
+        self._conn.send(message)
+
+    def pump(self, until: Optional[SearchHandle] = None, timeout: Optional[float] = 0):
+        """Dispatch messages from the worker, waiting up to `timeout` for `until` to finish."""
+        while self._conn.poll(timeout):
+            kind, search_id, payload = self._conn.recv()
+            handle = self._handles.get(search_id)
+            if handle is None:
+                continue
+            if kind == 'info':
+                handle._deliver_info(payload)
+            elif kind == 'result':
+                handle.result = payload
+                del self._handles[search_id]
+            if until is None:
+                timeout = 0
+            elif until.done:
+                break
+
+    def close(self):
+        if self._process.is_alive():
+            try:
+                self.send(('quit', 0))
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(1.0)
+            if self._process.is_alive():
+                self._process.terminate()
+        self._conn.close()
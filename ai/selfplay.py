@@ -0,0 +1,99 @@
+"""
+Generate training positions from engine self-play games
+
+Worker processes play ChessEngine against itself from openings randomised
+by a few random plies. Every position after the opening where the side to
+move is not in check is written with the game result, as the dataset
+lines read by ai/tuning.py and ai/nnue_train.py:
+
+    <fen> [1.0]     white won (0.5 draw, 0.0 black won)
+
+    python -m ai.selfplay -o selfplay.epd --games 200 --depth 2 --workers 4
+"""
+import argparse
+import random
+import time
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+
+
+def play_game(engine: ChessEngine, rng: random.Random, random_plies: int = 8,
+              max_plies: int = 200) -> Tuple[List[str], float]:
+    """Play one game; returns the recorded FENs and white's result."""
+    board = Board()
+    board.setup_initial_position()
+    engine.new_game()
+    color = 'white'
+    fens = []
+    for ply in range(max_plies):
+        game_over, reason = board.is_game_over(color)
+        if game_over:
+            if reason == 'checkmate':
+                return fens, 0.0 if color == 'white' else 1.0
+            return fens, 0.5
+        if ply < random_plies:
+            move = rng.choice(board.get_legal_moves_for_color_with_promotions(color))
+        else:
+            if not board.is_in_check(color):
+                fens.append(board.get_position_key(color))
+            move = engine.get_best_move(board, color)
+        next_color = 'black' if color == 'white' else 'white'
+        promo = move[2] if len(move) > 2 else None
+        board.move_piece(move[0], move[1], promotion=promo, next_color=next_color)
+        color = next_color
+    return fens, 0.5
+
+
+# Worker process state
+_engine: Optional[ChessEngine] = None
+_settings = {}
+
+
+def _init_worker(depth: int, random_plies: int, max_plies: int):
+    global _engine
+    _engine = ChessEngine(depth=depth)
+    _engine.verbose = False
+    _settings.update(random_plies=random_plies, max_plies=max_plies)
+
+
+def _play(seed: int) -> Tuple[List[str], float]:
+    return play_game(_engine, random.Random(seed), _settings['random_plies'], _settings['max_plies'])
+
+
+def generate(output: str, games: int, depth: int = 2, workers: Optional[int] = None,
+             random_plies: int = 8, max_plies: int = 200, seed: int = 0) -> Tuple[int, List[float]]:
+    """Append the positions of `games` self-play games to `output`; returns (positions, results)."""
+    positions = 0
+    results = []
+    with Pool(workers, _init_worker, (depth, random_plies, max_plies)) as pool, \
+            open(output, 'a', encoding='utf-8') as f:
+        for fens, result in pool.imap_unordered(_play, range(seed, seed + games)):
+            f.writelines(f"{fen} [{result}]\n" for fen in fens)
+            positions += len(fens)
+            results.append(result)
+    return positions, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write training positions from engine self-play.')
+    parser.add_argument('-o', '--output', required=True, help='Dataset file to append to')
+    parser.add_argument('--games', type=int, default=100, help='Number of games')
+    parser.add_argument('--depth', type=int, default=2, help='Engine search depth')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--random-plies', type=int, default=8, help='Random opening plies (not recorded)')
+    parser.add_argument('--max-plies', type=int, default=200, help='Plies before a game is scored a draw')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first game')
+    args = parser.parse_args()
+
+    start = time.time()
+    positions, results = generate(args.output, args.games, args.depth, args.workers,
+                                  args.random_plies, args.max_plies, args.seed)
+    print(f"{len(results)} games (+{results.count(1.0)} ={results.count(0.5)} -{results.count(0.0)}), "
+          f"{positions} positions in {time.time() - start:.1f}s -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Search limits and clock-based time management for ChessEngine
+"""
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class SearchLimits:
+    """Limits for a single search. All times are in seconds."""
+    depth: Optional[int] = None
+    nodes: Optional[int] = None
+    movetime: Optional[float] = None
+    wtime: Optional[float] = None
+    btime: Optional[float] = None
+    winc: float = 0.0
+    binc: float = 0.0
+    movestogo: Optional[int] = None
+    infinite: bool = False
+
+
+class TimeManager:
+    """
+    Turns SearchLimits into a soft and a hard time limit.
+
+    The soft limit is the time we would like to spend on the move: no new
+    iteration is started after it has passed. The hard limit is the point at
+    which a running iteration is aborted. The clock itself is only read every
+    `check_interval` nodes.
+    """
+
+    # Moves assumed to be left in the game when the GUI does not send movestogo
+    DEFAULT_MOVES_TO_GO = 30
+    # How much longer the next iteration is expected to take than the last one
+    ITERATION_GROWTH = 4.0
+    # Upper bound for the soft-limit extension when the best move keeps changing
+    MAX_INSTABILITY_SCALE = 2.5
+
+    def __init__(self, check_interval: int = 64, move_overhead: float = 0.03):
+        self.check_interval = check_interval
+        self.move_overhead = move_overhead
+        self.limits = SearchLimits()
+        self.start_time = 0.0
+        self.soft_limit = None
+        self.hard_limit = None
+        self.instability = 0.0
+        self.color = 'white'
+        self.pondering = False
+        self.stopped = False
+
+    def start(self, limits: SearchLimits, color: str, ponder: bool = False):
+        """
+        Start the clock and allocate time for a search by `color`.
+        A ponder search runs without limits until ponder_hit() or stop().
+        """
+        self.limits = limits
+        self.color = color
+        self.start_time = time.time()
+        self.instability = 0.0
+        self.pondering = ponder
+        self.stopped = False
+        self.soft_limit, self.hard_limit = self._allocate(limits, color)
+
+    def ponder_hit(self, limits: Optional[SearchLimits] = None):
+        """The opponent played the expected move: start spending our own time."""
+        if limits is not None:
+            self.limits = limits
+        self.start_time = time.time()
+        self.soft_limit, self.hard_limit = self._allocate(self.limits, self.color)
+        self.pondering = False
+
+    def stop(self):
+        """Abort the running search as soon as the next poll sees it."""
+        self.stopped = True
+
+    def _allocate(self, limits: SearchLimits, color: str):
+        if limits.infinite:
+            return None, None
+        if limits.movetime is not None:
+            budget = max(0.001, limits.movetime - self.move_overhead)
+            return budget, budget
+
+        remaining = limits.wtime if color == 'white' else limits.btime
+        if remaining is None:
+            return None, None
+        increment = limits.winc if color == 'white' else limits.binc
+        moves_to_go = limits.movestogo or self.DEFAULT_MOVES_TO_GO
+
+        available = max(0.001, remaining - self.move_overhead)
+        soft = available / moves_to_go + increment * 0.75
+        hard = min(soft * 4, available * 0.5 + increment)
+        hard = max(0.001, min(hard, available))
+        soft = min(soft, hard)
+        return soft, hard
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def should_stop(self, nodes: int) -> bool:
+        """Hard stop check, polled from inside the search."""
+        if self.stopped:
+            return True
+        if self.pondering:
+            return False
+        if self.limits.nodes is not None and nodes >= self.limits.nodes:
+            return True
+        if self.hard_limit is None:
+            return False
+        return self.elapsed() >= self.hard_limit
+
+    def on_iteration_complete(self, best_move_changed: bool):
+        """Extend the soft limit while the best move is unstable."""
+        self.instability *= 0.5
+        if best_move_changed:
+            self.instability += 1.0
+
+    def can_start_iteration(self, last_iteration_time: float) -> bool:
+        """Decide whether another iteration is likely to finish in time."""
+        if self.stopped:
+            return False
+        if self.pondering:
+            return True
+        if self.soft_limit is None:
+            return True
+        elapsed = self.elapsed()
+        if self.limits.movetime is not None:
+            # Fixed move time: use all of it, a partial iteration still
+            # improves the root move
+            return elapsed < self.hard_limit
+        scale = min(self.MAX_INSTABILITY_SCALE, 1.0 + 0.5 * self.instability)
+        soft = min(self.soft_limit * scale, self.hard_limit)
+        if elapsed >= soft:
+            return False
+        return elapsed + last_iteration_time * self.ITERATION_GROWTH <= self.hard_limit
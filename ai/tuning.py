@@ -0,0 +1,354 @@
+"""
+Texel tuning of the ChessEvaluator parameters
+
+Once the game phase of a position is known, the evaluation is linear in its
+parameters (piece values, middlegame and endgame piece-square tables and the
+centre, pawn chain and check weights). Every position of a labelled dataset
+therefore becomes a sparse feature vector. The vectors are extracted once and
+cached as .npy files. The parameters are then fitted by minimising the
+squared error between the game result and sigmoid(K * eval / 400), with
+full-batch Adam steps whose gradients are computed by worker processes,
+one shard of the data each. The result is a parameter file for
+ChessEvaluator.load_parameters().
+
+    python -m ai.tuning positions.epd -o tuned.json --cache positions.cache
+
+Each dataset line holds a FEN followed by the game result from white's side:
+1-0, 0-1, 1/2-1/2 or 1.0, 0.5, 0.0, optionally quoted or bracketed, so both
+'<fen> [0.5]' and EPD lines like '<fen> c9 "1-0";' are read.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from chess_logic.psqt import PHASE_WEIGHTS, PHASE_TOTAL, CENTER_HALF_POINTS
+from ai.evaluator import ChessEvaluator
+from ai.batch_eval import PIECE_CODES, BatchEvaluator
+
+
+PIECE_TYPES = ['Pawn', 'Knight', 'Bishop', 'Rook', 'Queen', 'King']
+FEN_CODES = {letter: PIECE_CODES[name] for letter, name in
+             zip('pnbrqk', PIECE_TYPES)}
+RESULT_VALUES = {'1-0': 1.0, '0-1': 0.0, '1/2-1/2': 0.5, '1.0': 1.0, '0.0': 0.0, '0.5': 0.5}
+
+# Parameter vector layout, in centipawns from white's side
+MATERIAL = slice(0, 5)            # pawn .. queen
+PST_MG = slice(5, 5 + 384)        # piece type * 64 + table square
+PST_EG = slice(389, 389 + 384)
+CENTER = 773                      # per half point of centre occupation
+CHAIN = 774                       # per pawn chain link
+CHECK = 775                       # black in check minus white in check
+N_PARAMS = 776
+# Dense feature columns, and where they go in the parameter vector
+DENSE_PARAMS = [0, 1, 2, 3, 4, CENTER, CHAIN, CHECK]
+
+CACHE_FILES = ('results', 'dense', 'pst_index', 'pst_sign', 'mg_phase')
+
+
+def parse_line(line: str) -> Optional[Tuple[str, float]]:
+    """(fen, result) of a dataset line, or None if it has no result."""
+    tokens = line.replace(';', ' ').replace('"', ' ').replace('[', ' ').replace(']', ' ').split()
+    if len(tokens) < 5:
+        return None
+    for token in reversed(tokens[4:]):
+        if token in RESULT_VALUES:
+            return ' '.join(tokens[:4]), RESULT_VALUES[token]
+    return None
+
+
+def fen_codes(fen: str) -> List[int]:
+    """Piece codes by square (see ai.batch_eval) of a FEN placement."""
+    codes = [0] * 64
+    for i, rank in enumerate(fen.split()[0].split('/')):
+        row = 7 - i
+        col = 0
+        for char in rank:
+            if char.isdigit():
+                col += int(char)
+            else:
+                code = FEN_CODES[char.lower()]
+                codes[row * 8 + col] = code if char.isupper() else -code
+                col += 1
+    return codes
+
+
+def _parse_chunk(lines: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    codes, results = [], []
+    for line in lines:
+        parsed = parse_line(line)
+        if parsed is None:
+            continue
+        fen, result = parsed
+        codes.append(fen_codes(fen))
+        results.append(result)
+    return np.array(codes, dtype=np.int8).reshape(-1, 64), np.array(results, dtype=np.float32)
+
+
+def _line_chunks(path: str, size: int) -> Iterator[List[str]]:
+    with open(path, encoding='utf-8') as f:
+        chunk = []
+        for line in f:
+            chunk.append(line)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def extract_features(codes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Sparse linear features of an (N, 64) piece code array."""
+    codes = codes.astype(np.int64)
+    n = len(codes)
+    dense = np.zeros((n, len(DENSE_PARAMS)), dtype=np.float32)
+    for t in range(5):
+        dense[:, t] = (codes == t + 1).sum(axis=1) - (codes == -(t + 1)).sum(axis=1)
+    center = np.zeros(64, dtype=np.int64)
+    for (row, col), points in CENTER_HALF_POINTS.items():
+        center[row * 8 + col] = points
+    dense[:, 5] = (np.sign(codes) * center).sum(axis=1)
+    dense[:, 6] = -BatchEvaluator.chain_scores(codes)
+    dense[:, 7] = (BatchEvaluator.in_check(codes, 'black').astype(np.int64) -
+                   BatchEvaluator.in_check(codes, 'white'))
+
+    phase_weights = np.array([0] + [PHASE_WEIGHTS[name] for name in PIECE_TYPES], dtype=np.int64)
+    mg_phase = np.minimum(phase_weights[np.abs(codes)].sum(axis=1), PHASE_TOTAL)
+
+    # Occupied squares first, then one (table entry, sign) pair per piece
+    occupied = codes != 0
+    width = int(occupied.sum(axis=1).max()) if n else 0
+    squares = np.argsort(~occupied, axis=1, kind='stable')[:, :width]
+    pieces = np.take_along_axis(codes, squares, axis=1)
+    row, col = squares // 8, squares % 8
+    table_row = np.where(pieces > 0, 7 - row, row)
+    index = np.where(pieces != 0, (np.abs(pieces) - 1) * 64 + table_row * 8 + col, 0)
+    return {
+        'dense': dense,
+        'pst_index': index.astype(np.int16),
+        'pst_sign': np.sign(pieces).astype(np.int8),
+        'mg_phase': mg_phase.astype(np.int8),
+    }
+
+
+def read_dataset(dataset: str, workers: Optional[int] = None,
+                 chunk_lines: int = 50000) -> Tuple[np.ndarray, np.ndarray]:
+    """Piece codes (N, 64) and white's results (N,) of a dataset, parsed by worker processes."""
+    with Pool(workers) as pool:
+        parts = list(pool.imap(_parse_chunk, _line_chunks(dataset, chunk_lines)))
+    codes = np.concatenate([c for c, _ in parts]) if parts else np.zeros((0, 64), dtype=np.int8)
+    results = np.concatenate([r for _, r in parts]) if parts else np.zeros(0, dtype=np.float32)
+    return codes, results
+
+
+def build_cache(dataset: str, cache_dir: str, workers: Optional[int] = None) -> int:
+    """Parse `dataset` and write its features to `cache_dir`; returns the number of positions."""
+    codes, results = read_dataset(dataset, workers)
+    features = extract_features(codes)
+    features['results'] = results
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in CACHE_FILES:
+        np.save(os.path.join(cache_dir, name + '.npy'), features[name])
+    stat = os.stat(dataset)
+    with open(os.path.join(cache_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'dataset': os.path.abspath(dataset), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                   'positions': len(results)}, f)
+    return len(results)
+
+
+def cache_is_current(dataset: str, cache_dir: str) -> bool:
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    stat = os.stat(dataset)
+    return meta.get('size') == stat.st_size and meta.get('mtime') == stat.st_mtime
+
+
+def load_cache(cache_dir: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    mode = 'r' if mmap else None
+    return {name: np.load(os.path.join(cache_dir, name + '.npy'), mmap_mode=mode) for name in CACHE_FILES}
+
+
+def initial_parameters(evaluator: ChessEvaluator) -> np.ndarray:
+    """The evaluator's current parameters as a parameter vector."""
+    params = evaluator.parameters()
+    theta = np.zeros(N_PARAMS)
+    for t, name in enumerate(PIECE_TYPES[:5]):
+        theta[t] = params['piece_values'][name] * evaluator.MATERIAL_WEIGHT
+    for t, name in enumerate(PIECE_TYPES):
+        theta[PST_MG][t * 64:(t + 1) * 64] = np.ravel(params['mg_tables'][name]) * evaluator.PST_WEIGHT
+        theta[PST_EG][t * 64:(t + 1) * 64] = np.ravel(params['eg_tables'][name]) * evaluator.PST_WEIGHT
+    theta[CENTER] = evaluator.POSITION_WEIGHT / 2
+    theta[CHAIN] = evaluator.PAWN_STRUCTURE_WEIGHT
+    theta[CHECK] = evaluator.CHECK_WEIGHT
+    return theta
+
+
+def write_parameters(theta: np.ndarray, evaluator: ChessEvaluator, path: str):
+    """Turn a parameter vector back into an evaluator parameter file (integer tables)."""
+    params = evaluator.parameters()
+    for t, name in enumerate(PIECE_TYPES[:5]):
+        params['piece_values'][name] = int(round(theta[t] / evaluator.MATERIAL_WEIGHT))
+    for t, name in enumerate(PIECE_TYPES):
+        mg = np.rint(theta[PST_MG][t * 64:(t + 1) * 64] / evaluator.PST_WEIGHT).astype(int)
+        eg = np.rint(theta[PST_EG][t * 64:(t + 1) * 64] / evaluator.PST_WEIGHT).astype(int)
+        params['mg_tables'][name] = mg.reshape(8, 8).tolist()
+        params['eg_tables'][name] = eg.reshape(8, 8).tolist()
+    params['weights']['POSITION_WEIGHT'] = round(float(theta[CENTER]) * 2, 4)
+    params['weights']['PAWN_STRUCTURE_WEIGHT'] = round(float(theta[CHAIN]), 4)
+    params['weights']['CHECK_WEIGHT'] = round(float(theta[CHECK]), 4)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(params, f, indent=1)
+
+
+def predict(data: Dict[str, np.ndarray], theta: np.ndarray, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+    """Evaluation in centipawns from white's side for rows start..end."""
+    end = len(data['results']) if end is None else end
+    dense = np.asarray(data['dense'][start:end], dtype=np.float64)
+    index = np.asarray(data['pst_index'][start:end], dtype=np.int64)
+    sign = np.asarray(data['pst_sign'][start:end], dtype=np.float64)
+    p = np.asarray(data['mg_phase'][start:end], dtype=np.float64) / PHASE_TOTAL
+    mg = (theta[PST_MG][index] * sign).sum(axis=1)
+    eg = (theta[PST_EG][index] * sign).sum(axis=1)
+    return dense @ theta[DENSE_PARAMS] + p * mg + (1 - p) * eg
+
+
+def _win_probability(evals: np.ndarray, k: float) -> np.ndarray:
+    return 1.0 / (1.0 + np.power(10.0, -k * evals / 400.0))
+
+
+def shard_gradient(data: Dict[str, np.ndarray], theta: np.ndarray, k: float,
+                   start: int, end: int) -> Tuple[float, np.ndarray]:
+    """Summed squared error and its (unnormalised) gradient over rows start..end."""
+    results = np.asarray(data['results'][start:end], dtype=np.float64)
+    probability = _win_probability(predict(data, theta, start, end), k)
+    error = results - probability
+    # d(error^2)/d(eval)
+    g = -2.0 * error * probability * (1 - probability) * math.log(10) * k / 400.0
+
+    dense = np.asarray(data['dense'][start:end], dtype=np.float64)
+    index = np.asarray(data['pst_index'][start:end], dtype=np.int64).ravel()
+    sign = np.asarray(data['pst_sign'][start:end], dtype=np.float64)
+    p = np.asarray(data['mg_phase'][start:end], dtype=np.float64) / PHASE_TOTAL
+    grad = np.zeros(N_PARAMS)
+    grad[DENSE_PARAMS] = dense.T @ g
+    grad[PST_MG] = np.bincount(index, weights=(sign * (g * p)[:, None]).ravel(), minlength=384)
+    grad[PST_EG] = np.bincount(index, weights=(sign * (g * (1 - p))[:, None]).ravel(), minlength=384)
+    return float(error @ error), grad
+
+
+# Worker process state: the memory-mapped cache
+_worker_data: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(cache_dir: str):
+    _worker_data.update(load_cache(cache_dir))
+
+
+def _worker_gradient(task):
+    theta, k, start, end = task
+    return shard_gradient(_worker_data, theta, k, start, end)
+
+
+class Tuner:
+    """Full-batch Adam over the cached features, sharded across worker processes."""
+
+    def __init__(self, cache_dir: str, workers: Optional[int] = None):
+        self.data = load_cache(cache_dir)
+        self.positions = len(self.data['results'])
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = Pool(self.workers, _init_worker, (cache_dir,)) if self.workers > 1 else None
+        step = max(1, math.ceil(self.positions / self.workers))
+        self.shards = [(start, min(start + step, self.positions)) for start in range(0, self.positions, step)]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+    def loss_and_gradient(self, theta: np.ndarray, k: float) -> Tuple[float, np.ndarray]:
+        tasks = [(theta, k, start, end) for start, end in self.shards]
+        if self._pool is not None:
+            parts = self._pool.map(_worker_gradient, tasks)
+        else:
+            parts = [shard_gradient(self.data, *task) for task in tasks]
+        loss = sum(part[0] for part in parts) / self.positions
+        grad = sum(part[1] for part in parts) / self.positions
+        return loss, grad
+
+    def fit_k(self, theta: np.ndarray, low: float = 0.1, high: float = 3.0, steps: int = 30) -> float:
+        """Sigmoid scale that best fits the results with the given parameters (golden-section search)."""
+        ratio = (math.sqrt(5) - 1) / 2
+        a, b = low, high
+        for _ in range(steps):
+            c = b - ratio * (b - a)
+            d = a + ratio * (b - a)
+            if self.loss_and_gradient(theta, c)[0] < self.loss_and_gradient(theta, d)[0]:
+                b = d
+            else:
+                a = c
+        return (a + b) / 2
+
+    def tune(self, theta: np.ndarray, k: float, epochs: int = 200, lr: float = 1.0,
+             report_every: int = 10, log=print) -> Tuple[np.ndarray, float]:
+        theta = theta.copy()
+        m = np.zeros_like(theta)
+        v = np.zeros_like(theta)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        loss = None
+        for epoch in range(1, epochs + 1):
+            loss, grad = self.loss_and_gradient(theta, k)
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad * grad
+            m_hat = m / (1 - beta1 ** epoch)
+            v_hat = v / (1 - beta2 ** epoch)
+            theta -= lr * m_hat / (np.sqrt(v_hat) + eps)
+            if log and (epoch % report_every == 0 or epoch == 1):
+                log(f"epoch {epoch}: loss {loss:.6f}")
+        loss = self.loss_and_gradient(theta, k)[0]
+        return theta, loss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune ChessEvaluator parameters on labelled positions.')
+    parser.add_argument('dataset', help='Text file with one "<fen> <result>" per line')
+    parser.add_argument('-o', '--output', required=True, help='Parameter file to write')
+    parser.add_argument('--cache', default=None, help='Feature cache directory (default: <dataset>.cache)')
+    parser.add_argument('--params', default=None, help='Start from this parameter file')
+    parser.add_argument('--epochs', type=int, default=200, help='Gradient steps over the whole dataset')
+    parser.add_argument('--lr', type=float, default=1.0, help='Adam step size in centipawns')
+    parser.add_argument('--k', type=float, default=None, help='Sigmoid scale (default: fitted)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    cache_dir = args.cache or args.dataset + '.cache'
+    start = time.time()
+    if not cache_is_current(args.dataset, cache_dir):
+        positions = build_cache(args.dataset, cache_dir, args.workers)
+        print(f"Extracted features of {positions} positions in {time.time() - start:.1f}s")
+
+    evaluator = ChessEvaluator()
+    if args.params:
+        evaluator.load_parameters(args.params)
+    theta = initial_parameters(evaluator)
+    tuner = Tuner(cache_dir, args.workers)
+    try:
+        k = args.k if args.k is not None else tuner.fit_k(theta)
+        initial_loss = tuner.loss_and_gradient(theta, k)[0]
+        print(f"{tuner.positions} positions, K = {k:.3f}, initial loss {initial_loss:.6f}")
+        theta, loss = tuner.tune(theta, k, args.epochs, args.lr)
+    finally:
+        tuner.close()
+    write_parameters(theta, evaluator, args.output)
+    print(f"Final loss {loss:.6f}, {time.time() - start:.1f}s in total, wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
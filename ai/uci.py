@@ -0,0 +1,218 @@
+"""
+UCI front end for ChessEngine.
+
+    python -m ai.uci
+
+The search runs in a background thread so that `stop`, `ponderhit` and
+`isready` are answered while it is thinking.
+"""
+import argparse
+import sys
+import threading
+from typing import List, Optional
+
+from chess_logic.board import Board
+from ai.arena import move_to_uci, uci_to_move
+from ai.engine import ChessEngine
+from ai.time_manager import SearchLimits
+from ai.search_info import SearchInfo, JsonLinesWriter, move_name
+
+
+ENGINE_NAME = 'ChessEngine'
+ENGINE_AUTHOR = 'MuratAitov'
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+DEFAULT_HASH_MB = 64
+# `go` parameters given in milliseconds; SearchLimits stores seconds
+TIME_FIELDS = ('wtime', 'btime', 'winc', 'binc', 'movetime')
+
+
+class UciFrontend:
+    def __init__(self, engine: Optional[ChessEngine] = None, output=None,
+                 stats_log: Optional[JsonLinesWriter] = None):
+        self.engine = engine or ChessEngine(depth=64)
+        self.engine.verbose = False
+        self.engine.info_callback = self._send_info
+        self.stats_log = stats_log
+        self.engine.set_hash_size(DEFAULT_HASH_MB)
+        self.output = output or sys.stdout
+        self._output_lock = threading.Lock()
+        self.board = Board()
+        self.color = self.board.load_from_fen(START_FEN)
+        self._thread: Optional[threading.Thread] = None
+        # Set when bestmove may be sent for a ponder/infinite search
+        self._release = threading.Event()
+
+    def send(self, line: str):
+        with self._output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def _send_info(self, info: SearchInfo):
+        if info.mate is not None:
+            score = f"mate {info.mate}"
+        else:
+            score = f"cp {round(info.score * 100)}"
+        line = (f"info depth {info.depth} seldepth {info.seldepth} multipv {info.multipv} score {score} "
+                f"nodes {info.nodes} nps {info.nps} hashfull {info.hashfull} time {int(info.time * 1000)}")
+        if info.pv:
+            line += ' pv ' + ' '.join(move_name(move) for move in info.pv)
+        self.send(line)
+        if self.stats_log is not None:
+            self.stats_log(info)
+
+    def run(self, lines=None):
+        for line in lines or sys.stdin:
+            if not self.handle(line):
+                break
+
+    def handle(self, line: str) -> bool:
+        """Process one command. Returns False on quit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+
+        if command == 'uci':
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max 4096")
+            # Python search is single-threaded; the option exists for GUIs that always send it
+            self.send("option name Threads type spin default 1 min 1 max 1")
+            self.send("option name Ponder type check default false")
+            self.send("option name MultiPV type spin default 1 min 1 max 32")
+            self.send("option name Contempt type spin default 0 min -100 max 100")
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self._stop_search()
+            self.engine.new_game()
+            self.color = self.board.load_from_fen(START_FEN)
+        elif command == 'setoption':
+            self._set_option(args)
+        elif command == 'position':
+            self._stop_search()
+            self._set_position(args)
+        elif command == 'go':
+            self._stop_search()
+            self._go(args)
+        elif command == 'stop':
+            self._stop_search()
+        elif command == 'ponderhit':
+            self.engine.time_manager.ponder_hit()
+            self._release.set()
+        elif command == 'quit':
+            self._stop_search()
+            return False
+        return True
+
+    def _set_option(self, args: List[str]):
+        if 'name' not in args:
+            return
+        name_end = args.index('value') if 'value' in args else len(args)
+        name = ' '.join(args[args.index('name') + 1:name_end]).lower()
+        value = ' '.join(args[name_end + 1:])
+        if name == 'hash' and value.isdigit():
+            self.engine.set_hash_size(int(value))
+        elif name == 'multipv' and value.isdigit():
+            self.engine.multi_pv = max(1, int(value))
+        elif name == 'contempt' and value.lstrip('-').isdigit():
+            # Centipawns in UCI, pawns in the engine
+            self.engine.contempt = int(value) / 100
+
+    def _set_position(self, args: List[str]):
+        if not args:
+            return
+        moves = []
+        if 'moves' in args:
+            moves = args[args.index('moves') + 1:]
+            args = args[:args.index('moves')]
+        fen = START_FEN if args[0] == 'startpos' else ' '.join(args[1:])
+
+        board = Board()
+        color = board.load_from_fen(fen)
+        for uci in moves:
+            start, end, promo = uci_to_move(uci)
+            next_color = 'black' if color == 'white' else 'white'
+            if not board.move_piece(start, end, promotion=promo, next_color=next_color):
+                break
+            color = next_color
+        self.board = board
+        self.color = color
+
+    def _parse_limits(self, args: List[str]):
+        limits = SearchLimits()
+        ponder = False
+        i = 0
+        while i < len(args):
+            token = args[i]
+            value = args[i + 1] if i + 1 < len(args) else None
+            if token in TIME_FIELDS and value is not None:
+                setattr(limits, token, int(value) / 1000.0)
+                i += 1
+            elif token == 'depth' and value is not None:
+                limits.depth = int(value)
+                i += 1
+            elif token == 'nodes' and value is not None:
+                limits.nodes = int(value)
+                i += 1
+            elif token == 'movestogo' and value is not None:
+                limits.movestogo = int(value)
+                i += 1
+            elif token == 'infinite':
+                limits.infinite = True
+            elif token == 'ponder':
+                ponder = True
+            i += 1
+        if (limits.depth is None and limits.nodes is None and limits.movetime is None and
+                limits.wtime is None and limits.btime is None):
+            limits.infinite = True
+        return limits, ponder
+
+    def _go(self, args: List[str]):
+        limits, ponder = self._parse_limits(args)
+        self._release.clear()
+        if not (ponder or limits.infinite):
+            self._release.set()
+        # Start the clock before the worker runs so an early stop is never lost
+        self.engine._begin_search(self.color, limits, ponder=ponder)
+        # The board is only touched again after the search thread is joined
+        self._thread = threading.Thread(target=self._search, args=(self.board, self.color, limits), daemon=True)
+        self._thread.start()
+
+    def _search(self, board: Board, color: str, limits: SearchLimits):
+        move = self.engine._iterative_deepening(board, color, limits)
+        # UCI forbids bestmove before stop/ponderhit in ponder and infinite mode
+        self._release.wait()
+        if move is None:
+            self.send('bestmove 0000')
+            return
+        line = f"bestmove {move_to_uci(move, board)}"
+        if self.engine.ponder_move:
+            line += f" ponder {move_to_uci(self.engine.ponder_move, board)}"
+        self.send(line)
+
+    def _stop_search(self):
+        if self._thread is None:
+            return
+        self.engine.stop()
+        self._release.set()
+        self._thread.join()
+        self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UCI front end for ChessEngine.')
+    parser.add_argument('--stats-log', default=None, help='Append per-iteration search stats as JSON lines')
+    args = parser.parse_args()
+
+    stats_log = JsonLinesWriter(args.stats_log) if args.stats_log else None
+    try:
+        UciFrontend(stats_log=stats_log).run()
+    finally:
+        if stats_log is not None:
+            stats_log.close()
+
+
+if __name__ == '__main__':
+    main()
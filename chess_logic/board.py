@@ -5,7 +5,10 @@ try:
     from pieces import Piece, Pawn, Rook, Knight, Bishop, Queen, King
 except ImportError:
     from chess_logic.pieces import Piece, Pawn, Rook, Knight, Bishop, Queen, King
-
+try:
+    from psqt import SQUARE_TERMS, PAWN_ZOBRIST, PIECE_ZOBRIST, scan_terms, scan_piece_key
+except ImportError:
+    from chess_logic.psqt import SQUARE_TERMS, PAWN_ZOBRIST, PIECE_ZOBRIST, scan_terms, scan_piece_key
 
 class Board:
     def __init__(self):
@@ -19,6 +22,22 @@ class Board:
         self.repetition_counts = {}
         self.halfmove_clock = 0
         self.repetition_counts = {}
+        self.ply_count = 0
+        # Kept up to date by the methods below; call refresh_incremental()
+        # after writing into grid directly
+        self.pawn_key = 0
+        # Zobrist key of the whole piece placement (no side to move or rights)
+        self.piece_key = 0
+        # Running sums of chess_logic.psqt.SQUARE_TERMS, white minus black
+        self.material = 0
+        self.psqt_mg = 0
+        self.psqt_eg = 0
+        self.center = 0
+        # Non-pawn material left, for tapering between middlegame and endgame
+        self.phase = 0
+        # First-layer accumulator of a neural evaluator (ai.nnue.Accumulator),
+        # updated alongside the sums when attached
+        self.accumulator = None
     
     def setup_initial_position(self):
         self.castling_rights = {
@@ -56,8 +75,63 @@ class Board:
         # Короли
         self.grid[7][4] = King('black', (7, 4))
         self.grid[0][4] = King('white', (0, 4))
+        self.refresh_incremental()
         self.record_position('white')
 
+    def load_from_fen(self, fen: str) -> str:
+        """
+        Set up the position from a FEN string.
+
+        Args:
+            fen (str): FEN; the halfmove and fullmove fields are optional
+
+        Returns:
+            str: side to move ('white' or 'black')
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Invalid FEN: {fen!r}")
+        placement, side, castling, ep = fields[:4]
+        if side not in ('w', 'b'):
+            raise ValueError(f"Invalid FEN side to move: {side!r}")
+        if ep != '-' and (len(ep) != 2 or ep[0] not in 'abcdefgh' or ep[1] not in '36'):
+            raise ValueError(f"Invalid FEN en passant square: {ep!r}")
+        piece_classes = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+
+        self.grid = [[None for i in range(8)] for j in range(8)]
+        ranks = placement.split('/')
+        if len(ranks) != 8:
+            raise ValueError(f"Invalid FEN placement: {placement!r}")
+        for i, rank in enumerate(ranks):
+            row = 7 - i
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                elif char.lower() in piece_classes and col < 8:
+                    color = 'white' if char.isupper() else 'black'
+                    self.grid[row][col] = piece_classes[char.lower()](color, (row, col))
+                    col += 1
+                else:
+                    raise ValueError(f"Invalid FEN placement: {placement!r}")
+
+        self.castling_rights = {
+            'white': {'K': 'K' in castling, 'Q': 'Q' in castling},
+            'black': {'K': 'k' in castling, 'Q': 'q' in castling},
+        }
+        self.en_passant_target = None
+        if ep != '-':
+            self.en_passant_target = (int(ep[1]) - 1, ord(ep[0]) - ord('a'))
+
+        side_to_move = 'white' if side == 'w' else 'black'
+        self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        fullmove = int(fields[5]) if len(fields) > 5 else 1
+        self.ply_count = 2 * (fullmove - 1) + (1 if side_to_move == 'black' else 0)
+        self.repetition_counts = {}
+        self.refresh_incremental()
+        self.record_position(side_to_move)
+        return side_to_move
+
     def place_test_pieces(self, piece: Piece, position: Tuple[int, int]):
         """
         Ставит указанную фигуру на заданные координаты.
@@ -68,9 +142,65 @@ class Board:
         """
         row, col = position
         if self.in_bounds(position):
+            old_piece = self.grid[row][col]
+            if old_piece is not None:
+                self._add_piece(old_piece, row * 8 + col, -1)
+            self._add_piece(piece, row * 8 + col, 1)
             self.grid[row][col] = piece
             piece.position = position
     
+    def compute_pawn_key(self) -> int:
+        """Pawn structure key computed from scratch."""
+        return scan_terms(self.grid)[0]
+
+    def refresh_incremental(self):
+        """Recompute pawn_key, piece_key and the running scores from grid."""
+        self.pawn_key, self.material, self.psqt_mg, self.psqt_eg, self.center, self.phase = scan_terms(self.grid)
+        self.piece_key = scan_piece_key(self.grid)
+        if self.accumulator is not None:
+            self.accumulator.refresh(self.grid)
+
+    def _add_piece(self, piece: Piece, square: int, sign: int):
+        """Add (sign 1) or remove (sign -1) a piece's share of the incremental state."""
+        piece_type = piece.__class__.__name__
+        material, mg, eg, center, phase = SQUARE_TERMS[piece.color][piece_type][square]
+        self.material += sign * material
+        self.psqt_mg += sign * mg
+        self.psqt_eg += sign * eg
+        self.center += sign * center
+        self.phase += sign * phase
+        self.piece_key ^= PIECE_ZOBRIST[piece.color][piece_type][square]
+        if piece_type == 'Pawn':
+            self.pawn_key ^= PAWN_ZOBRIST[piece.color][square]
+        if self.accumulator is not None:
+            self.accumulator.add(piece.color, piece_type, square, sign)
+
+    def update_incremental(self, piece: Piece, start_pos: Tuple[int, int], end_pos: Tuple[int, int],
+                           captured_piece: Optional[Piece], capture_pos: Tuple[int, int],
+                           promoted_piece: Optional[Piece], rook_move):
+        """Apply a move that was just made on grid to pawn_key and the running scores."""
+        self._add_piece(piece, start_pos[0] * 8 + start_pos[1], -1)
+        self._add_piece(promoted_piece or piece, end_pos[0] * 8 + end_pos[1], 1)
+        if captured_piece is not None:
+            self._add_piece(captured_piece, capture_pos[0] * 8 + capture_pos[1], -1)
+        if rook_move:
+            rook_piece, rook_start, rook_end = rook_move
+            self._add_piece(rook_piece, rook_start[0] * 8 + rook_start[1], -1)
+            self._add_piece(rook_piece, rook_end[0] * 8 + rook_end[1], 1)
+
+    def incremental_state(self):
+        """Snapshot for restore_incremental() when a move is taken back."""
+        values = self.accumulator.values if self.accumulator is not None else None
+        return (self.pawn_key, self.material, self.psqt_mg, self.psqt_eg, self.center, self.phase,
+                self.piece_key, values)
+
+    def restore_incremental(self, state):
+        (self.pawn_key, self.material, self.psqt_mg, self.psqt_eg, self.center, self.phase,
+         self.piece_key, values) = state
+        if self.accumulator is not None:
+            # None (a snapshot from before the accumulator was attached) makes it refresh on next use
+            self.accumulator.values = values
+
     def in_bounds(self, pos: Tuple[int, int]) -> bool:
         row, col = pos
         return 0 <= row < 8 and 0 <= col < 8
@@ -211,12 +341,16 @@ class Board:
             self.castling_rights['black']['Q'] = prev_castling[3]
             return False
 
+        self.update_incremental(piece, start_pos, end_pos, captured_piece,
+                                en_passant_capture_pos or end_pos, promoted_piece, rook_move)
+
         is_capture = captured_piece is not None
         is_pawn_move = piece.__class__.__name__ == 'Pawn'
         if is_capture or is_pawn_move:
             self.halfmove_clock = 0
         else:
             self.halfmove_clock += 1
+        self.ply_count += 1
 
         if next_color:
             self.record_position(next_color)
@@ -282,7 +416,7 @@ class Board:
             ep = '-'
 
         side = 'w' if side_to_move == 'white' else 'b'
-        return f\"{'/'.join(rows)} {side} {castling} {ep}\"
+        return f"{'/'.join(rows)} {side} {castling} {ep}"
 
     def record_position(self, side_to_move: str):
         key = self.get_position_key(side_to_move)
@@ -470,8 +604,83 @@ class Board:
                     break  # Piece blocks further attacks in this direction
 
         return False
-    
-    
+
+    def get_attackers(self, position: Tuple[int, int], by_color: str, ignore=None) -> List[Tuple[int, int]]:
+        """
+        Enumerate all pieces of the given color that attack a square.
+
+        Args:
+            position: The square to check (row, col)
+            by_color: The color of attacking pieces to collect
+            ignore: Optional set of squares treated as empty. Sliders look
+                through them, which exposes x-ray attackers behind pieces
+                that have already been exchanged.
+
+        Returns:
+            List of attacker positions
+        """
+        if not self.in_bounds(position):
+            return []
+
+        ignore = ignore or ()
+        attackers = []
+        row, col = position
+
+        # Pawn attacks
+        pawn_row = row - 1 if by_color == 'white' else row + 1
+        for attack_col in (col - 1, col + 1):
+            if self.in_bounds((pawn_row, attack_col)) and (pawn_row, attack_col) not in ignore:
+                piece = self.grid[pawn_row][attack_col]
+                if piece is not None and piece.color == by_color and piece.__class__.__name__ == 'Pawn':
+                    attackers.append((pawn_row, attack_col))
+
+        # Knight attacks
+        knight_moves = [
+            (row + 2, col + 1), (row + 2, col - 1),
+            (row - 2, col + 1), (row - 2, col - 1),
+            (row + 1, col + 2), (row + 1, col - 2),
+            (row - 1, col + 2), (row - 1, col - 2),
+        ]
+        for r, c in knight_moves:
+            if self.in_bounds((r, c)) and (r, c) not in ignore:
+                piece = self.grid[r][c]
+                if piece is not None and piece.color == by_color and piece.__class__.__name__ == 'Knight':
+                    attackers.append((r, c))
+
+        # King attacks
+        for drow in [-1, 0, 1]:
+            for dcol in [-1, 0, 1]:
+                if drow == 0 and dcol == 0:
+                    continue
+                r, c = row + drow, col + dcol
+                if self.in_bounds((r, c)) and (r, c) not in ignore:
+                    piece = self.grid[r][c]
+                    if piece is not None and piece.color == by_color and piece.__class__.__name__ == 'King':
+                        attackers.append((r, c))
+
+        # Slider attacks, looking through ignored squares
+        sliders = (
+            ([(1, 1), (1, -1), (-1, 1), (-1, -1)], ('Bishop', 'Queen')),
+            ([(1, 0), (-1, 0), (0, 1), (0, -1)], ('Rook', 'Queen')),
+        )
+        for directions, names in sliders:
+            for drow, dcol in directions:
+                r, c = row, col
+                while True:
+                    r += drow
+                    c += dcol
+                    if not self.in_bounds((r, c)):
+                        break
+                    if (r, c) in ignore:
+                        continue
+                    piece = self.grid[r][c]
+                    if piece is not None:
+                        if piece.color == by_color and piece.__class__.__name__ in names:
+                            attackers.append((r, c))
+                        break
+
+        return attackers
+
     def is_in_check(self, color: str) -> bool:
         """
         Проверяет, находится ли король указанного цвета под шахом.
@@ -0,0 +1,230 @@
+# chess_logic/psqt.py
+"""
+Per-square piece scores that the board keeps running sums of
+
+Board.material, Board.psqt_mg, Board.psqt_eg and Board.center are the sums
+of SQUARE_TERMS over all pieces on the board, white minus black, and
+Board.phase counts the pieces left (PHASE_WEIGHTS). A move changes them by
+a few table lookups instead of a 64-square rescan. The evaluator turns the
+sums into a score (see ChessEvaluator.evaluate_position).
+"""
+import random
+
+# Zobrist keys of pawns by color and square (row * 8 + col). Board.pawn_key is
+# the XOR over all pawns on the board and identifies the pawn structure.
+_pawn_rng = random.Random(1)
+PAWN_ZOBRIST = {color: [_pawn_rng.getrandbits(64) for _ in range(64)] for color in ('white', 'black')}
+
+PIECE_VALUES = {
+    'Pawn': 100,
+    'Knight': 320,
+    'Bishop': 330,
+    'Rook': 500,
+    'Queen': 900,
+    'King': 20000,
+}
+
+# Zobrist keys of all pieces by color, type and square. Board.piece_key is the
+# XOR over every piece on the board and identifies the placement; pawns share
+# PAWN_ZOBRIST so the pawn part of piece_key is pawn_key.
+_piece_rng = random.Random(2)
+PIECE_ZOBRIST = {
+    color: {piece_type: PAWN_ZOBRIST[color] if piece_type == 'Pawn'
+            else [_piece_rng.getrandbits(64) for _ in range(64)]
+            for piece_type in PIECE_VALUES}
+    for color in ('white', 'black')
+}
+
+# Пример: Piece-Square Table для белой пешки (упрощённый)
+# Индексы [row][col]
+PAWN_PST = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [10, 10, 20, 30, 30, 20, 10, 10],
+    [5,  5, 10, 25, 25, 10,  5,  5],
+    [0,  0,  0, 20, 20,  0,  0,  0],
+    [5, -5,-10,  0,  0,-10, -5,  5],
+    [5, 10, 10,-20,-20, 10, 10,  5],
+    [0,  0,  0,  0,  0,  0,  0,  0]
+]
+
+KNIGHT_PST = [
+    [-50,-40,-30,-30,-30,-30,-40,-50],
+    [-40,-20,  0,  0,  0,  0,-20,-40],
+    [-30,  0, 10, 15, 15, 10,  0,-30],
+    [-30,  5, 15, 20, 20, 15,  5,-30],
+    [-30,  0, 15, 20, 20, 15,  0,-30],
+    [-30,  5, 10, 15, 15, 10,  5,-30],
+    [-40,-20,  0,  5,  5,  0,-20,-40],
+    [-50,-40,-30,-30,-30,-30,-40,-50]
+]
+
+BISHOP_PST = [
+    [-20,-10,-10,-10,-10,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5, 10, 10,  5,  0,-10],
+    [-10,  5,  5, 10, 10,  5,  5,-10],
+    [-10,  0, 10, 10, 10, 10,  0,-10],
+    [-10, 10, 10, 10, 10, 10, 10,-10],
+    [-10,  5,  0,  0,  0,  0,  5,-10],
+    [-20,-10,-10,-10,-10,-10,-10,-20]
+]
+
+ROOK_PST = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [5, 10, 10, 10, 10, 10, 10,  5],
+    [-5, 0,  0,  0,  0,  0,  0, -5],
+    [-5, 0,  0,  0,  0,  0,  0, -5],
+    [-5, 0,  0,  0,  0,  0,  0, -5],
+    [-5, 0,  0,  0,  0,  0,  0, -5],
+    [-5, 0,  0,  0,  0,  0,  0, -5],
+    [0,  0,  0,  5,  5,  0,  0,  0]
+]
+
+QUEEN_PST = [
+    [-20,-10,-10, -5, -5,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5,  5,  5,  5,  0,-10],
+    [-5,   0,  5,  5,  5,  5,  0, -5],
+    [0,    0,  5,  5,  5,  5,  0, -5],
+    [-10,  5,  5,  5,  5,  5,  0,-10],
+    [-10,  0,  5,  0,  0,  0,  0,-10],
+    [-20,-10,-10, -5, -5,-10,-10,-20]
+]
+
+# Король в миддлгейме прячется за пешками
+KING_MG_PST = [
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-20,-30,-30,-40,-40,-30,-30,-20],
+    [-10,-20,-20,-20,-20,-20,-20,-10],
+    [20,  20,  0,  0,  0,  0, 20, 20],
+    [20,  30, 10,  0,  0, 10, 30, 20]
+]
+
+# ...а в эндшпиле идёт в центр
+KING_EG_PST = [
+    [-50,-40,-30,-20,-20,-30,-40,-50],
+    [-30,-20,-10,  0,  0,-10,-20,-30],
+    [-30,-10, 20, 30, 30, 20,-10,-30],
+    [-30,-10, 30, 40, 40, 30,-10,-30],
+    [-30,-10, 30, 40, 40, 30,-10,-30],
+    [-30,-10, 20, 30, 30, 20,-10,-30],
+    [-30,-30,  0,  0,  0,  0,-30,-30],
+    [-50,-30,-30,-30,-30,-30,-30,-50]
+]
+
+# Endgame pawns are worth more the further they have advanced
+PAWN_EG_PST = [
+    [0,   0,  0,  0,  0,  0,  0,  0],
+    [80, 80, 80, 80, 80, 80, 80, 80],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [30, 30, 30, 30, 30, 30, 30, 30],
+    [20, 20, 20, 20, 20, 20, 20, 20],
+    [10, 10, 10, 10, 10, 10, 10, 10],
+    [0,   0,  0,  0,  0,  0,  0,  0],
+    [0,   0,  0,  0,  0,  0,  0,  0]
+]
+
+# Middlegame and endgame tables by piece type
+MG_TABLES = {
+    'Pawn': PAWN_PST, 'Knight': KNIGHT_PST, 'Bishop': BISHOP_PST,
+    'Rook': ROOK_PST, 'Queen': QUEEN_PST, 'King': KING_MG_PST,
+}
+EG_TABLES = {
+    'Pawn': PAWN_EG_PST, 'Knight': KNIGHT_PST, 'Bishop': BISHOP_PST,
+    'Rook': ROOK_PST, 'Queen': QUEEN_PST, 'King': KING_EG_PST,
+}
+
+# Game phase: the pieces on the board out of PHASE_TOTAL at the start
+# (pawns and kings do not count). Promotions can push it above the total.
+PHASE_WEIGHTS = {'Pawn': 0, 'Knight': 1, 'Bishop': 1, 'Rook': 2, 'Queen': 4, 'King': 0}
+PHASE_TOTAL = 24
+
+# Bonus for occupying the centre (1.0) and the extended centre (0.5),
+# counted in half points so the sums stay integers
+CENTER_HALF_POINTS = {
+    (3, 3): 2, (3, 4): 2, (4, 3): 2, (4, 4): 2,
+    (2, 2): 1, (2, 3): 1, (2, 4): 1, (2, 5): 1,
+    (3, 2): 1, (3, 5): 1,
+    (4, 2): 1, (4, 5): 1,
+    (5, 2): 1, (5, 3): 1, (5, 4): 1, (5, 5): 1,
+}
+
+
+def _square_terms(color, piece_type):
+    """
+    (material, mg, eg, center, phase) of one piece on each square
+    (row * 8 + col); all but phase are white minus black.
+    """
+    sign = 1 if color == 'white' else -1
+    terms = []
+    for row in range(8):
+        for col in range(8):
+            # The tables are drawn from white's side: row 0 of a table is the 8th rank
+            table_row = 7 - row if color == 'white' else row
+            terms.append((
+                sign * PIECE_VALUES[piece_type],
+                sign * MG_TABLES[piece_type][table_row][col],
+                sign * EG_TABLES[piece_type][table_row][col],
+                sign * CENTER_HALF_POINTS.get((row, col), 0),
+                PHASE_WEIGHTS[piece_type],
+            ))
+    return terms
+
+
+SQUARE_TERMS = {
+    color: {piece_type: _square_terms(color, piece_type) for piece_type in PIECE_VALUES}
+    for color in ('white', 'black')
+}
+
+
+def set_tables(piece_values=None, mg_tables=None, eg_tables=None):
+    """
+    Replace piece values and piece-square tables (e.g. with tuned ones) for
+    the whole process. Boards set up before the change keep stale sums until
+    Board.refresh_incremental() is called.
+    """
+    PIECE_VALUES.update(piece_values or {})
+    MG_TABLES.update(mg_tables or {})
+    EG_TABLES.update(eg_tables or {})
+    for color, terms in SQUARE_TERMS.items():
+        for piece_type in PIECE_VALUES:
+            terms[piece_type] = _square_terms(color, piece_type)
+
+
+def scan_terms(grid):
+    """
+    The sums of Board.incremental_state() computed from scratch in one pass over grid:
+    (pawn_key, material, psqt_mg, psqt_eg, center, phase).
+    """
+    pawn_key = material = psqt_mg = psqt_eg = center = phase = 0
+    square = 0
+    for row in grid:
+        for piece in row:
+            if piece is not None:
+                piece_type = piece.__class__.__name__
+                m, mg, eg, c, ph = SQUARE_TERMS[piece.color][piece_type][square]
+                material += m
+                psqt_mg += mg
+                psqt_eg += eg
+                center += c
+                phase += ph
+                if piece_type == 'Pawn':
+                    pawn_key ^= PAWN_ZOBRIST[piece.color][square]
+            square += 1
+    return pawn_key, material, psqt_mg, psqt_eg, center, phase
+
+
+def scan_piece_key(grid):
+    """Board.piece_key computed from scratch."""
+    key = 0
+    square = 0
+    for row in grid:
+        for piece in row:
+            if piece is not None:
+                key ^= PIECE_ZOBRIST[piece.color][piece.__class__.__name__][square]
+            square += 1
+    return key
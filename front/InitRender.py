@@ -7,6 +7,7 @@ current_path = Path(__file__).resolve()
 project_root = current_path.parents[1]
 sys.path.append(str(project_root))
 from chess_logic.board import Board
+from ai.search_info import move_name
 
 # общие переменные
 assets = {}
@@ -54,7 +55,8 @@ def rendering():
     
     pygame.display.update()
 
-def draw_game_info(screen, cur_color, ai_enabled, ai_color, ai_thinking, ai_difficulty=2, difficulty_names=None):
+def draw_game_info(screen, cur_color, ai_enabled, ai_color, ai_thinking, ai_difficulty=2, difficulty_names=None,
+                   search_info=None):
     """Draw game information on the side panel"""
     font = pygame.font.Font(None, 24)
     small_font = pygame.font.Font(None, 20)
@@ -76,7 +78,12 @@ def draw_game_info(screen, cur_color, ai_enabled, ai_color, ai_thinking, ai_diff
         screen.blit(diff_text, (720, 105))
         
         if ai_thinking:
-            thinking_text = small_font.render("ИИ думает...", True, (255, 255, 0))
+            thinking = "ИИ думает..."
+            if search_info is not None:
+                # Progress of the last completed iteration
+                pv = ' '.join(move_name(move) for move in search_info.pv[:3])
+                thinking = f"ИИ думает: глубина {search_info.depth}, {pv}"
+            thinking_text = small_font.render(thinking, True, (255, 255, 0))
             screen.blit(thinking_text, (720, 125))
     else:
         ai_text = font.render("ИИ: Выключен", True, (255, 0, 0))
@@ -95,6 +102,8 @@ def draw_game_info(screen, cur_color, ai_enabled, ai_color, ai_thinking, ai_diff
         "A - Вкл/выкл ИИ",
         "R - Новая игра",
         "1-4 - Уровень ИИ",
+        "P - Думать на ходу соперника",
+        "Пробел - Ходить сейчас",
         "",
         "Клик - выбрать фигуру",
         "Клик на подсветку - ход"
@@ -83,12 +83,14 @@ class DetailedEvaluation:
         self.y = y
         self.width = width
         self.height = height
+        # Labels of ChessEvaluator.evaluate_breakdown(board).components(),
+        # shown like the bar: positive = white is better
         self.components = {
             "Material": 0,
             "Position": 0,
             "Pawn Structure": 0,
-            "King Safety": 0,
-            "Mobility": 0
+            "Piece-Square": 0,
+            "Check": 0
         }
         
     def update(self, evaluation_components):
@@ -114,20 +116,14 @@ evaluation_bar = EvaluationBar(750, 100, 30, 400)
 detailed_eval = DetailedEvaluation(750, 520, 200, 150)
 
 while running:
-    # Обновление состояния доски
-    current_evaluation = evaluator.evaluate_position(board)
-    evaluation_components = {
-        "Material": evaluator.evaluate_material(board),
-        "Position": evaluator.evaluate_piece_positions(board),
-        "Pawn Structure": evaluator.evaluate_pawn_structure(board),
-        "King Safety": evaluator.evaluate_king_safety(board),
-        "Mobility": evaluator.evaluate_mobility(board)
-    }
+    # Обновление состояния доски (кэшируется, пока фигуры не сдвинутся)
+    breakdown = evaluator.evaluate_breakdown(board)
     
-    # Обновление визуализации
-    evaluation_bar.update(current_evaluation)
+    # Обновление визуализации в сотых пешки, плюс за белых: оценщик считает
+    # в пользу чёрных, поэтому знак меняется и у полоски, и у компонентов
+    evaluation_bar.update(-breakdown.score * 100)
     evaluation_bar.animate()
-    detailed_eval.update(evaluation_components)
+    detailed_eval.update({name: -value for name, value in breakdown.components().items()})
     
     # Отрисовка
     evaluation_bar.draw(screen)
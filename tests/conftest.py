@@ -0,0 +1,44 @@
+# tests/conftest.py
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+
+
+def walk(fens, plies, seed):
+    """
+    Random games from each FEN (None for the initial position): yields
+    (board, side to move) before every move, at most `plies` per game.
+    The same board object is moved on, so copy it to keep a position.
+    """
+    rng = random.Random(seed)
+    for fen in fens:
+        board = Board()
+        if fen is None:
+            board.setup_initial_position()
+            color = 'white'
+        else:
+            color = board.load_from_fen(fen)
+        for _ in range(plies):
+            yield board, color
+            moves = board.get_legal_moves_for_color_with_promotions(color)
+            if not moves:
+                break
+            start, end, promo = rng.choice(moves)
+            color = 'black' if color == 'white' else 'white'
+            assert board.move_piece(start, end, promotion=promo, next_color=color)
+
+
+@pytest.fixture
+def random_walk():
+    """Случайные партии для сравнения оценок: см. walk()."""
+    return walk
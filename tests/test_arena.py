@@ -0,0 +1,59 @@
+# tests/test_arena.py
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from ai.arena import UciEngine, run_match
+
+
+@pytest.fixture
+def opponent(tmp_path):
+    """Executable that runs the project's own UCI front end as the opponent"""
+    path = tmp_path / 'opponent'
+    path.write_text(f"#!{sys.executable}\n"
+                    f"import sys\n"
+                    f"sys.argv = sys.argv[:1]\n"
+                    f"sys.path.insert(0, {str(project_root)!r})\n"
+                    f"from ai.uci import main\n"
+                    f"main()\n")
+    os.chmod(path, 0o755)
+    return str(path)
+
+
+class TestArena:
+
+    def test_uci_engine_new_game(self, opponent):
+        engine = UciEngine(opponent)
+        try:
+            engine.new_game()
+            engine.set_position(['e2e4'])
+            assert len(engine.go(20)) >= 4
+        finally:
+            engine.quit()
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_results_are_merged_as_games_finish(self, opponent, workers, tmp_path):
+        finished = []
+        stats_log = tmp_path / 'stats.jsonl'
+        results = run_match(opponent, engine_depth=1, movetime_ms=10, games_per_elo=2, elos=[1400, 1800],
+                            max_plies=4, workers=workers, hash_mb=1, stats_log=str(stats_log),
+                            on_result=lambda result, count, rate: finished.append((result, count, rate)))
+        # Four plies are never decisive: every game is a draw
+        assert results == [(1400, 1.0, 2), (1800, 1.0, 2)]
+        assert [count for _, count, _ in finished] == [1, 2, 3, 4]
+        assert sorted((r.elo, r.game) for r, _, _ in finished) == [(1400, 0), (1400, 1), (1800, 0), (1800, 1)]
+        assert {r.engine_color for r, _, _ in finished} == {'white', 'black'}
+        assert all(rate > 0 for _, _, rate in finished)
+        # The parent writes every game's stats: whole lines, one per search iteration
+        lines = stats_log.read_text().splitlines()
+        assert len(lines) == sum(len(r.infos) for r, _, _ in finished) > 0
+        assert all(json.loads(line)['depth'] >= 1 for line in lines)
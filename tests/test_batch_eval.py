@@ -0,0 +1,76 @@
+# tests/test_batch_eval.py
+
+import sys
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+np = pytest.importorskip('numpy')
+
+from chess_logic.board import Board
+from ai.evaluator import ChessEvaluator
+from ai.batch_eval import BatchEvaluator, encode_board, encode_boards, SIDE_COLUMN, CASTLING_COLUMNS
+
+
+CHECK_FENS = [
+    '4k3/8/8/8/8/8/3p4/4K3 w - - 0 1',     # пешка
+    '4k3/8/8/8/8/3n4/8/4K3 w - - 0 1',     # конь
+    '4k3/8/8/8/8/8/8/r3K3 w - - 0 1',      # ладья
+    '4k3/8/8/8/b7/8/8/4K3 w - - 0 1',      # слон
+    '4k3/8/8/8/b7/8/2P5/4K3 w - - 0 1',    # слон закрыт пешкой
+    '4k3/8/8/8/8/8/8/q2NK3 w - - 0 1',     # ферзь закрыт конём
+    '4k3/3P4/8/8/8/8/8/4K3 b - - 0 1',     # белая пешка
+    '4k3/8/8/1B6/8/8/8/4K3 b - - 0 1',     # белый слон
+    '8/8/8/8/8/8/8/8 w - - 0 1',           # нет королей
+]
+
+
+def random_positions(random_walk, count=300, seed=11):
+    """(board copy, side to move) from random games out of the initial position"""
+    positions = []
+    for board, color in islice(random_walk([None] * 3, 150, seed), count):
+        snapshot = Board()
+        snapshot.load_from_fen(board.get_position_key(color))
+        positions.append((snapshot, color))
+    return positions
+
+
+class TestBatchEval:
+
+    def setup_method(self):
+        self.evaluator = ChessEvaluator()
+        self.batch = BatchEvaluator(self.evaluator, chunk_size=64)
+
+    def test_matches_the_scalar_evaluator(self, random_walk):
+        positions = random_positions(random_walk)
+        scores = self.batch.evaluate(encode_boards(positions))
+        assert scores.shape == (len(positions),)
+        for (board, color), score in zip(positions, scores):
+            assert score == self.evaluator.evaluate_position(board)
+
+    def test_check_detection(self):
+        positions = []
+        for fen in CHECK_FENS:
+            board = Board()
+            positions.append((board, board.load_from_fen(fen)))
+        codes = encode_boards(positions)[:, :64].astype(np.int64)
+        for color in ('white', 'black'):
+            expected = [board.is_in_check(color) for board, _ in positions]
+            assert BatchEvaluator.in_check(codes, color).tolist() == expected
+        scores = self.batch.evaluate(encode_boards(positions))
+        assert scores.tolist() == [self.evaluator.evaluate_position(board) for board, _ in positions]
+
+    def test_encoding(self):
+        board = Board()
+        color = board.load_from_fen('r3k2r/8/8/8/8/8/8/R3K3 b Qk - 0 1')
+        row = encode_board(board, color)
+        assert row[0] == 4 and row[4] == 6 and row[60] == -6 and row[63] == -4
+        assert row[SIDE_COLUMN] == 1
+        assert row[CASTLING_COLUMNS].tolist() == [0, 1, 1, 0]
+        assert encode_boards([]).shape == (0, 69)
@@ -0,0 +1,103 @@
+# tests/test_bitbase.py
+
+import os
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.bitbase import (index_of, decode_index, table_size, _resolve, _is_legal, _init_worker,
+                        generate, pack, Bitbases, MAGIC, WIN)
+from ai.engine import ChessEngine
+
+
+def sq(name):
+    return (int(name[1]) - 1) * 8 + ord(name[0]) - ord('a')
+
+
+@pytest.fixture(scope='module')
+def kqk(tmp_path_factory):
+    """A generated KQK table, written and loaded back like generate_all() output"""
+    directory = tmp_path_factory.mktemp('bitbases')
+    with Pool(processes=2, initializer=_init_worker, initargs=({},)) as pool:
+        status = generate('KQK', pool, {})
+    with open(os.path.join(directory, 'KQK.bb'), 'wb') as f:
+        f.write(MAGIC)
+        f.write(pack(status))
+    return Bitbases.load(str(directory))
+
+
+def probe(bitbases, fen):
+    board = Board()
+    color = board.load_from_fen(fen)
+    return bitbases.probe(board, color)
+
+
+class TestBitbaseIndexing:
+
+    def test_pawnless_symmetries_share_an_index(self):
+        base = index_of('KRK', sq('c2'), sq('e6'), sq('h1'), True)
+        # Mirror files, mirror ranks and reflect on the a1-h8 diagonal
+        assert index_of('KRK', sq('f2'), sq('d6'), sq('a1'), True) == base
+        assert index_of('KRK', sq('c7'), sq('e3'), sq('h8'), True) == base
+        assert index_of('KRK', sq('b3'), sq('f5'), sq('a8'), True) == base
+
+    def test_kpk_file_mirror(self):
+        assert index_of('KPK', sq('e1'), sq('e8'), sq('e2'), False) == \
+            index_of('KPK', sq('d1'), sq('d8'), sq('d2'), False)
+
+    def test_decode_round_trip(self):
+        for signature in ('KQK', 'KPK'):
+            for index in range(0, table_size(signature), 997):
+                wk, bk, x, strong_to_move = decode_index(signature, index)
+                assert index_of(signature, wk, bk, x, strong_to_move) == index
+
+    def test_mate_and_stalemate(self):
+        status = bytearray(table_size('KRK'))
+        # Rook on a8 mates the king on h8
+        assert _is_legal('Rook', sq('g6'), sq('h8'), sq('a8'), False)
+        assert _resolve('KRK', status, sq('g6'), sq('h8'), sq('a8'), False)
+        # King a8 with no moves and not in check
+        assert not _resolve('KRK', status, sq('c8'), sq('a8'), sq('h7'), False)
+        # The weak king can capture an undefended rook
+        assert not _resolve('KRK', status, sq('a1'), sq('h8'), sq('g7'), False)
+        status[index_of('KRK', sq('g6'), sq('h8'), sq('a8'), False)] = WIN
+        assert _resolve('KRK', status, sq('g6'), sq('h8'), sq('a1'), True)
+
+
+class TestGeneratedBitbase:
+    """
+    Таблица KQK от генерации до пробы и оценки в поиске.
+    """
+
+    def test_probe_results(self, kqk):
+        assert set(kqk.tables) == {'KQK'}
+        # The queen side wins, whoever is to move and whichever color it has
+        assert probe(kqk, '4k3/8/8/8/8/8/8/3QK3 w - - 0 1') == 1
+        assert probe(kqk, '4k3/8/8/8/8/8/8/3QK3 b - - 0 1') == -1
+        assert probe(kqk, '3qk3/8/8/8/8/8/8/4K3 w - - 0 1') == -1
+        # Mate counts as a loss for the side to move
+        assert probe(kqk, '7k/6Q1/5K2/8/8/8/8/8 b - - 0 1') == -1
+        # Stalemate and an undefended queen next to the king are draws
+        assert probe(kqk, 'k7/8/1Q6/8/8/8/8/2K5 b - - 0 1') == 0
+        assert probe(kqk, '7k/6Q1/8/8/8/8/8/K7 b - - 0 1') == 0
+        # Other material is not covered
+        assert probe(kqk, '4k3/8/8/8/8/8/8/3RK3 w - - 0 1') is None
+
+    def test_search_scores_the_probe(self, kqk):
+        engine = ChessEngine(depth=2, bitbases=kqk)
+        engine.verbose = False
+        board = Board()
+        color = board.load_from_fen('8/8/4k3/8/8/8/8/3QK3 w - - 0 1')
+        probes = kqk.probes
+        assert engine.get_best_move(board, color) is not None
+        assert kqk.probes > probes
+        score = engine.top_lines[0][1]
+        assert engine.KNOWN_WIN - 1 < score < engine.MATE_SCORE - 1000
@@ -0,0 +1,151 @@
+# tests/test_book.py
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.book import PolyglotBook, polyglot_key, encode_move, decode_move, ENTRY_STRUCT
+from ai.book_builder import find_chunks, count_chunk, merge_stats, build_entries
+from ai.pgn import san_to_move
+
+
+class TestPolyglotBook:
+    """
+    Polyglot keys are checked against the reference values from the
+    Polyglot book format specification.
+    """
+
+    def setup_method(self):
+        self.board = Board()
+        self.board.setup_initial_position()
+        self.color = 'white'
+
+    def play(self, start, end):
+        next_color = 'black' if self.color == 'white' else 'white'
+        assert self.board.move_piece(start, end, next_color=next_color)
+        self.color = next_color
+
+    def test_reference_keys(self):
+        assert polyglot_key(self.board, self.color) == 0x463b96181691fc9c
+        self.play((1, 4), (3, 4))  # e4
+        assert polyglot_key(self.board, self.color) == 0x823c9b50fd114196
+        self.play((6, 3), (4, 3))  # d5
+        assert polyglot_key(self.board, self.color) == 0x0756b94461c50fb0
+        self.play((3, 4), (4, 4))  # e5
+        assert polyglot_key(self.board, self.color) == 0x662fafb965db29d4
+        self.play((6, 5), (4, 5))  # f5, en passant is possible
+        assert polyglot_key(self.board, self.color) == 0x22a48b5a8e47ff78
+        self.play((0, 4), (1, 4))  # Ke2
+        assert polyglot_key(self.board, self.color) == 0x652a607ca3f242c1
+        self.play((7, 4), (6, 5))  # Kf7
+        assert polyglot_key(self.board, self.color) == 0x00fdd303c946bdd9
+
+    def test_castling_is_encoded_as_king_takes_rook(self):
+        for pos in [(0, 5), (0, 6)]:
+            self.board.grid[pos[0]][pos[1]] = None
+        raw = encode_move(((0, 4), (0, 6), None), self.board)
+        assert raw == (4 << 6) | 7
+        assert decode_move(raw, self.board) == ((0, 4), (0, 6), None)
+
+    def write_book(self, path, entries):
+        entries = sorted(entries)
+        with open(path, 'wb') as f:
+            for key, raw, weight in entries:
+                f.write(ENTRY_STRUCT.pack(key, raw, weight, 0))
+
+    def test_lookup_and_selection(self, tmp_path):
+        key = polyglot_key(self.board, self.color)
+        e4 = ((1, 4), (3, 4), None)
+        d4 = ((1, 3), (3, 3), None)
+        path = tmp_path / 'book.bin'
+        self.write_book(path, [
+            (key, encode_move(e4, self.board), 10),
+            (key, encode_move(d4, self.board), 30),
+            (key - 1, encode_move(e4, self.board), 99),
+            (key + 1, encode_move(e4, self.board), 99),
+        ])
+
+        with PolyglotBook(str(path)) as book:
+            assert len(book) == 4
+            assert sorted(book.get_moves(self.board, self.color)) == sorted([(e4, 10), (d4, 30)])
+            assert book.choose_move(self.board, self.color, 'best') == d4
+            rng = random.Random(1)
+            picks = [book.choose_move(self.board, self.color, rng=rng) for _ in range(200)]
+            assert picks.count(e4) > 20 and picks.count(d4) > picks.count(e4)
+            assert book.choose_move(self.board, 'black') is None
+
+    def test_invalid_size_is_rejected(self, tmp_path):
+        path = tmp_path / 'broken.bin'
+        path.write_bytes(b'\x00' * 10)
+        with pytest.raises(ValueError):
+            PolyglotBook(str(path))
+
+
+class TestBookBuilder:
+
+    PGN = (
+        '[Event "a"]\n[Result "1-0"]\n\n'
+        '1. e4 e5 2. Nf3 {main line} Nc6 (2... d6 3. d4) 3. Bb5 $1 a6 1-0\n\n'
+        '[Event "b"]\n[Result "1/2-1/2"]\n\n'
+        '1. e4 e5 2. Nf3 Nf6 ; Petroff\n3. Nxe5 d6 1/2-1/2\n\n'
+    )
+
+    def test_san_to_move_disambiguation_and_castling(self):
+        board = Board()
+        board.setup_initial_position()
+        assert san_to_move(board, 'Nf3', 'white') == ((0, 6), (2, 5), None)
+        assert san_to_move(board, 'e4', 'white') == ((1, 4), (3, 4), None)
+        assert san_to_move(board, 'O-O', 'black') == ((7, 4), (7, 6), None)
+        with pytest.raises(ValueError):
+            san_to_move(board, 'Qh5', 'white')
+
+    def test_count_chunk_and_build_entries(self, tmp_path):
+        path = tmp_path / 'games.pgn'
+        path.write_text(self.PGN)
+        chunks = find_chunks(str(path), 16)
+        assert len(chunks) == 2
+
+        stats = {}
+        games = 0
+        for chunk_path, start, end in chunks:
+            part, part_games = count_chunk((chunk_path, start, end, 24))
+            merge_stats(stats, part)
+            games += part_games
+        assert games == 2
+
+        board = Board()
+        board.setup_initial_position()
+        e4_key = (polyglot_key(board, 'white'), encode_move(((1, 4), (3, 4)), board))
+        assert stats[e4_key] == [2, 3]
+        assert len(stats) == 9
+
+        entries = build_entries(stats, min_games=2)
+        # e4, e5, Nf3 shared by both games; Black's e5 scores only the draw
+        assert len(entries) == 3
+        assert entries == sorted(entries, key=lambda entry: entry[0])
+
+    def test_count_chunk_replays_fen_games(self, tmp_path):
+        fen = 'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2'
+        path = tmp_path / 'setup.pgn'
+        path.write_text('[Event "Setup"]\n[Result "1-0"]\n[SetUp "1"]\n'
+                        f'[FEN "{fen}"]\n\n2. Nf3 Nc6 3. Bb5 1-0\n\n'
+                        '[Event "Broken"]\n[Result "0-1"]\n[SetUp "1"]\n[FEN "not a fen"]\n\n1. e4 0-1\n\n'
+                        '[Event "Bad ep"]\n[Result "0-1"]\n[SetUp "1"]\n'
+                        '[FEN "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e 0 2"]\n\n2. Nf3 0-1\n')
+        stats, games = count_chunk((str(path), 0, path.stat().st_size, 4))
+        # Broken FENs are skipped rather than replayed from the initial position
+        assert games == 1
+        board = Board()
+        board.load_from_fen(fen)
+        nf3_key = (polyglot_key(board, 'white'), encode_move(((0, 6), (2, 5)), board))
+        # The game starts at ply 2, so max_ply=4 keeps Nf3 and Nc6 only
+        assert stats[nf3_key] == [1, 2]
+        assert len(stats) == 2
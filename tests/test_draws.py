@@ -0,0 +1,94 @@
+# tests/test_draws.py
+
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+
+
+class TestDrawDetection:
+    """
+    Повторения и правило 50 ходов внутри поиска.
+    """
+
+    def setup_method(self):
+        self.engine = ChessEngine(depth=2)
+        self.engine.verbose = False
+
+    def shuffle_knights(self):
+        board = Board()
+        board.setup_initial_position()
+        moves = [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6)), ((5, 5), (7, 6)),
+                 ((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6))]
+        color = 'white'
+        for start, end in moves:
+            color = 'black' if color == 'white' else 'white'
+            assert board.move_piece(start, end, next_color=color)
+        # Ng8 now repeats the position after 3... Ng8 for the third time
+        return board, color
+
+    def test_contempt_decides_whether_to_repeat(self):
+        board, color = self.shuffle_knights()
+        repeat = ((5, 5), (7, 6), None)
+
+        self.engine.contempt = -5.0
+        assert self.engine.get_best_move(board, color) == repeat
+        assert self.engine.top_lines[0][1] == 5.0
+
+        self.engine.new_game()
+        self.engine.contempt = 5.0
+        assert self.engine.get_best_move(board, color) != repeat
+
+    def test_return_to_a_position_played_once(self):
+        board = Board()
+        board.setup_initial_position()
+        color = 'white'
+        for start, end in [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6))]:
+            color = 'black' if color == 'white' else 'white'
+            assert board.move_piece(start, end, next_color=color)
+        # Ng8 brings back the initial position, seen once in the game
+        self.engine.contempt = -5.0
+        assert self.engine.get_best_move(board, color) == ((5, 5), (7, 6), None)
+        assert self.engine.top_lines[0][1] == 5.0
+
+    def test_bitbase_draw_uses_the_contempt(self):
+        class DrawnBitbases:
+            def probe(self, board, color):
+                return 0
+
+        board = Board()
+        color = board.load_from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+        self.engine.contempt = 0.5
+        self.engine._prepare_draw_detection(board, color)
+        self.engine.bitbases = DrawnBitbases()
+        assert self.engine._probe_bitbases(board, color, 1, False) == -0.5
+        assert self.engine._probe_bitbases(board, 'black', 2, False) == 0.5
+
+    def test_repetition_inside_the_line(self):
+        board = Board()
+        color = board.load_from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+        self.engine._prepare_draw_detection(board, color)
+        self.engine._halfmove_clocks[4] = 4
+        self.engine._line_hashes[0] = 123
+        assert self.engine._is_repetition(123, 4)
+        # A capture or pawn move in between makes the earlier position unreachable
+        self.engine._halfmove_clocks[4] = 3
+        assert not self.engine._is_repetition(123, 4)
+
+    def test_fifty_move_rule(self):
+        board = Board()
+        color = board.load_from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 99 80')
+        self.engine.get_best_move(board, color)
+        # Every move leaves a rook up but ends the game in a draw
+        assert self.engine.top_lines[0][1] == 0
+
+        board = Board()
+        color = board.load_from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 20 80')
+        self.engine.get_best_move(board, color)
+        assert self.engine.top_lines[0][1] > 3
@@ -0,0 +1,93 @@
+# tests/test_eval_breakdown.py
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from chess_logic.psqt import scan_piece_key
+from ai.engine import ChessEngine
+from ai.evaluator import ChessEvaluator, BREAKDOWN_CACHE_ENTRIES
+
+
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/ppp2ppp/3p4/1B2p3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8',
+    '8/2p1kp2/1p1p2p1/pP1P3p/P1P4P/4PK2/8/8 w - - 0 40',
+]
+
+
+class TestEvalBreakdown:
+
+    def setup_method(self):
+        self.evaluator = ChessEvaluator()
+
+    def test_terms_match_the_evaluator(self):
+        for fen in FENS:
+            board = Board()
+            board.load_from_fen(fen)
+            breakdown = self.evaluator.evaluate_breakdown(board)
+            assert breakdown.score == self.evaluator.evaluate_position(board)
+            assert breakdown.material == self.evaluator.evaluate_material(board)
+            assert breakdown.position == self.evaluator.evaluate_piece_moves(board)
+            assert breakdown.pawn_structure == self.evaluator.evaluate_pawn_structure(board)
+            assert breakdown.piece_square == self.evaluator.evaluate_piece_square_tables(board)
+            assert sum(breakdown.components().values()) / 100 == pytest.approx(breakdown.score)
+        # The bishop check in the second position
+        board = Board()
+        board.load_from_fen(FENS[1])
+        assert self.evaluator.evaluate_breakdown(board).check == -self.evaluator.CHECK_WEIGHT
+
+    def test_cached_until_the_pieces_move(self):
+        board = Board()
+        board.setup_initial_position()
+        first = self.evaluator.evaluate_breakdown(board)
+        assert self.evaluator.evaluate_breakdown(board) is first
+        board.move_piece((1, 4), (3, 4), next_color='black')
+        second = self.evaluator.evaluate_breakdown(board)
+        assert second is not first and second.score == self.evaluator.evaluate_position(board)
+        board.move_piece((6, 4), (4, 4), next_color='white')
+        third = self.evaluator.evaluate_breakdown(board)
+        assert third is not second
+        # Same placement reached again: the cached result comes back
+        board.move_piece((0, 6), (2, 5), next_color='black')
+        board.move_piece((7, 6), (5, 5), next_color='white')
+        assert self.evaluator.evaluate_breakdown(board) is not third
+        board.move_piece((2, 5), (0, 6), next_color='black')
+        board.move_piece((5, 5), (7, 6), next_color='white')
+        assert self.evaluator.evaluate_breakdown(board) is third
+
+    def test_piece_key_survives_make_and_undo(self):
+        rng = random.Random(5)
+        engine = ChessEngine(depth=1)
+        board = Board()
+        color = board.load_from_fen(FENS[2])
+        start = board.piece_key
+        made = []
+        for _ in range(30):
+            moves = board.get_legal_moves_for_color_with_promotions(color)
+            move = rng.choice(moves)
+            made.append((move, engine._make_move(board, move, color)))
+            color = 'black' if color == 'white' else 'white'
+            assert board.piece_key == scan_piece_key(board.grid)
+        for move, state in reversed(made):
+            engine._undo_move(board, move, state)
+        assert board.piece_key == start
+
+    def test_cache_is_bounded_and_cleared(self):
+        board = Board()
+        board.setup_initial_position()
+        for key in range(BREAKDOWN_CACHE_ENTRIES + 10):
+            board.piece_key = key
+            self.evaluator.evaluate_breakdown(board)
+        assert len(self.evaluator._breakdowns) == BREAKDOWN_CACHE_ENTRIES
+        self.evaluator.clear_breakdowns()
+        assert not self.evaluator._breakdowns
@@ -0,0 +1,73 @@
+# tests/test_eval_cache.py
+
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+
+
+class TestEvalCache:
+
+    def setup_method(self):
+        self.board = Board()
+        self.color = self.board.load_from_fen('r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8')
+        self.engine = ChessEngine(depth=2)
+        self.engine.verbose = False
+
+    def test_cached_score_is_the_static_eval(self):
+        expected = self.engine.evaluator.evaluate_position(self.board)
+        assert self.engine._static_eval(self.board) == expected
+        assert self.engine._static_eval(self.board) == expected
+        assert (self.engine.eval_probes, self.engine.eval_hits) == (2, 1)
+        # The score does not depend on the side to move
+        assert self.engine._evaluate_for(self.board, 'white') == -self.engine._evaluate_for(self.board, 'black')
+
+    def test_keyed_on_the_piece_placement(self):
+        self.engine._static_eval(self.board)
+        # Castling rights do not change the static score and share the entry
+        self.board.castling_rights['white']['K'] = False
+        assert self.engine._static_eval(self.board) == self.engine.evaluator.evaluate_position(self.board)
+        assert self.engine.eval_hits == 1
+        self.board.move_piece((2, 5), (4, 4), next_color='black')
+        assert self.engine._static_eval(self.board) == self.engine.evaluator.evaluate_position(self.board)
+        assert self.engine.eval_hits == 1
+
+    def test_size_is_a_power_of_two(self):
+        self.engine.set_eval_cache_size(1000)
+        assert len(self.engine._eval_keys) == 512
+
+    def test_hit_rate_is_reported(self):
+        infos = []
+        self.engine.info_callback = infos.append
+        self.engine.get_best_move(self.board, self.color)
+        # Stand-pat evaluations that exit lazily do not reach the cache
+        assert infos[-1].eval_probes + infos[-1].lazy_exits == self.engine.q_nodes
+        assert 0 < infos[-1].eval_hit_rate < 1
+
+    def test_search_passes_the_check_status(self):
+        def no_attack_detection(board, color):
+            raise AssertionError('static eval should not test for check')
+        self.engine.evaluator.is_in_check = no_attack_detection
+        assert self.engine.get_best_move(self.board, self.color) is not None
+
+    def test_static_eval_takes_the_check_status_from_the_search(self):
+        expected = self.engine.evaluator.evaluate_position(self.board, (False, False))
+
+        def no_attack_detection(color):
+            raise AssertionError('the search tests for check once per node')
+        self.board.is_in_check = no_attack_detection
+        assert self.engine._static_eval(self.board, self.color, False) == expected
+
+    def test_check_term_from_the_search_matches_the_board(self):
+        board = Board()
+        board.load_from_fen('rnbqkbnr/ppp2ppp/3p4/1B2p3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3')
+        evaluator = self.engine.evaluator
+        assert evaluator.evaluate_position(board, (False, True)) == evaluator.evaluate_position(board)
+        assert evaluator.evaluate_position(board, (False, False)) != evaluator.evaluate_position(board)
+        assert self.engine._evaluate_for(board, 'black') == evaluator.evaluate_position(board)
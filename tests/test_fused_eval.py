@@ -0,0 +1,112 @@
+# tests/test_fused_eval.py
+
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.psqt import MG_TABLES, EG_TABLES, PHASE_WEIGHTS
+from ai.evaluator import ChessEvaluator
+
+
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/1P4P1/8/3pP3/8/8/p6p/R3K2R w KQkq d6 0 1',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8',
+    '8/2p1kp2/1p1p2p1/pP1P3p/P1P4P/4PK2/8/8 w - - 0 40',
+]
+
+
+class ReferenceEvaluator:
+    """Оценка, посчитанная отдельным проходом по доске на каждый член"""
+
+    PIECE_VALUES = {'Pawn': 100, 'Knight': 320, 'Bishop': 330, 'Rook': 500, 'Queen': 900, 'King': 20000}
+
+    def evaluate_material(self, board):
+        score = 0
+        for row in range(8):
+            for col in range(8):
+                piece = board.get_piece((row, col))
+                if piece:
+                    value = self.PIECE_VALUES[piece.__class__.__name__]
+                    score += value if piece.color == 'black' else -value
+        return score * 1.0
+
+    def evaluate_piece_moves(self, board):
+        score = 0
+        square_values = {
+            (3, 3): 1.0, (3, 4): 1.0, (4, 3): 1.0, (4, 4): 1.0,
+            (2, 2): 0.5, (2, 3): 0.5, (2, 4): 0.5, (2, 5): 0.5,
+            (3, 2): 0.5, (3, 5): 0.5,
+            (4, 2): 0.5, (4, 5): 0.5,
+            (5, 2): 0.5, (5, 3): 0.5, (5, 4): 0.5, (5, 5): 0.5
+        }
+        for row in range(8):
+            for col in range(8):
+                piece = board.get_piece((row, col))
+                if piece and (row, col) in square_values:
+                    value = square_values[(row, col)]
+                    score += value if piece.color == 'black' else -value
+        return score * 0.5
+
+    def evaluate_pawn_structure(self, board):
+        score = 0
+        for row in range(1, 7):
+            for col in range(8):
+                piece = board.get_piece((row, col))
+                if piece and piece.__class__.__name__ == 'Pawn':
+                    for d_col in [-1, 1]:
+                        if 0 <= col + d_col <= 7:
+                            step = -1 if piece.color == 'black' else 1
+                            neighbor = board.get_piece((row + step, col + d_col))
+                            if neighbor and neighbor.__class__.__name__ == 'Pawn' and neighbor.color == piece.color:
+                                score += 1 if piece.color == 'black' else -1
+        return score * 0.3
+
+    def evaluate_piece_square_tables(self, board):
+        mg = eg = phase = 0
+        for row in range(8):
+            for col in range(8):
+                piece = board.get_piece((row, col))
+                if piece:
+                    piece_type = piece.__class__.__name__
+                    phase += PHASE_WEIGHTS[piece_type]
+                    if piece.color == 'white':
+                        mg -= MG_TABLES[piece_type][7 - row][col]
+                        eg -= EG_TABLES[piece_type][7 - row][col]
+                    else:
+                        mg += MG_TABLES[piece_type][row][col]
+                        eg += EG_TABLES[piece_type][row][col]
+        mg_phase = min(phase, 24)
+        return (mg * mg_phase + eg * (24 - mg_phase)) / 24 * 0.1
+
+    def evaluate_position(self, board):
+        white_check = (1 if board.is_in_check('white') else 0) * 1.0 / 100
+        black_check = (-1 if board.is_in_check('black') else 0) * 1.0 / 100
+        return (self.evaluate_material(board) / 100 +
+                self.evaluate_piece_moves(board) / 100 +
+                self.evaluate_pawn_structure(board) / 100 +
+                self.evaluate_piece_square_tables(board) / 100 +
+                (white_check + black_check))
+
+
+class TestFusedEval:
+
+    def setup_method(self):
+        self.evaluator = ChessEvaluator()
+        self.reference = ReferenceEvaluator()
+
+    def test_same_score_as_the_per_term_scans(self, random_walk):
+        for board, _ in random_walk(FENS, 25, seed=3):
+            expected = self.reference.evaluate_position(board)
+            assert self.evaluator.evaluate_position_scan(board) == expected
+            assert self.evaluator.evaluate_position(board) == expected
+
+    def test_same_terms(self, random_walk):
+        for board, _ in random_walk(FENS, 10, seed=3):
+            for term in ('evaluate_material', 'evaluate_piece_moves', 'evaluate_pawn_structure',
+                         'evaluate_piece_square_tables'):
+                assert getattr(self.evaluator, term)(board) == getattr(self.reference, term)(board)
@@ -0,0 +1,52 @@
+# tests/test_history.py
+
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine, HISTORY_MAX
+
+
+class TestOrderingTables:
+
+    def setup_method(self):
+        self.board = Board()
+        self.color = self.board.load_from_fen('r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8')
+        self.engine = ChessEngine(depth=3)
+        self.engine.verbose = False
+
+    def test_tables_survive_the_search_and_are_aged(self):
+        self.engine.get_best_move(self.board, self.color)
+        history = list(self.engine.history)
+        assert any(history)
+        assert all(abs(value) <= HISTORY_MAX for value in history)
+        assert any(move is not None for move in self.engine.countermoves)
+        assert any(self.engine.continuation_history)
+
+        self.engine._age_tables(self.board)
+        assert self.engine.history == [value // 2 for value in history]
+
+    def test_killers_follow_the_game(self):
+        self.engine.get_best_move(self.board, self.color)
+        killers = [list(pair) for pair in self.engine.killer_moves]
+        move = self.engine.pv[0]
+        reply = self.engine.pv[1]
+        self.board.move_piece(move[0], move[1], promotion=move[2], next_color='black')
+        self.board.move_piece(reply[0], reply[1], promotion=reply[2], next_color='white')
+
+        self.engine._age_tables(self.board)
+        # Two plies later, the killers of old ply 2 are the killers of ply 0
+        assert self.engine.killer_moves[0] == killers[2]
+        assert len(self.engine.killer_moves) == len(killers)
+
+    def test_new_game_clears_everything(self):
+        self.engine.get_best_move(self.board, self.color)
+        self.engine.new_game()
+        assert not any(self.engine.history)
+        assert not self.engine.tt
+        assert all(pair == [None, None] for pair in self.engine.killer_moves)
@@ -0,0 +1,102 @@
+# tests/test_incremental_eval.py
+
+import copy
+import random
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from chess_logic.pieces import Queen
+from ai.engine import ChessEngine
+from ai.evaluator import ChessEvaluator
+
+
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/1P4P1/8/3pP3/8/8/p6p/R3K2R w KQkq d6 0 1',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8',
+]
+
+
+def scan_score(evaluator, board):
+    """evaluate_position, посчитанная полными проходами по доске"""
+    check_score = (evaluator.is_in_check(board, 'white') * evaluator.CHECK_WEIGHT / 100 +
+                   evaluator.is_in_check(board, 'black') * evaluator.CHECK_WEIGHT / 100)
+    return (evaluator.evaluate_material(board) / 100 +
+            evaluator.evaluate_piece_moves(board) / 100 +
+            evaluator.evaluate_pawn_structure(board) / 100 +
+            evaluator.evaluate_piece_square_tables(board) / 100 +
+            check_score)
+
+
+def fresh_state(board):
+    fresh = copy.deepcopy(board)
+    fresh.refresh_incremental()
+    return fresh.incremental_state()
+
+
+class TestIncrementalEval:
+
+    def setup_method(self):
+        self.engine = ChessEngine(depth=1)
+        self.evaluator = ChessEvaluator()
+
+    def test_make_and_undo_keep_the_sums(self):
+        rng = random.Random(7)
+        for fen in FENS:
+            board = Board()
+            color = board.load_from_fen(fen)
+            start = board.incremental_state()
+            made = []
+            for _ in range(40):
+                moves = board.get_legal_moves_for_color_with_promotions(color)
+                if not moves:
+                    break
+                move = rng.choice(moves)
+                made.append((move, self.engine._make_move(board, move, color)))
+                color = 'black' if color == 'white' else 'white'
+                assert board.incremental_state() == fresh_state(board)
+                assert self.evaluator.evaluate_position(board) == scan_score(self.evaluator, board)
+            for move, state in reversed(made):
+                self.engine._undo_move(board, move, state)
+            assert board.incremental_state() == start
+
+    def test_move_piece_and_placement_keep_the_sums(self):
+        board = Board()
+        board.setup_initial_position()
+        assert board.move_piece((1, 4), (3, 4), next_color='black')
+        assert board.move_piece((6, 3), (4, 3), next_color='white')
+        assert board.move_piece((3, 4), (4, 3), next_color='black')
+        board.place_test_pieces(Queen('white', (5, 5)), (5, 5))
+        assert board.incremental_state() == fresh_state(board)
+        assert self.evaluator.evaluate_position(board) == scan_score(self.evaluator, board)
+
+    def test_phase_counts_the_pieces_left(self):
+        board = Board()
+        board.setup_initial_position()
+        assert board.phase == 24
+        board.load_from_fen('4k3/8/8/8/8/8/4P3/R3K3 w - - 0 1')
+        assert board.phase == 2
+        assert self.evaluator.taper(24, 0, 24) == 24
+        assert self.evaluator.taper(24, 0, 0) == 0
+        # Promotions may add pieces beyond the starting set
+        assert self.evaluator.taper(24, 0, 30) == 24
+
+    def test_endgame_king_tables(self):
+        # Scores are positive for black: a central white king is good for white in the endgame
+        board = Board()
+        board.load_from_fen('7k/8/8/8/3K4/8/8/8 w - - 0 1')
+        assert self.evaluator.evaluate_piece_square_tables(board) < 0
+
+    def test_piece_square_sign(self):
+        board = Board()
+        board.setup_initial_position()
+        assert self.evaluator.evaluate_piece_square_tables(board) == 0
+        # 1. e4 improves white's placement, which scores below zero
+        board.move_piece((1, 4), (3, 4), next_color='black')
+        assert self.evaluator.evaluate_piece_square_tables(board) < 0
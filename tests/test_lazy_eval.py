@@ -0,0 +1,71 @@
+# tests/test_lazy_eval.py
+
+import random
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+from ai.evaluator import ChessEvaluator
+
+
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/1P4P1/8/3pP3/8/8/p6p/R3K2R w KQkq d6 0 1',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8',
+    '8/2p1kp2/1p1p2p1/pP1P3p/P1P4P/4PK2/8/8 w - - 0 40',
+]
+
+
+class TestLazyEval:
+
+    def setup_method(self):
+        self.evaluator = ChessEvaluator()
+
+    def test_margin_covers_the_skipped_terms(self, random_walk):
+        margin = self.evaluator.lazy_margin()
+        for board, _ in random_walk(FENS, 30, seed=9):
+            full = self.evaluator.evaluate_position(board)
+            # Any score is above this window, so the lower bound (cheap score - margin) comes back
+            lower = self.evaluator.lazy_bound(board, float('-inf'), -1e9)
+            assert abs(full - (lower + margin)) <= margin
+
+    def test_bounds_are_outside_the_window(self, random_walk):
+        rng = random.Random(4)
+        exits = 0
+        for board, _ in random_walk(FENS, 30, seed=9):
+            full = self.evaluator.evaluate_position(board)
+            for _ in range(5):
+                alpha = full + rng.uniform(-3, 3)
+                beta = alpha + rng.uniform(0.05, 1)
+                bound = self.evaluator.lazy_bound(board, alpha, beta)
+                if bound is None:
+                    assert self.evaluator.evaluate_lazy(board, alpha, beta) == full
+                    continue
+                exits += 1
+                assert bound >= beta or bound <= alpha
+                # The full score falls on the same side of the window
+                assert (full >= bound >= beta) or (full <= bound <= alpha)
+        assert exits > 0
+
+    def test_search_reports_lazy_exits(self):
+        board = Board()
+        color = board.load_from_fen(FENS[2])
+        engine = ChessEngine(depth=2)
+        engine.verbose = False
+        infos = []
+        engine.info_callback = infos.append
+        lazy_move = engine.get_best_move(board, color)
+        assert 0 < infos[-1].lazy_exits <= infos[-1].lazy_probes
+        assert 0 < infos[-1].lazy_exit_rate < 1
+
+        engine = ChessEngine(depth=2)
+        engine.verbose = False
+        engine.lazy_eval = False
+        assert engine.get_best_move(board, color) == lazy_move
+        assert engine.lazy_probes == 0
@@ -0,0 +1,152 @@
+# tests/test_nnue.py
+
+import copy
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+np = pytest.importorskip('numpy')
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+from ai.nnue import Network, NNUEEvaluator, Accumulator
+from ai.nnue_train import Trainer, input_matrices, train
+from ai.selfplay import play_game
+from ai.tuning import fen_codes
+
+
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/1P4P1/8/3pP3/8/8/p6p/R3K2R w KQkq d6 0 1',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8',
+]
+
+
+def mirror_fen(fen):
+    """The same position with colours swapped and the board flipped"""
+    placement, side, castling, ep = fen.split()[:4]
+    ranks = [rank.swapcase() for rank in reversed(placement.split('/'))]
+    castling = ''.join(sorted(castling.swapcase(), key='KQkq'.index)) if castling != '-' else '-'
+    ep = ep if ep == '-' else ep[0] + ('6' if ep[1] == '3' else '3')
+    return f"{'/'.join(ranks)} {'b' if side == 'w' else 'w'} {castling} {ep} 0 1"
+
+
+def fresh_values(network, board):
+    accumulator = Accumulator(network)
+    accumulator.refresh(board.grid)
+    return accumulator.values
+
+
+class TestNNUE:
+
+    def setup_method(self):
+        self.network = Network.random(hidden=32, seed=3)
+        self.evaluator = NNUEEvaluator(self.network)
+        self.engine = ChessEngine(depth=1, evaluator=self.evaluator)
+
+    def test_make_and_undo_update_the_accumulator(self):
+        rng = random.Random(7)
+        for fen in FENS:
+            board = Board()
+            color = board.load_from_fen(fen)
+            start_score = self.evaluator.evaluate_position(board)
+            start = board.accumulator.values
+            made = []
+            for _ in range(40):
+                moves = board.get_legal_moves_for_color_with_promotions(color)
+                if not moves:
+                    break
+                move = rng.choice(moves)
+                made.append((move, self.engine._make_move(board, move, color)))
+                color = 'black' if color == 'white' else 'white'
+                assert np.array_equal(board.accumulator.values, fresh_values(self.network, board))
+            for move, state in reversed(made):
+                self.engine._undo_move(board, move, state)
+            assert board.accumulator.values is start
+            assert self.evaluator.evaluate_position(board) == start_score
+        # Only the first evaluation of each board refreshed from scratch
+        assert self.evaluator.refreshes == len(FENS)
+
+    def test_attached_mid_line(self):
+        board = Board()
+        color = board.load_from_fen(FENS[2])
+        move = board.get_legal_moves_for_color_with_promotions(color)[0]
+        state = self.engine._make_move(board, move, color)
+        after = self.evaluator.evaluate_position(board)
+        # The snapshot predates the accumulator, so undo makes it refresh on next use
+        self.engine._undo_move(board, move, state)
+        assert np.array_equal(self.evaluator.attach(board).values, fresh_values(self.network, board))
+        assert self.engine._make_move(board, move, color) and self.evaluator.evaluate_position(board) == after
+
+    def test_colour_symmetry(self):
+        for fen in FENS:
+            board, mirrored = Board(), Board()
+            board.load_from_fen(fen)
+            mirrored.load_from_fen(mirror_fen(fen))
+            assert self.evaluator.evaluate_position(board) == -self.evaluator.evaluate_position(mirrored)
+
+    def test_float_model_matches_the_quantized_one(self):
+        trainer = Trainer(self.network)
+        codes = np.array([fen_codes(fen) for fen in FENS], dtype=np.int8)
+        output, _ = trainer.forward(*input_matrices(codes))
+        for fen, value in zip(FENS, output):
+            board = Board()
+            board.load_from_fen(fen)
+            score = self.evaluator.evaluate_position(board)
+            assert score == pytest.approx(-value * 400 / np.log(10) / 100, rel=1e-4, abs=1e-6)
+
+    def test_engine_search_leaves_the_board_unchanged(self):
+        board = Board()
+        color = board.load_from_fen(FENS[1])
+        before = copy.deepcopy(board)
+        self.evaluator.evaluate_position(before)
+        move = self.engine.get_best_move(board, color)
+        assert move in board.get_legal_moves_for_color_with_promotions(color)
+        assert board.incremental_state()[:6] == before.incremental_state()[:6]
+        assert np.array_equal(self.evaluator.attach(board).values, before.accumulator.values)
+        # Copies share the network
+        assert copy.deepcopy(board).accumulator.network is self.network
+
+    def test_training_lowers_the_loss(self, tmp_path):
+        rng = random.Random(2)
+        codes, results = [], []
+        for _ in range(300):
+            board = Board()
+            board.setup_initial_position()
+            color = 'white'
+            for _ in range(rng.randrange(4, 30)):
+                moves = board.get_legal_moves_for_color_with_promotions(color)
+                if not moves:
+                    break
+                color = 'black' if color == 'white' else 'white'
+                board.move_piece(*rng.choice(moves), next_color=color)
+            balance = board.material
+            codes.append(fen_codes(board.get_position_key(color)))
+            results.append(1.0 if balance > 0 else 0.0 if balance < 0 else 0.5)
+        codes = np.array(codes, dtype=np.int8)
+        results = np.array(results, dtype=np.float32)
+        trainer = Trainer(hidden=16)
+        before = trainer.loss(codes, results)
+        train(codes, results, trainer, epochs=5, batch_size=32, lr=3e-3, log=None)
+        assert trainer.loss(codes, results) < before
+
+        path = str(tmp_path / 'net.npz')
+        trainer.network().save(path)
+        loaded = NNUEEvaluator.load(path)
+        assert np.array_equal(loaded.network.w1, trainer.network().w1)
+
+    def test_selfplay_game(self):
+        engine = ChessEngine(depth=1)
+        engine.verbose = False
+        fens, result = play_game(engine, random.Random(1), random_plies=4, max_plies=10)
+        assert result == 0.5
+        assert 1 <= len(fens) <= 6
+        for fen in fens:
+            Board().load_from_fen(fen)
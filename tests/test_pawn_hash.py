@@ -0,0 +1,119 @@
+# tests/test_pawn_hash.py
+
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from chess_logic.pieces import Pawn
+from ai.engine import ChessEngine
+from ai.evaluator import ChessEvaluator
+from ai.pawns import WHITE, BLACK, square_bit, analyze_pawns
+
+
+POSITIONS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8',
+    '4k3/2p5/8/1P6/8/P7/P3P3/4K3 w - - 0 1',
+    '8/2p1kp2/1p1p2p1/pP1P3p/P1P4P/4PK2/8/8 w - - 0 40',
+]
+
+
+def chain_count(board):
+    """Пешечная структура, посчитанная прямым перебором доски"""
+    score = 0
+    for row in range(1, 7):
+        for col in range(8):
+            piece = board.get_piece((row, col))
+            if piece and piece.__class__.__name__ == 'Pawn':
+                for d_col in [-1, 1]:
+                    if 0 <= col + d_col <= 7:
+                        step = -1 if piece.color == 'black' else 1
+                        neighbor = board.get_piece((row + step, col + d_col))
+                        if neighbor and neighbor.__class__.__name__ == 'Pawn' and neighbor.color == piece.color:
+                            score += 1 if piece.color == 'black' else -1
+    return score
+
+
+def sq(name):
+    return square_bit(int(name[1]) - 1, ord(name[0]) - ord('a'))
+
+
+class TestPawnKey:
+
+    def test_board_keeps_the_key_through_moves(self):
+        board = Board()
+        color = board.load_from_fen('4k3/1p6/8/2P5/8/8/6p1/R3K3 b Q - 0 1')
+        assert board.pawn_key == board.compute_pawn_key()
+        # b7-b5, c5xb6 e.p., g2-g1=Q
+        for start, end, promo in [((6, 1), (4, 1), None), ((4, 2), (5, 1), None), ((1, 6), (0, 6), 'q')]:
+            next_color = 'black' if color == 'white' else 'white'
+            assert board.move_piece(start, end, promotion=promo, next_color=next_color)
+            color = next_color
+            assert board.pawn_key == board.compute_pawn_key()
+        # Only the b6 pawn is left
+        assert board.pawn_key == board.compute_pawn_key()
+        assert analyze_pawns(board).pawns == (sq('b6'), 0)
+
+    def test_place_test_pieces_updates_the_key(self):
+        board = Board()
+        board.place_test_pieces(Pawn('white', (1, 3)), (1, 3))
+        board.place_test_pieces(Pawn('black', (1, 3)), (1, 3))
+        assert board.pawn_key == board.compute_pawn_key() != 0
+
+    def test_engine_make_and_undo_keep_the_key(self):
+        engine = ChessEngine(depth=1)
+        board = Board()
+        color = board.load_from_fen('r3k2r/1P4P1/8/3pP3/8/8/p6p/R3K2R w KQkq d6 0 1')
+        before = board.pawn_key
+        for move in board.get_legal_moves_for_color_with_promotions(color):
+            state = engine._make_move(board, move, color)
+            assert board.pawn_key == board.compute_pawn_key()
+            engine._undo_move(board, move, state)
+            assert board.pawn_key == before
+
+
+class TestPawnHashTable:
+
+    def setup_method(self):
+        self.evaluator = ChessEvaluator()
+
+    def test_cached_score_matches_a_full_scan(self):
+        for fen in POSITIONS:
+            board = Board()
+            board.load_from_fen(fen)
+            expected = chain_count(board) * self.evaluator.PAWN_STRUCTURE_WEIGHT
+            assert self.evaluator.evaluate_pawn_structure(board) == expected
+            assert self.evaluator.evaluate_pawn_structure(board) == expected
+
+    def test_piece_moves_hit_the_table(self):
+        board = Board()
+        board.setup_initial_position()
+        self.evaluator.evaluate_pawn_structure(board)
+        board.move_piece((0, 6), (2, 5), next_color='black')
+        self.evaluator.evaluate_pawn_structure(board)
+        assert (self.evaluator.pawn_table.probes, self.evaluator.pawn_table.hits) == (2, 1)
+
+    def test_features(self):
+        board = Board()
+        board.load_from_fen('4k3/2p5/8/1P6/8/P7/P3P3/4K3 w - - 0 1')
+        entry = analyze_pawns(board)
+        assert entry.doubled == (sq('a2'), 0)
+        assert entry.isolated == (sq('e2'), sq('c7'))
+        # b5 stands in front of c7 on a neighbouring file
+        assert entry.passed == (sq('a2') | sq('a3') | sq('e2'), 0)
+        assert entry.attacks[WHITE] & sq('b4')
+        assert entry.attacks[BLACK] == sq('b6') | sq('d6')
+        # The c7 pawn can attack b6..b1 and d6..d1 as it advances
+        assert entry.attack_spans[BLACK] & sq('b1') and entry.attack_spans[BLACK] & sq('d1')
+        assert not entry.attack_spans[WHITE] & sq('b2')
+
+    def test_backward_pawn(self):
+        board = Board()
+        board.load_from_fen('4k3/8/8/3p4/1P6/2P5/8/4K3 w - - 0 1')
+        entry = analyze_pawns(board)
+        assert entry.backward == (sq('c3'), 0)
@@ -0,0 +1,132 @@
+# tests/test_ponder.py
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai import time_manager
+from ai.engine import ChessEngine
+from ai.ponder import Ponderer
+from ai.time_manager import SearchLimits, TimeManager
+
+
+# Engine (white) played e4 and expects e5
+EXPECTED = ((6, 4), (4, 4), None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class TestPonderHit:
+    """
+    Время на ход после ponderhit отсчитывается от момента попадания.
+    """
+
+    def test_budget_starts_at_the_hit(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(time_manager, 'time', clock)
+        manager = TimeManager()
+        manager.start(SearchLimits(movetime=1.0), 'white', ponder=True)
+        clock.now += 5.0
+        # Pondering ignores the clock
+        assert not manager.should_stop(0)
+        assert manager.can_start_iteration(10.0)
+        manager.ponder_hit()
+        assert not manager.pondering and manager.start_time == clock.now
+        clock.now += 0.9
+        assert not manager.should_stop(0)
+        clock.now += 0.1
+        assert manager.should_stop(0)
+
+    def test_hit_may_bring_new_limits(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(time_manager, 'time', clock)
+        manager = TimeManager()
+        manager.start(SearchLimits(), 'black', ponder=True)
+        manager.ponder_hit(SearchLimits(wtime=1.0, btime=20.0, movestogo=10))
+        assert manager.soft_limit == pytest.approx(19.97 / 10)
+
+
+class TestPonderer:
+
+    def setup_method(self):
+        self.board = Board()
+        self.board.setup_initial_position()
+        self.board.move_piece((1, 4), (3, 4), next_color='black')
+        self.key = self.board.get_position_key('black')
+        self.engine = ChessEngine(depth=64)
+        self.engine.verbose = False
+        self.ponderer = Ponderer(self.engine)
+
+    def assert_board_untouched(self):
+        assert self.board.get_position_key('black') == self.key
+
+    def test_hit_returns_a_legal_move_on_our_clock(self):
+        budget = 0.3
+        assert self.ponderer.start(self.board, 'white', EXPECTED, SearchLimits(movetime=budget))
+        assert self.ponderer.matches(EXPECTED)
+        # Ponder past the whole budget: it is only counted from the hit
+        time.sleep(budget + 0.1)
+        assert self.ponderer.active
+        hit_time = time.time()
+        move = self.ponderer.hit()
+        spent = time.time() - hit_time
+        assert budget / 2 <= spent < budget + 0.5
+        assert not self.ponderer.active
+
+        expected = Board()
+        expected.setup_initial_position()
+        expected.move_piece((1, 4), (3, 4), next_color='black')
+        expected.move_piece(EXPECTED[0], EXPECTED[1], next_color='white')
+        assert move in expected.get_legal_moves_for_color_with_promotions('white')
+        self.assert_board_untouched()
+
+    def test_miss_stops_promptly(self):
+        assert self.ponderer.start(self.board, 'white', EXPECTED)
+        time.sleep(0.2)
+        start = time.time()
+        self.ponderer.miss()
+        assert time.time() - start < 0.5
+        assert not self.ponderer.active and self.ponderer.ponder_move is None
+        self.assert_board_untouched()
+
+    def test_immediate_miss_leaves_no_stale_state(self):
+        def ponder_and_miss():
+            for _ in range(20):
+                assert self.ponderer.start(self.board, 'white', EXPECTED)
+                self.ponderer.miss()
+
+        # A miss lost to the worker's own start would leave it searching forever
+        worker = threading.Thread(target=ponder_and_miss, daemon=True)
+        worker.start()
+        worker.join(20)
+        assert not worker.is_alive()
+        assert not self.ponderer.active
+        self.assert_board_untouched()
+
+        # The next regular search is neither stopped nor stuck pondering
+        move = self.engine.get_best_move(self.board, 'black', limits=SearchLimits(depth=2))
+        assert move in self.board.get_legal_moves_for_color_with_promotions('black')
+        assert not self.engine.time_manager.stopped
+        assert not self.engine.time_manager.pondering
+        assert self.engine.nodes_searched > 0
+
+    def test_impossible_ponder_move_is_not_started(self):
+        assert not self.ponderer.start(self.board, 'white', None)
+        assert not self.ponderer.start(self.board, 'white', ((6, 4), (3, 4), None))
+        assert not self.ponderer.active
+        self.assert_board_untouched()
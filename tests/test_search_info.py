@@ -0,0 +1,121 @@
+# tests/test_search_info.py
+
+import json
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+from ai.search_info import JsonLinesWriter, move_name
+from ai.time_manager import SearchLimits
+
+
+class TestSearchInfo:
+
+    def setup_method(self):
+        self.board = Board()
+        self.board.setup_initial_position()
+        self.engine = ChessEngine(depth=3)
+        self.engine.verbose = False
+
+    def test_one_info_per_iteration(self):
+        infos = []
+        self.engine.info_callback = infos.append
+        move = self.engine.get_best_move(self.board, 'white')
+
+        assert [info.depth for info in infos] == [1, 2, 3]
+        last = infos[-1]
+        assert last.pv[0] == move
+        assert len(last.pv) <= 3
+        assert last.nodes == self.engine.nodes_searched + self.engine.q_nodes
+        assert last.seldepth >= last.depth
+        assert 0 < last.first_move_cutoffs <= last.beta_cutoffs
+        assert last.tt_hits <= last.tt_probes
+        assert infos[1].ebf is not None and infos[0].ebf is None
+
+    def test_mate_is_reported_in_moves(self):
+        board = Board()
+        board.load_from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        infos = []
+        self.engine.info_callback = infos.append
+        self.engine.get_best_move(board, 'white')
+        assert infos[-1].mate == 1
+        assert move_name(infos[-1].pv[0]) == 'a1a8'
+
+    def test_json_lines_dump(self, tmp_path):
+        path = tmp_path / 'stats.jsonl'
+        with JsonLinesWriter(str(path)) as log:
+            self.engine.info_callback = log
+            self.engine.get_best_move(self.board, 'white')
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [record['depth'] for record in records] == [1, 2, 3]
+        assert all(isinstance(name, str) for name in records[-1]['pv'])
+        assert 0.0 <= records[-1]['qnode_share'] <= 1.0
+
+
+class TestMultiPV:
+
+    def test_top_lines_match_excluded_searches(self):
+        board = Board()
+        color = board.load_from_fen('r3k2r/ppp2ppp/2n1bn2/3qp3/3P4/2N1BN2/PPP2PPP/R2QK2R w KQkq - 0 1')
+        engine = ChessEngine(depth=2)
+        engine.verbose = False
+        lines = engine.get_top_moves(board, color, 3)
+
+        assert len(lines) == 3
+        assert len({move for move, _, _ in lines}) == 3
+        assert [score for _, score, _ in lines] == sorted((score for _, score, _ in lines), reverse=True)
+        assert all(pv[0] == move for move, _, pv in lines)
+        assert engine.multi_pv == 1
+
+        # The second line is the best move once the first one is ruled out
+        reference = ChessEngine(depth=2)
+        reference.verbose = False
+        reference._begin_search(color, SearchLimits(depth=2))
+        legal = [m for m in board.get_legal_moves_for_color_with_promotions(color) if m != lines[0][0]]
+        for depth in (1, 2):
+            (move, score, pv), = reference._search_root(board, legal, depth, color, [])
+        assert score == lines[1][1]
+
+    def test_info_per_line(self):
+        board = Board()
+        board.setup_initial_position()
+        engine = ChessEngine(depth=2)
+        engine.verbose = False
+        infos = []
+        engine.info_callback = infos.append
+        engine.get_top_moves(board, 'white', 2)
+        assert [(info.depth, info.multipv) for info in infos] == [(1, 1), (1, 2), (2, 1), (2, 2)]
+
+
+class TestPrincipalVariation:
+
+    def test_pv_is_a_legal_line_of_full_depth(self):
+        board = Board()
+        color = board.load_from_fen('r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3')
+        engine = ChessEngine(depth=4)
+        engine.verbose = False
+        move = engine.get_best_move(board, color)
+
+        assert len(engine.pv) == 4
+        assert engine.pv[0] == move
+        assert engine.ponder_move == engine.pv[1]
+        for pv_move in engine.pv:
+            assert pv_move in board.get_legal_moves_for_color_with_promotions(color)
+            next_color = 'black' if color == 'white' else 'white'
+            assert board.move_piece(pv_move[0], pv_move[1], promotion=pv_move[2], next_color=next_color)
+            color = next_color
+
+    def test_pv_ends_in_mate(self):
+        board = Board()
+        color = board.load_from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        engine = ChessEngine(depth=3)
+        engine.verbose = False
+        engine.get_best_move(board, color)
+        assert [move_name(move) for move in engine.pv] == ['a1a8']
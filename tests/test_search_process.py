@@ -0,0 +1,101 @@
+# tests/test_search_process.py
+
+import pickle
+import sys
+import time
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine
+from ai.search_process import SearchWorker
+from ai.time_manager import SearchLimits
+
+
+class TestStartSearch:
+    """
+    Поиск в отдельном процессе: вызов не блокирует, результат приходит через poll().
+    """
+
+    def setup_method(self):
+        self.board = Board()
+        self.board.setup_initial_position()
+        self.engine = ChessEngine(depth=2)
+        self.engine.verbose = False
+
+    def teardown_method(self):
+        self.engine.close()
+
+    def test_result_matches_in_process_search(self):
+        infos = []
+        handle = self.engine.start_search(self.board, 'white', on_info=infos.append)
+        assert handle.wait(30) is not None
+        assert handle.poll()
+
+        reference = ChessEngine(depth=2)
+        reference.verbose = False
+        assert handle.result.move == reference.get_best_move(self.board, 'white')
+        assert handle.result.pv == reference.pv
+        assert [info.depth for info in infos] == [1, 2]
+        assert handle.info is infos[-1]
+
+    def test_board_is_a_snapshot(self):
+        handle = self.engine.start_search(self.board, 'white')
+        # Changing the board afterwards does not affect the running search
+        initial = Board()
+        initial.setup_initial_position()
+        self.board.move_piece((1, 4), (3, 4), next_color='black')
+        result = handle.wait(30)
+        reference = ChessEngine(depth=2)
+        reference.verbose = False
+        assert result.move == reference.get_best_move(initial, 'white')
+
+    def test_stop_returns_a_move(self):
+        handle = self.engine.start_search(self.board, 'white', SearchLimits(infinite=True))
+        start = time.time()
+        while handle.info is None and time.time() - start < 30:
+            handle.poll()
+            time.sleep(0.01)
+        handle.stop()
+        result = handle.wait(30)
+        assert result.move is not None
+        assert result.move in self.board.get_legal_moves_for_color_with_promotions('white')
+
+    def test_new_search_abandons_the_previous_one(self):
+        first = self.engine.start_search(self.board, 'white', SearchLimits(infinite=True))
+        second = self.engine.start_search(self.board, 'white', SearchLimits(depth=1))
+        assert first.poll() and first.result.move is None
+        assert second.wait(30).move is not None
+
+    def test_spawned_worker_gets_a_pickled_engine(self):
+        # The start method used on macOS: nothing is inherited from this process
+        self.engine._worker = SearchWorker(self.engine, 'spawn')
+        handle = self.engine.start_search(self.board, 'white', SearchLimits(depth=2))
+        result = handle.wait(60)
+        reference = ChessEngine(depth=2)
+        reference.verbose = False
+        assert result.move == reference.get_best_move(self.board, 'white')
+
+    def test_engine_pickles_with_an_empty_table(self):
+        self.engine.get_best_move(self.board, 'white')
+        copy = pickle.loads(pickle.dumps(self.engine))
+        assert len(copy.tt) == 0 and copy.tt_capacity == self.engine.tt_capacity
+        assert copy.depth == self.engine.depth and copy.info_callback is None
+
+    def test_settings_changed_after_the_first_search_reach_the_worker(self):
+        assert self.engine.start_search(self.board, 'white').wait(30) is not None
+        self.engine.depth = 1
+        infos = []
+        result = self.engine.start_search(self.board, 'white', on_info=infos.append).wait(30)
+        assert [info.depth for info in infos] == [1]
+        reference = ChessEngine(depth=1)
+        reference.verbose = False
+        assert result.move == reference.get_best_move(self.board, 'white')
+        # Unchanged settings are not sent again
+        settings = self.engine._worker._settings
+        self.engine.start_search(self.board, 'white').wait(30)
+        assert self.engine._worker._settings is settings
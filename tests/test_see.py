@@ -0,0 +1,99 @@
+# tests/test_see.py
+
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from chess_logic.pieces import Pawn, Rook, Knight, Bishop, Queen, King
+from ai.see import see
+
+
+class TestStaticExchange:
+    """
+    Tests for ai.see.see() and Board.get_attackers().
+    """
+
+    def setup_method(self):
+        """
+        Creates a fresh 8x8 board with only the two kings.
+        """
+        self.board = Board()
+        self.place(King('white', (0, 0)))
+        self.place(King('black', (7, 7)))
+
+    def place(self, piece):
+        self.board.place_test_pieces(piece, piece.position)
+
+    def test_undefended_capture_wins_the_piece(self):
+        """Ладья берёт незащищённую пешку: +100."""
+        self.place(Rook('white', (3, 0)))
+        self.place(Pawn('black', (3, 5)))
+        assert see(self.board, ((3, 0), (3, 5))) == 100
+
+    def test_queen_takes_pawn_defended_by_pawn_loses(self):
+        """QxP при защите пешкой: 100 - 900."""
+        self.place(Queen('white', (2, 3)))
+        self.place(Pawn('black', (4, 3)))
+        self.place(Pawn('black', (5, 4)))
+        assert see(self.board, ((2, 3), (4, 3))) == -800
+
+    def test_pawn_takes_defended_knight_still_wins(self):
+        """PxN при защите: 320 - 100."""
+        self.place(Pawn('white', (3, 3)))
+        self.place(Knight('black', (4, 4)))
+        self.place(Pawn('black', (5, 5)))
+        assert see(self.board, ((3, 3), (4, 4))) == 220
+
+    def test_equal_trade_is_zero(self):
+        """RxR, RxR: размен ладей."""
+        self.place(Rook('white', (3, 0)))
+        self.place(Rook('black', (3, 4)))
+        self.place(Rook('black', (6, 4)))
+        assert see(self.board, ((3, 0), (3, 4))) == 0
+
+    def test_xray_rook_battery_wins_exchange(self):
+        """
+        Сдвоенные ладьи против пешки, защищённой ладьёй.
+        Вторая белая ладья стоит за первой и вступает в размен.
+        """
+        self.place(Rook('white', (1, 4)))
+        self.place(Rook('white', (0, 4)))
+        self.place(Pawn('black', (4, 4)))
+        self.place(Rook('black', (6, 4)))
+        assert see(self.board, ((1, 4), (4, 4))) == 100
+
+    def test_without_xray_rook_loses(self):
+        """Та же позиция без второй ладьи: ладья теряется."""
+        self.place(Rook('white', (1, 4)))
+        self.place(Pawn('black', (4, 4)))
+        self.place(Rook('black', (6, 4)))
+        assert see(self.board, ((1, 4), (4, 4))) == -400
+
+    def test_xray_queen_behind_bishop(self):
+        """Ферзь за слоном на диагонали вступает в размен после слона."""
+        self.place(Bishop('white', (2, 2)))
+        self.place(Queen('white', (1, 1)))
+        self.place(Knight('black', (4, 4)))
+        self.place(Pawn('black', (5, 5)))
+        self.place(Bishop('black', (6, 2)))
+        # BxN, PxB, QxP, BxQ -> stop after PxB is best for white
+        assert see(self.board, ((2, 2), (4, 4))) == 320 - 330
+
+    def test_king_cannot_recapture_into_defended_square(self):
+        """Король не может отыгрывать на поле, защищённом второй ладьёй."""
+        self.place(Pawn('black', (6, 6)))
+        self.place(Rook('white', (2, 6)))
+        assert see(self.board, ((2, 6), (6, 6))) == -400
+        self.place(Rook('white', (0, 6)))
+        assert see(self.board, ((2, 6), (6, 6))) == 100
+
+    def test_get_attackers_sees_through_ignored_squares(self):
+        self.place(Rook('white', (1, 4)))
+        self.place(Rook('white', (0, 4)))
+        assert self.board.get_attackers((4, 4), 'white') == [(1, 4)]
+        assert self.board.get_attackers((4, 4), 'white', {(1, 4)}) == [(0, 4)]
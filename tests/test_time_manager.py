@@ -0,0 +1,168 @@
+# tests/test_time_manager.py
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from ai import time_manager
+from ai.engine import ChessEngine
+from ai.time_manager import SearchLimits, TimeManager
+from ai.uci import UciFrontend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time_manager, 'time', fake)
+    return fake
+
+
+class TestAllocation:
+    """
+    Мягкий и жёсткий лимиты для movetime, wtime/btime + inc и movestogo.
+    """
+
+    def setup_method(self):
+        self.manager = TimeManager()
+
+    def test_movetime_spends_all_of_it(self):
+        self.manager.start(SearchLimits(movetime=1.0), 'white')
+        assert self.manager.soft_limit == self.manager.hard_limit == pytest.approx(0.97)
+
+    def test_clock_and_increment(self):
+        self.manager.start(SearchLimits(wtime=60.0, btime=1.0, winc=1.0), 'white')
+        # 59.97 s over 30 moves plus three quarters of the increment
+        assert self.manager.soft_limit == pytest.approx(59.97 / 30 + 0.75)
+        assert self.manager.hard_limit == pytest.approx(self.manager.soft_limit * 4)
+
+    def test_moves_to_go_and_own_clock(self):
+        self.manager.start(SearchLimits(wtime=60.0, btime=10.0, movestogo=5), 'black')
+        assert self.manager.soft_limit == pytest.approx(9.97 / 5)
+        # Never more than half of what is left
+        assert self.manager.hard_limit == pytest.approx(9.97 / 2)
+
+    def test_no_time_limit(self):
+        self.manager.start(SearchLimits(infinite=True, wtime=1.0), 'white')
+        assert (self.manager.soft_limit, self.manager.hard_limit) == (None, None)
+        self.manager.start(SearchLimits(depth=5), 'white')
+        assert (self.manager.soft_limit, self.manager.hard_limit) == (None, None)
+        assert not self.manager.should_stop(10 ** 9)
+
+
+class TestStopping:
+
+    def setup_method(self):
+        self.manager = TimeManager()
+
+    def test_hard_limit(self, clock):
+        self.manager.start(SearchLimits(movetime=1.0), 'white')
+        clock.now += 0.96
+        assert not self.manager.should_stop(0)
+        clock.now += 0.02
+        assert self.manager.should_stop(0)
+
+    def test_node_limit(self):
+        self.manager.start(SearchLimits(nodes=1000), 'white')
+        assert not self.manager.should_stop(999)
+        assert self.manager.should_stop(1000)
+
+    def test_stop_request(self):
+        self.manager.start(SearchLimits(infinite=True), 'white')
+        self.manager.stop()
+        assert self.manager.should_stop(0)
+        assert not self.manager.can_start_iteration(0.0)
+
+    def test_clock_is_polled_every_check_interval_nodes(self):
+        engine = ChessEngine(depth=2)
+        engine.time_manager = TimeManager(check_interval=10)
+        engine._begin_search('white', SearchLimits(infinite=True))
+        polls = []
+
+        def should_stop(nodes):
+            polls.append(nodes)
+            return len(polls) == 3
+
+        engine.time_manager.should_stop = should_stop
+        assert not any(engine._time_check() for _ in range(25))
+        assert len(polls) == 2
+        assert [engine._time_check() for _ in range(10)] == [False] * 4 + [True] * 6
+        # Once the time is up, the clock is not read again
+        assert len(polls) == 3
+
+
+class TestIterations:
+
+    def setup_method(self):
+        self.manager = TimeManager()
+
+    def test_iteration_that_cannot_finish_is_not_started(self, clock):
+        # soft ~2.75 s, hard ~11 s
+        self.manager.start(SearchLimits(wtime=60.0, winc=1.0), 'white')
+        clock.now += 1.0
+        assert self.manager.can_start_iteration(2.0)
+        assert not self.manager.can_start_iteration(2.5)
+        # Past the soft limit nothing new is started
+        clock.now += 2.0
+        assert not self.manager.can_start_iteration(0.0)
+
+    def test_movetime_uses_the_whole_budget(self, clock):
+        self.manager.start(SearchLimits(movetime=1.0), 'white')
+        clock.now += 0.9
+        assert self.manager.can_start_iteration(5.0)
+        clock.now += 0.1
+        assert not self.manager.can_start_iteration(0.0)
+
+    def test_instability_extends_the_soft_limit(self, clock):
+        self.manager.start(SearchLimits(wtime=60.0, winc=1.0), 'white')
+        soft = self.manager.soft_limit
+        clock.now += soft * 1.5
+        assert not self.manager.can_start_iteration(0.0)
+        self.manager.on_iteration_complete(True)
+        self.manager.on_iteration_complete(True)
+        # 1.5 instability: 1.75 times the soft limit
+        assert self.manager.instability == 1.5
+        assert self.manager.can_start_iteration(0.0)
+        clock.now = self.manager.start_time + soft * 1.8
+        assert not self.manager.can_start_iteration(0.0)
+        # A stable best move lets the extension decay
+        self.manager.on_iteration_complete(False)
+        assert self.manager.instability == 0.75
+        # The extension never reaches past the hard limit
+        for _ in range(10):
+            self.manager.on_iteration_complete(True)
+        clock.now = self.manager.start_time + self.manager.hard_limit
+        assert not self.manager.can_start_iteration(0.0)
+
+
+class TestEngineClock:
+
+    def test_go_wtime_returns_before_the_hard_limit(self):
+        output = io.StringIO()
+        uci = UciFrontend(ChessEngine(depth=64), output=output)
+        uci.engine.verbose = False
+        uci.handle('position startpos moves e2e4')
+        start = time.time()
+        uci.handle('go wtime 3000 btime 3000')
+        uci._thread.join(30)
+        elapsed = time.time() - start
+        hard_limit = uci.engine.time_manager.hard_limit
+        assert output.getvalue().splitlines()[-1].startswith('bestmove ')
+        # Depth 64 is out of reach: the iteration planner, not the hard abort, ends the search
+        assert not uci.engine.time_up
+        assert elapsed < hard_limit
@@ -0,0 +1,85 @@
+# tests/test_transposition.py
+
+import random
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from chess_logic.board import Board
+from ai.engine import ChessEngine, TranspositionTable, TTEntry, TT_EXACT, TT_ENTRY_BYTES
+from ai.time_manager import SearchLimits
+
+
+class TestTranspositionTable:
+
+    def test_filled_past_capacity(self):
+        table = TranspositionTable(64)
+        rng = random.Random(3)
+        stored = {}
+        for _ in range(1000):
+            key = rng.getrandbits(64)
+            entry = TTEntry(rng.randint(1, 6), 0.0, TT_EXACT, None)
+            table.store(key, entry)
+            stored[key] = entry
+        assert len(table) <= table.capacity == 64
+        assert len(table._keys) == 64
+        found = 0
+        for key, entry in stored.items():
+            hit = table.get(key)
+            if hit is not None:
+                found += 1
+                assert hit is entry
+        assert found == len(table)
+
+    def test_depth_preferred_replacement(self):
+        table = TranspositionTable(8)
+        deep = TTEntry(5, 1.0, TT_EXACT, None)
+        table.store(3, deep)
+        # Another position in the same slot does not push out a deeper result
+        table.store(11, TTEntry(2, 0.0, TT_EXACT, None))
+        assert table.get(3) is deep and table.get(11) is None
+        # The same position is always updated
+        update = TTEntry(1, 2.0, TT_EXACT, None)
+        table.store(3, update)
+        assert table.get(3) is update
+        # Entries left over from an earlier search give way
+        table.store(3, deep)
+        table.new_search()
+        table.store(11, TTEntry(2, 0.0, TT_EXACT, None))
+        assert table.get(11) is not None and table.get(3) is None
+        assert len(table) == 1
+
+    def test_engine_table_is_bounded(self):
+        engine = ChessEngine(depth=3)
+        engine.verbose = False
+        engine.set_hash_size(1)
+        capacity = 1024 * 1024 // TT_ENTRY_BYTES
+        board = Board()
+        color = board.load_from_fen('r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8')
+        infos = []
+        engine.info_callback = infos.append
+        move = engine.get_best_move(board, color)
+        assert move is not None
+        assert 0 < len(engine.tt) <= capacity == engine.tt_capacity
+        assert infos[-1].hashfull == len(engine.tt) * 1000 // capacity
+        entry = engine.tt.get(engine._compute_hash(board, color))
+        assert entry.best_move == move
+
+    def test_depth_is_clamped_to_the_ply_arrays(self):
+        engine = ChessEngine(depth=3)
+        engine.verbose = False
+        depths = []
+
+        def shallow_root(board, legal_moves, depth, color, prev_moves, count=1):
+            depths.append(depth)
+            return [(legal_moves[0], 0.0, [legal_moves[0]])]
+
+        engine._search_root = shallow_root
+        board = Board()
+        board.setup_initial_position()
+        engine.get_best_move(board, 'white', limits=SearchLimits(depth=100))
+        assert depths[-1] == engine.MAX_DEPTH == len(engine.killer_moves) - 1
@@ -0,0 +1,99 @@
+# tests/test_tuning.py
+
+import sys
+from itertools import islice
+from pathlib import Path
+
+import pytest
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+np = pytest.importorskip('numpy')
+
+from chess_logic import psqt
+from chess_logic.board import Board
+from ai.evaluator import ChessEvaluator
+from ai import tuning
+
+
+def random_games(random_walk, games=12, plies=60, seed=5):
+    """(fen, board, result) of random-play positions; the result is drawn towards the material balance"""
+    evaluator = ChessEvaluator()
+    rows = []
+    for game in range(games):
+        positions = []
+        # Every position after the initial one
+        for board, color in islice(random_walk([None], plies + 1, seed * 1000 + game), 1, None):
+            fen = board.get_position_key(color)
+            snapshot = Board()
+            snapshot.load_from_fen(fen)
+            positions.append((fen, snapshot))
+        balance = evaluator.evaluate_material(board)
+        result = '0-1' if balance > 200 else '1-0' if balance < -200 else '1/2-1/2'
+        rows.extend((fen, snapshot, result) for fen, snapshot in positions)
+    return rows
+
+
+@pytest.fixture
+def restore_tables():
+    saved = ChessEvaluator().parameters()
+    yield
+    psqt.set_tables(saved['piece_values'], saved['mg_tables'], saved['eg_tables'])
+
+
+class TestTuning:
+
+    def test_parse_line(self):
+        fen = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3'
+        assert tuning.parse_line(fen + ' 0 1 [0.5]') == (fen, 0.5)
+        assert tuning.parse_line(fen + ' c9 "1-0";') == (fen, 1.0)
+        assert tuning.parse_line(fen + ' 0-1') == (fen, 0.0)
+        assert tuning.parse_line(fen + ' bm e5;') is None
+        assert tuning.parse_line('') is None
+
+    def test_model_reproduces_the_evaluator(self, random_walk):
+        evaluator = ChessEvaluator()
+        rows = random_games(random_walk, games=4)
+        codes = np.array([tuning.fen_codes(fen) for fen, _, _ in rows], dtype=np.int8)
+        data = tuning.extract_features(codes)
+        data['results'] = np.zeros(len(rows))
+        evals = tuning.predict(data, tuning.initial_parameters(evaluator))
+        expected = [-100 * evaluator.evaluate_position(board) for _, board, _ in rows]
+        assert evals == pytest.approx(expected, abs=1e-6)
+
+    def test_tuning_lowers_the_loss(self, tmp_path, restore_tables, random_walk):
+        dataset = tmp_path / 'positions.epd'
+        dataset.write_text(''.join(f'{fen} "{result}";\n' for fen, _, result in random_games(random_walk)))
+        cache = str(tmp_path / 'cache')
+        positions = tuning.build_cache(str(dataset), cache, workers=2)
+        assert tuning.cache_is_current(str(dataset), cache)
+
+        evaluator = ChessEvaluator()
+        theta = tuning.initial_parameters(evaluator)
+        tuner = tuning.Tuner(cache, workers=2)
+        try:
+            assert tuner.positions == positions
+            k = tuner.fit_k(theta)
+            before = tuner.loss_and_gradient(theta, k)[0]
+            # Sharded gradients add up to the single-process one
+            single = tuning.shard_gradient(tuning.load_cache(cache), theta, k, 0, positions)
+            assert tuner.loss_and_gradient(theta, k)[1] == pytest.approx(single[1] / positions)
+            tuned, after = tuner.tune(theta, k, epochs=30, lr=2.0, log=None)
+        finally:
+            tuner.close()
+        assert after < before
+
+        params = str(tmp_path / 'tuned.json')
+        tuning.write_parameters(tuned, evaluator, params)
+        loaded = ChessEvaluator()
+        loaded.load_parameters(params)
+        assert loaded.PIECE_VALUES['Pawn'] == round(tuned[0])
+        assert loaded.PIECE_VALUES['King'] == 20000
+        assert psqt.MG_TABLES['Knight'][3][3] == round(tuned[tuning.PST_MG][64 + 27] / evaluator.PST_WEIGHT)
+        # Boards built after loading use the tuned tables
+        board = Board()
+        board.setup_initial_position()
+        assert board.incremental_state()[:6] == psqt.scan_terms(board.grid)
@@ -0,0 +1,52 @@
+# tests/test_uci.py
+
+import io
+import sys
+from pathlib import Path
+
+current_path = Path(__file__).resolve()
+project_root = current_path.parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from ai.engine import ChessEngine, TT_ENTRY_BYTES
+from ai.uci import UciFrontend
+
+
+class TestUciFrontend:
+
+    def setup_method(self):
+        self.output = io.StringIO()
+        self.uci = UciFrontend(ChessEngine(depth=2), output=self.output)
+
+    def lines(self):
+        return self.output.getvalue().splitlines()
+
+    def test_handshake(self):
+        self.uci.handle('uci')
+        self.uci.handle('isready')
+        assert self.lines()[-2:] == ['uciok', 'readyok']
+
+    def test_position_with_moves_and_fen(self):
+        self.uci.handle('position startpos moves e2e4 e7e5 g1f3')
+        assert self.uci.color == 'black'
+        assert self.uci.board.get_piece((2, 5)).__class__.__name__ == 'Knight'
+        self.uci.handle('position fen 4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+        assert self.uci.color == 'white'
+        assert self.uci.board.get_piece((0, 7)).__class__.__name__ == 'Rook'
+
+    def test_go_limits_are_converted_to_seconds(self):
+        limits, ponder = self.uci._parse_limits('ponder wtime 60000 btime 30000 winc 500 movestogo 20'.split())
+        assert ponder
+        assert limits.wtime == 60.0 and limits.btime == 30.0 and limits.winc == 0.5
+        assert limits.movestogo == 20 and not limits.infinite
+
+    def test_go_depth_reports_bestmove(self):
+        self.uci.handle('position fen 4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+        self.uci.handle('go depth 2')
+        self.uci.handle('quit')
+        assert self.lines()[-1].startswith('bestmove ')
+
+    def test_setoption_hash(self):
+        self.uci.handle('setoption name Hash value 1')
+        assert self.uci.engine.tt_capacity == 1024 * 1024 // TT_ENTRY_BYTES